@@ -1,15 +1,41 @@
 from django.contrib import admin
-from .models import TourPackage, Booking, ContactMessage
+from django.db import transaction
+from django.db.models import Count, Q
+from .models import TourPackage, Booking, ContactMessage, PaymentTransaction
+from .rollups import booking_days, recompute_days
+
+
+class RelatedTitleListFilter(admin.RelatedOnlyFieldListFilter):
+    """Faqat ishlatilgan bog'liq obyektlarni (id, nomi) ko'rinishida bitta so'rov bilan yuklovchi filtr"""
+    title_field = 'title'
+
+    def field_choices(self, field, request, model_admin):
+        used = model_admin.get_queryset(request).order_by().values(self.field_path).distinct()
+        return list(
+            field.related_model._default_manager
+            .filter(pk__in=used)
+            .order_by(self.title_field)
+            .values_list('pk', self.title_field)
+        )
 
 
 @admin.register(TourPackage)
 class TourPackageAdmin(admin.ModelAdmin):
     """Sayohat paketlari admin paneli"""
-    list_display = ['title', 'location', 'price', 'duration', 'start_date', 'is_active', 'created_at']
+    list_display = [
+        'title', 'location', 'price', 'duration', 'start_date', 'is_active',
+        'seats_remaining', 'bookings_count', 'paid_bookings_count', 'paid_revenue', 'created_at'
+    ]
     list_filter = ['is_active', 'location', 'duration', 'created_at']
     search_fields = ['title', 'description', 'location']
     list_editable = ['is_active', 'price']
-    readonly_fields = ['created_at', 'updated_at']
+    changelist_query_budget = 6
+    # Filtrsiz qo'shimcha COUNT(*) so'rovi o'tkazib yuboriladi
+    show_full_result_count = False
+    readonly_fields = [
+        'created_at', 'updated_at', 'seats_remaining',
+        'bookings_count', 'paid_bookings_count', 'paid_revenue', 'popularity'
+    ]
     
     fieldsets = (
         ('Asosiy ma\'lumotlar', {
@@ -18,9 +44,15 @@ class TourPackageAdmin(admin.ModelAdmin):
         ('Sana va narx', {
             'fields': ('start_date', 'end_date', 'price', 'duration')
         }),
+        ('Joylar', {
+            'fields': ('capacity', 'seats_remaining')
+        }),
         ('Status', {
             'fields': ('is_active',)
         }),
+        ('Buyurtmalar statistikasi', {
+            'fields': ('bookings_count', 'paid_bookings_count', 'paid_revenue', 'popularity')
+        }),
         ('Vaqt', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -30,12 +62,18 @@ class TourPackageAdmin(admin.ModelAdmin):
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    """Buyurtmalar admin paneli"""
-    list_display = ['name', 'tour', 'payment_method', 'is_paid', 'created_at']
-    list_filter = ['is_paid', 'payment_method', 'created_at', 'tour']
+    """Buyurtmalar admin paneli (changelist: 5 ta so'rov — sessiya, foydalanuvchi, COUNT, ro'yxat, tour filtri)"""
+    list_display = ['name', 'tour', 'payment_method', 'is_paid', 'status', 'created_at']
+    list_filter = ['is_paid', 'status', 'payment_method', 'created_at', ('tour', RelatedTitleListFilter)]
+    list_select_related = ['tour']
     search_fields = ['name', 'email', 'phone', 'tour__title']
     list_editable = ['is_paid']
-    readonly_fields = ['created_at', 'updated_at']
+    changelist_query_budget = 5
+    # Holat faqat to'lov, bekor qilish va muddat tugashi orqali o'zgaradi (joylar hisobi bilan)
+    readonly_fields = ['status', 'hold_expires_at', 'created_at', 'updated_at']
+    autocomplete_fields = ['tour']
+    # Katta jadvalda filtrsiz qo'shimcha COUNT(*) so'rovini o'tkazib yuborish
+    show_full_result_count = False
     
     fieldsets = (
         ('Foydalanuvchi ma\'lumotlari', {
@@ -45,7 +83,7 @@ class BookingAdmin(admin.ModelAdmin):
             'fields': ('tour',)
         }),
         ('To\'lov', {
-            'fields': ('payment_method', 'is_paid')
+            'fields': ('payment_method', 'is_paid', 'status', 'hold_expires_at')
         }),
         ('Vaqt', {
             'fields': ('created_at', 'updated_at'),
@@ -53,6 +91,55 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
 
+    actions = ['cancel_bookings']
+
+    def delete_queryset(self, request, queryset):
+        """
+        Tanlangan buyurtmalarni o'chirish, paket hisoblagichlarini kamaytirish, joylarni
+        qaytarish va ularning kunlarini yig'ma jadvalda qayta hisoblash
+        """
+        with transaction.atomic():
+            days = booking_days(queryset)
+            stats = list(
+                queryset.order_by().values('tour_id')
+                .annotate(
+                    total=Count('pk'),
+                    paid=Count('pk', filter=Q(is_paid=True)),
+                    seats=Count('pk', filter=Q(status__in=Booking.OCCUPYING_STATUSES)),
+                )
+            )
+            queryset.delete()
+            for row in stats:
+                TourPackage.objects.filter(pk=row['tour_id']).adjust_stats(
+                    bookings=-row['total'], paid=-row['paid'], seats=-row['seats']
+                )
+            recompute_days(days)
+
+    def cancel_bookings(self, request, queryset):
+        """Tanlangan buyurtmalarni bekor qilish va joylarni paketlarga qaytarish"""
+        released = queryset.release('cancelled')
+        self.message_user(request, f'{released} ta buyurtma bekor qilindi.')
+    cancel_bookings.short_description = "Tanlangan buyurtmalarni bekor qilish"
+
+
+@admin.register(PaymentTransaction)
+class PaymentTransactionAdmin(admin.ModelAdmin):
+    """To'lov tranzaksiyalari admin paneli (faqat ko'rish)"""
+    list_display = ['transaction_id', 'payment_method', 'booking', 'amount', 'status', 'created_at']
+    list_filter = ['status', 'payment_method', 'created_at']
+    list_select_related = ['booking__tour']
+    search_fields = ['transaction_id', 'booking__name']
+    changelist_query_budget = 4
+    # Filtrsiz qo'shimcha COUNT(*) so'rovi o'tkazib yuboriladi
+    show_full_result_count = False
+    readonly_fields = [field.name for field in PaymentTransaction._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
@@ -61,6 +148,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_filter = ['is_read', 'sent_at']
     search_fields = ['name', 'email', 'phone', 'message']
     list_editable = ['is_read']
+    changelist_query_budget = 4
+    # Filtrsiz qo'shimcha COUNT(*) so'rovi o'tkazib yuboriladi
+    show_full_result_count = False
     readonly_fields = ['sent_at']
     
     fieldsets = (
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ToursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tours'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import checks, signals  # noqa: F401
+        from .ingest import contact_spool
+
+        # Oldingi ishga tushirishdan (yoki to'xtagan workerlardan) qolgan spool fayllari
+        # birinchi xabarni kutmasdan bazaga yoziladi; cron uchun: flush_contact_spool
+        if settings.CONTACT_WRITE_BEHIND['ENABLED']:
+            contact_spool.start()
@@ -0,0 +1,164 @@
+"""
+ASGI ostida sayohat paketlarini o'qish uchun async viewlar.
+
+URL manzillari va javob tuzilishi TourPackageViewSet bilan bir xil: filtrlar,
+qidiruv va pagination viewsetning o'zidan olinadi, faqat SQL so'rovlar Django
+async ORM orqali bajariladi.
+"""
+import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .cache import (
+    acached_response_data,
+    catalogue_etag,
+    catalogue_last_modified,
+    tour_etag,
+    tour_last_modified,
+)
+from .middleware import tag_request
+from .models import TourPackage
+from .popularity import featured_etag, featured_rows, popularity
+from .views import TourPackageViewSet
+
+
+def _json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _viewset(request, action, **kwargs):
+    """Filtr, qidiruv va pagination sozlamalari uchun viewset nusxasi"""
+    view = TourPackageViewSet(action=action, basename='tour', format_kwarg=None, args=(), kwargs=kwargs)
+    view.request = Request(request)
+    tag_request(request, f'tour-{action}')
+    return view
+
+
+def async_condition(etag_func, last_modified_func=None):
+    """``django.views.decorators.http.condition`` ning async varianti (ORM so'rovi threadda bajariladi)"""
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            last_modified = None
+            if last_modified_func is not None:
+                last_modified = await sync_to_async(last_modified_func)(request, *args, **kwargs)
+            if last_modified is not None:
+                if not timezone.is_aware(last_modified):
+                    last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+                last_modified = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
+
+
+def api_errors(view_func):
+    """DRF istisnolarini DRF bilan bir xil JSON javobga aylantirish"""
+    @wraps(view_func)
+    async def inner(request, *args, **kwargs):
+        try:
+            return await view_func(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return _json_response(data, status=exc.status_code)
+    return inner
+
+
+async def _paginate(view, queryset):
+    """PageNumberPagination'ni async count va slice bilan bajarish"""
+    pagination = view.paginator
+    request = view.request
+    page_size = pagination.get_page_size(request)
+    if not page_size:
+        return None, [row async for row in queryset]
+
+    paginator = pagination.django_paginator_class(queryset, page_size)
+    paginator.count = await queryset.acount()
+    page_number = pagination.get_page_number(request, paginator)
+    try:
+        number = paginator.validate_number(page_number)
+    except InvalidPage as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+    bottom = (number - 1) * page_size
+    rows = [row async for row in queryset[bottom:bottom + page_size]]
+    pagination.request = request
+    pagination.page = Page(rows, number, paginator)
+    return pagination, rows
+
+
+@require_safe
+@api_errors
+@async_condition(catalogue_etag, catalogue_last_modified)
+async def tour_list(request):
+    """Sayohat paketlari ro'yxati"""
+    view = _viewset(request, 'list')
+
+    async def build():
+        queryset = view.filter_queryset(view.get_queryset())
+        pagination, rows = await _paginate(view, queryset)
+        data = view.get_serializer(rows, many=True).data
+        if pagination is None:
+            return data
+        return pagination.get_paginated_response(data).data
+
+    return _json_response(await acached_response_data(view.request, 'list', build))
+
+
+@require_safe
+@api_errors
+@async_condition(tour_etag, tour_last_modified)
+async def tour_detail(request, pk):
+    """Sayohat paketi tafsilotlari"""
+    view = _viewset(request, 'retrieve', pk=pk)
+    try:
+        tour = await view.get_queryset().aget(pk=pk)
+    except TourPackage.DoesNotExist:
+        raise NotFound(f'No {TourPackage._meta.object_name} matches the given query.')
+    popularity.record(tour.pk, 'view')
+    return _json_response(view.get_serializer(tour).data)
+
+
+@require_safe
+@api_errors
+@async_condition(featured_etag)
+async def tour_featured(request):
+    """Trend sayohatlar"""
+    view = _viewset(request, 'featured')
+    rows = await sync_to_async(featured_rows)(request)
+    return _json_response(view.get_serializer(rows, many=True).data)
+
+
+@require_safe
+@api_errors
+@async_condition(catalogue_etag, catalogue_last_modified)
+async def tour_search(request):
+    """Kengaytirilgan qidirish"""
+    view = _viewset(request, 'search')
+
+    async def build():
+        rows = [row async for row in view.search_queryset()[:settings.TOURS_SEARCH_LIMIT]]
+        return view.get_serializer(rows, many=True).data
+
+    return _json_response(await acached_response_data(view.request, 'search', build))
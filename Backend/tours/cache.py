@@ -0,0 +1,192 @@
+import datetime
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import TourPackage
+from .routers import primary_reads
+
+
+CATALOGUE_VERSION_KEY = 'tours:catalogue:version'
+# Versiya oshirilganidan keyin ``REPLICA_PIN_SECONDS`` davomida mavjud bo'ladi
+CATALOGUE_CHANGED_KEY = 'tours:catalogue:changed'
+# Oxirgi o'zgarish vaqti (o'chirish, faolsizlantirish va rasm variantlari ham)
+CATALOGUE_MODIFIED_KEY = 'tours:catalogue:modified'
+
+
+def get_catalogue_version():
+    """Katalogning joriy versiyasini qaytaradi"""
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # Kesh tozalangan bo'lsa eski kalitlar qayta ishlatilmasligi uchun
+        # versiya vaqtdan boshlanadi
+        cache.add(CATALOGUE_VERSION_KEY, int(time.time()), None)
+        version = cache.get(CATALOGUE_VERSION_KEY, int(time.time()))
+    return version
+
+
+async def aget_catalogue_version():
+    """``get_catalogue_version`` ning async varianti"""
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOGUE_VERSION_KEY, int(time.time()), None)
+        version = await cache.aget(CATALOGUE_VERSION_KEY, int(time.time()))
+    return version
+
+
+def bump_catalogue_version():
+    """Katalog o'zgarganda versiyani oshirish (eski keshlar o'z-o'zidan eskiradi)"""
+    if settings.DATABASE_REPLICAS:
+        # Yangi versiya keshlari replikalar yetib olguncha asosiy bazadan to'ldiriladi
+        cache.set(CATALOGUE_CHANGED_KEY, True, settings.REPLICA_PIN_SECONDS)
+    cache.set(CATALOGUE_MODIFIED_KEY, timezone.now(), None)
+    try:
+        return cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        version = int(time.time())
+        cache.set(CATALOGUE_VERSION_KEY, version, None)
+        return version
+
+
+def fill_reads():
+    """
+    Keshni to'ldiruvchi o'qishlar uchun kontekst: katalog yaqinda o'zgargan bo'lsa
+    replika hali eski ma'lumotni qaytarishi mumkin — yangi versiya kaliti ostiga
+    eski natija yozilmasligi uchun o'qish asosiy bazadan bajariladi.
+    """
+    if settings.DATABASE_REPLICAS and cache.get(CATALOGUE_CHANGED_KEY):
+        return primary_reads()
+    return nullcontext()
+
+
+async def afill_reads():
+    """``fill_reads`` ning async varianti"""
+    if settings.DATABASE_REPLICAS and await cache.aget(CATALOGUE_CHANGED_KEY):
+        return primary_reads()
+    return nullcontext()
+
+
+def normalize_query_params(query_params):
+    """So'rov parametrlarini tartiblangan va bo'sh qiymatlarsiz ko'rinishga keltirish"""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = sorted(v.strip() for v in query_params.getlist(key) if v.strip())
+        if values:
+            items.append((key, values))
+    return items
+
+
+def response_cache_key(request, action, version=None):
+    """Action, host va normallashtirilgan parametrlardan kesh kaliti yasash"""
+    if version is None:
+        version = get_catalogue_version()
+    # Sana filtrlari bugungi sanaga bog'liq, shuning uchun kalitda sana ham bor
+    raw = repr((request.get_host(), action, normalize_query_params(request.query_params), timezone.localdate()))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'tours:response:{version}:{action}:{digest}'
+
+
+def cached_response_data(request, action, build):
+    """Javob ma'lumotini keshdan olish yoki ``build()`` orqali hisoblab saqlash"""
+    key = response_cache_key(request, action)
+    data = cache.get(key)
+    if data is None:
+        with fill_reads():
+            data = build()
+        cache.set(key, data, settings.TOURS_RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+async def acached_response_data(request, action, build):
+    """``cached_response_data`` ning async varianti (``build`` — korutina funksiya)"""
+    key = response_cache_key(request, action, await aget_catalogue_version())
+    data = await cache.aget(key)
+    if data is None:
+        with await afill_reads():
+            data = await build()
+        await cache.aset(key, data, settings.TOURS_RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def catalogue_state():
+    """Katalog holati (oxirgi o'zgarish va faol paketlar soni), versiya bo'yicha keshlanadi"""
+    version = get_catalogue_version()
+    key = f'tours:state:{version}'
+    state = cache.get(key)
+    if state is None:
+        with fill_reads():
+            state = TourPackage.objects.aggregate(
+                last_modified=Max('updated_at'),
+                active=Count('id', filter=Q(is_active=True))
+            )
+        cache.set(key, state, settings.TOURS_RESPONSE_CACHE_TIMEOUT)
+    return version, state
+
+
+def catalogue_etag(request, *args, **kwargs):
+    """Ro'yxat endpointlari uchun ETag (katalog holati + so'rov manzili)"""
+    version, state = catalogue_state()
+    raw = repr((
+        version, state['last_modified'], state['active'], timezone.localdate(),
+        request.get_host(), request.get_full_path()
+    ))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    """
+    Ro'yxat endpointlari uchun Last-Modified: versiya oshirilgan vaqt (``Max(updated_at)``
+    o'chirilgan paketlar va ``.update()`` ni ko'rmaydi) va sana filtrlari uchun bugungi
+    kun boshi. Oxirgi o'zgarish joriy soniyada bo'lsa (HTTP sanasi soniya aniqligida)
+    yoki vaqt noma'lum bo'lsa, Last-Modified berilmaydi — faqat ETag ishlaydi.
+    """
+    modified = cache.get(CATALOGUE_MODIFIED_KEY)
+    now = timezone.now()
+    if modified is None:
+        # Kesh tozalangan: oxirgi o'zgarish vaqti endi ma'lum emas
+        cache.add(CATALOGUE_MODIFIED_KEY, now, None)
+        return None
+    if int(modified.timestamp()) >= int(now.timestamp()):
+        return None
+    midnight = timezone.make_aware(datetime.datetime.combine(timezone.localdate(now), datetime.time()))
+    return max(modified, midnight)
+
+
+def _tour_state(request, pk):
+    # etag va last_modified funksiyalari bitta so'rov natijasidan foydalanadi
+    if not hasattr(request, '_tour_state'):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            state = None
+        else:
+            state = (
+                TourPackage.objects.filter(pk=pk, is_active=True)
+                .values_list('updated_at', 'stats_updated_at', 'bookings_count', 'paid_bookings_count')
+                .first()
+            )
+        request._tour_state = state
+    return request._tour_state
+
+
+def tour_etag(request, pk=None, **kwargs):
+    """Bitta sayohat paketi uchun ETag (qatorning updated_at qiymati va hisoblagichlaridan)"""
+    state = _tour_state(request, pk)
+    if state is None:
+        return None
+    raw = repr((pk, state, request.get_host(), request.get_full_path()))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def tour_last_modified(request, pk=None, **kwargs):
+    """Bitta sayohat paketi uchun Last-Modified (hisoblagichlar o'zgarishi ham hisobga olinadi)"""
+    state = _tour_state(request, pk)
+    if state is None:
+        return None
+    updated_at, stats_updated_at = state[:2]
+    return max(updated_at, stats_updated_at) if stats_updated_at else updated_at
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+@register()
+def check_payment_providers(app_configs, **kwargs):
+    """To'lov providerlari ishga tushishda tekshiriladi (aks holda har bir to'lov so'rovi 503 oladi)"""
+    errors = []
+    for payment_method, path in settings.PAYMENT_SETTINGS['PROVIDERS'].items():
+        try:
+            import_string(path)(payment_method)
+        except (ImportError, ImproperlyConfigured) as exc:
+            errors.append(Error(
+                str(exc),
+                hint="PAYMENT_SETTINGS['PROVIDERS'] da haqiqiy to'lov tizimi providerini ko'rsating",
+                obj=payment_method,
+                id='tours.E001',
+            ))
+    return errors
+
+
+# Faqat bitta jarayon ichida ishlaydigan kesh backendlari
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Javoblar keshi yoqilgan bo'lsa katalog versiyasi barcha workerlar uchun umumiy bo'lishi kerak"""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.TOURS_RESPONSE_CACHE_TIMEOUT and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"{backend} har bir worker jarayonida alohida: katalog o'zgarishi boshqa workerlar keshini eskirtirmaydi",
+            hint="REDIS_URL ni ko'rsating yoki DatabaseCache ishlating (python manage.py createcachetable)",
+            id='tours.E002',
+        )]
+    return []
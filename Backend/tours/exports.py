@@ -0,0 +1,67 @@
+"""
+Buyurtmalarni CSV yoki NDJSON ko'rinishida oqim bilan eksport qilish.
+
+Qatorlar bazadan ``iterator(chunk_size)`` bilan bo'laklab o'qiladi va
+darhol yoziladi, shuning uchun xotira sarfi buyurtmalar soniga bog'liq emas.
+"""
+import csv
+import io
+import json
+
+from django.conf import settings
+
+from .serializers import BookingRowSerializer
+
+
+# CSV ustunlari (BookingRowSerializer natijasi bilan bir xil tartibda)
+EXPORT_FIELDS = [
+    'id', 'tour', 'tour_title', 'tour_price', 'name', 'phone', 'email',
+    'payment_method', 'is_paid', 'status', 'hold_expires_at', 'created_at', 'updated_at',
+]
+
+# Shuncha qator yig'ilganda javobga bitta bo'lak yoziladi
+LINES_PER_CHUNK = 500
+
+
+def booking_rows(queryset, chunk_size=None):
+    """Buyurtmalarni (created_at, id) tartibida bo'laklab o'qish"""
+    chunk_size = chunk_size or settings.BOOKING_EXPORT_CHUNK_SIZE
+    serializer = BookingRowSerializer()
+    rows = (
+        queryset.order_by('created_at', 'id')
+        .values(*BookingRowSerializer.source_fields)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield serializer.to_representation(row)
+
+
+def render_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % LINES_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def render_ndjson(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) == LINES_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+# Format nomi -> (renderer, content type, fayl kengaytmasi)
+EXPORT_FORMATS = {
+    'csv': (render_csv, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (render_ndjson, 'application/x-ndjson', 'ndjson'),
+}
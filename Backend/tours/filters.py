@@ -0,0 +1,86 @@
+import datetime
+
+import django_filters
+from django.utils import timezone
+
+from .models import Booking, DailyBookingStat, TourPackage
+
+
+class TravelWindowFilter(django_filters.FilterSet):
+    """
+    Sayohat sanalari bo'yicha filtrlar. O'tib ketgan sayohatlar chiqarilmaydi:
+    pastki chegara bugungi sanadan kichik bo'lmaydi, shuning uchun so'rov
+    (is_active, start_date) indeksi bo'yicha oraliq sifatida bajariladi.
+    """
+    available_from = django_filters.DateFilter(method='filter_available_from', label="Jo'nash sanasidan")
+    available_to = django_filters.DateFilter(method='filter_available_to', label="Qaytish sanasigacha")
+    departs_within = django_filters.NumberFilter(
+        method='filter_departs_within',
+        label="N kun ichida jo'naydi",
+        min_value=0,
+        max_value=3650,
+    )
+
+    class Meta:
+        model = TourPackage
+        fields = ['available_from', 'available_to', 'departs_within']
+
+    def filter_available_from(self, queryset, name, value):
+        return queryset.filter(start_date__gte=max(value, timezone.localdate()))
+
+    def filter_available_to(self, queryset, name, value):
+        # start_date <= end_date bo'lgani uchun jo'nash sanasi ham shu oraliqda bo'ladi;
+        # bu ortiqcha shart indeksni ikki tomondan chegaralaydi
+        return queryset.filter(start_date__range=(timezone.localdate(), value), end_date__lte=value)
+
+    def filter_departs_within(self, queryset, name, value):
+        today = timezone.localdate()
+        return queryset.filter(start_date__range=(today, today + datetime.timedelta(days=int(value))))
+
+
+class TourPackageFilter(TravelWindowFilter):
+    """Sayohat paketlari ro'yxati uchun filtrlar"""
+
+    class Meta:
+        model = TourPackage
+        fields = ['location', 'duration', 'price', 'available_from', 'available_to', 'departs_within']
+
+
+class BookingFilter(django_filters.FilterSet):
+    """Buyurtmalar ro'yxati filtrlari (paket ID si bazadan tekshirilmaydi — ortiqcha so'rovsiz)"""
+    tour = django_filters.NumberFilter(field_name='tour_id', label='Sayohat paketi')
+
+    class Meta:
+        model = Booking
+        fields = ['tour', 'is_paid', 'payment_method']
+
+
+class BookingExportFilter(django_filters.FilterSet):
+    """Buyurtmalarni eksport qilish filtrlari (sanalar mahalliy vaqt bo'yicha, ikkala chegara ham kiradi)"""
+    created_from = django_filters.DateFilter(method='filter_created_from', label="Yaratilgan sanadan")
+    created_to = django_filters.DateFilter(method='filter_created_to', label="Yaratilgan sanagacha")
+
+    class Meta:
+        model = Booking
+        fields = ['created_from', 'created_to', 'is_paid', 'payment_method']
+
+    @staticmethod
+    def _day_start(value):
+        return timezone.make_aware(datetime.datetime.combine(value, datetime.time.min))
+
+    def filter_created_from(self, queryset, name, value):
+        return queryset.filter(created_at__gte=self._day_start(value))
+
+    def filter_created_to(self, queryset, name, value):
+        return queryset.filter(created_at__lt=self._day_start(value + datetime.timedelta(days=1)))
+
+
+class DailyBookingStatFilter(django_filters.FilterSet):
+    """Buyurtmalar hisobotlari filtrlari (ikkala sana chegarasi ham kiradi)"""
+    date_from = django_filters.DateFilter(field_name='date', lookup_expr='gte', label="Sanadan")
+    date_to = django_filters.DateFilter(field_name='date', lookup_expr='lte', label="Sanagacha")
+    tour = django_filters.NumberFilter(field_name='tour_id', label='Sayohat paketi')
+
+    class Meta:
+        model = DailyBookingStat
+        fields = ['date_from', 'date_to', 'tour', 'payment_method']
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_catalogue_version
+from .models import TourPackage
+
+
+logger = logging.getLogger(__name__)
+
+# Har bir format uchun kengaytma va saqlash parametrlari
+IMAGE_FORMATS = {
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('webp', {'format': 'WEBP', 'quality': 78, 'method': 4}),
+}
+
+
+def image_storage():
+    return TourPackage._meta.get_field('image').storage
+
+
+def source_hash(field_file):
+    """Asl rasm faylining SHA-256 xeshi"""
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def variant_name(digest, variant, extension):
+    """Variant fayl nomi asl rasm xeshidan olinadi, shuning uchun xesh o'zgarmasa qayta yaratilmaydi"""
+    return f'tour_images/variants/{digest[:2]}/{digest}/{variant}.{extension}'
+
+
+def render_variants(field_file, digest, force=False):
+    """Barcha o'lcham va formatdagi variantlarni yaratish (``force`` bo'lmasa mavjudlari qayta yaratilmaydi)"""
+    storage = image_storage()
+    variants = {}
+    source = None
+    sizes = settings.TOUR_IMAGE_VARIANTS.values()
+    largest = (max(w for w, h in sizes), max(h for w, h in sizes))
+    try:
+        for variant, size in settings.TOUR_IMAGE_VARIANTS.items():
+            variants[variant] = {}
+            for fmt, (extension, options) in IMAGE_FORMATS.items():
+                name = variant_name(digest, variant, extension)
+                exists = storage.exists(name)
+                if force or not exists:
+                    if source is None:
+                        field_file.open('rb')
+                        source = Image.open(field_file)
+                        # Katta JPEG fayllarni kerakli o'lchamga yaqin masshtabda o'qish
+                        source.draft('RGB', largest)
+                        source = ImageOps.exif_transpose(source).convert('RGB')
+                    image = source.copy()
+                    image.thumbnail(size, Image.Resampling.LANCZOS)
+                    buffer = io.BytesIO()
+                    image.save(buffer, **options)
+                    if exists:
+                        # Aks holda storage yangi faylga boshqa (tasodifiy) nom beradi
+                        storage.delete(name)
+                    storage.save(name, ContentFile(buffer.getvalue()))
+                variants[variant][fmt] = name
+    finally:
+        if source is not None:
+            field_file.close()
+    return variants
+
+
+def generate_image_variants(tour_id, force=False):
+    """Sayohat paketi rasmi uchun variantlarni yaratish (fon vazifasi)"""
+    tour = TourPackage.objects.filter(pk=tour_id).only('id', 'image', 'image_hash', 'image_variants').first()
+    if tour is None:
+        return
+
+    if not tour.image:
+        digest, variants = '', {}
+    else:
+        try:
+            digest = source_hash(tour.image)
+        except OSError:
+            logger.warning('Sayohat paketi #%s rasmi topilmadi: %s', tour_id, tour.image.name)
+            return
+        if digest == tour.image_hash and tour.image_variants and not force:
+            return
+        variants = render_variants(tour.image, digest, force=force)
+
+    # Rasm shu orada almashtirilgan bo'lsa, eski natija yozilmaydi; updated_at
+    # yangilanadi, aks holda Last-Modified/ETag eski variantlar uchun 304 beradi
+    updated = TourPackage.objects.filter(pk=tour_id, image=tour.image.name).update(
+        image_hash=digest, image_variants=variants, updated_at=timezone.now()
+    )
+    if updated:
+        transaction.on_commit(bump_catalogue_version)
+
+
+def variant_urls(variants, request=None):
+    """Saqlangan variant nomlarini (to'liq) URL manzillarga aylantirish"""
+    storage = image_storage()
+    urls = {}
+    for variant, formats in (variants or {}).items():
+        urls[variant] = {}
+        for fmt, name in formats.items():
+            url = storage.url(name)
+            urls[variant][fmt] = request.build_absolute_uri(url) if request is not None else url
+    return urls
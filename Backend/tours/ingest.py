@@ -0,0 +1,246 @@
+"""
+Kontakt xabarlarni write-behind rejimida qabul qilish.
+
+Tasdiqlangan xabar avval diskdagi spool fayliga (JSON Lines, fsync bilan)
+yoziladi va so'rov darhol javob oladi. Fon threadi xabarlarni paket hajmi
+yoki vaqt oralig'i bo'yicha ``bulk_create`` bilan bazaga yozadi.
+
+Har bir xabarda noyob ``receipt_id`` bor: qayta ishga tushganda spool qayta
+o'qilsa ham bir xabar ikki marta yozilmaydi. ``contact_id`` faqat bazaga
+yozilgandan keyin paydo bo'ladi va uni ``receipt_id`` orqali olish mumkin.
+
+Spool fayllari egasi (``<pid>-<ishga tushish vaqti>``) bo'yicha nomlanadi va
+egasi o'z ``.lock`` faylini ushlab turadi. Qulfi bo'sh fayllar (to'xtagan
+jarayonlar) flusher ishga tushganda yoki ``flush_contact_spool`` buyrug'i bilan
+olinadi. Buzilgan qatorlar ``.bad`` fayliga o'tkaziladi, qolgan xabarlar yoziladi.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .locks import hold_lock, is_locked
+from .models import ContactMessage
+from .sqlite import serialized_write
+
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIXES = ('.jsonl', '.flushing')
+
+
+class ContactSpool:
+    """Diskdagi navbat va uni bazaga paketlab yozuvchi fon threadi"""
+    prefix = 'contacts'
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # fork dan keyin ham chaqiriladi: bola jarayon o'z fayllari va qulfiga ega bo'ladi
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._owner = None
+        self._owner_lock = None
+
+    @property
+    def options(self):
+        return settings.CONTACT_WRITE_BEHIND
+
+    @property
+    def directory(self):
+        return Path(self.options['SPOOL_DIR'])
+
+    @property
+    def owner(self):
+        """Joriy jarayon fayllari egasi (PID qayta ishlatilsa ham noyob)"""
+        if self._owner is None:
+            self._owner = f'{os.getpid()}-{time.time_ns() // 1_000_000}'
+        return self._owner
+
+    def _lock_path(self, owner):
+        return self.directory / f'{self.prefix}-{owner}.lock'
+
+    def _hold_owner_lock(self):
+        if self._owner_lock is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._owner_lock = hold_lock(self._lock_path(self.owner))
+
+    def _active_path(self):
+        return self.directory / f'{self.prefix}-{self.owner}.jsonl'
+
+    def enqueue(self, data):
+        """Xabarni spool fayliga yozish va ``receipt_id`` qaytarish"""
+        receipt_id = str(uuid.uuid4())
+        payload = dict(data, receipt_id=receipt_id, sent_at=timezone.now().isoformat())
+        line = json.dumps(payload, ensure_ascii=False) + '\n'
+
+        with self._lock:
+            if self._file is None:
+                self._hold_owner_lock()
+                self._file = open(self._active_path(), 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self.options['FSYNC']:
+                os.fsync(self._file.fileno())
+            self._pending += 1
+            full = self._pending >= self.options['BATCH_SIZE']
+
+        if settings.TOURS_TASKS_EAGER:
+            self.flush()
+        else:
+            self._ensure_started()
+            if full:
+                self._wakeup.set()
+        return receipt_id
+
+    def start(self):
+        """Fon flusherini ishga tushirish: oldingi jarayonlardan qolgan fayllar darhol yoziladi"""
+        if settings.TOURS_TASKS_EAGER:
+            return
+        self._ensure_started()
+        self._wakeup.set()
+
+    def flush(self, claim_all=False):
+        """
+        Tayyor spool fayllarni bazaga yozish. To'xtagan jarayonlardan qolgan fayllar
+        ham olinadi; ``claim_all`` — ilova to'xtatilganda barcha fayllarni olish.
+        """
+        with self._flush_lock:
+            self._rotate()
+            written = 0
+            for path in self._claim(claim_all):
+                written += self._flush_file(path)
+            return written
+
+    def _rotate(self):
+        """Joriy faylni yopib, yozish uchun ``.flushing`` nomiga o'tkazish"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            self._pending = 0
+            os.replace(self._active_path(), self._flushing_path())
+
+    def _flushing_path(self):
+        return self.directory / f'{self.prefix}-{self.owner}-{time.time_ns()}.flushing'
+
+    @staticmethod
+    def _file_owner(path):
+        # contacts-<pid>-<start>.jsonl, contacts-<pid>-<start>-<ns>.flushing (eski: contacts-<pid>.jsonl)
+        return '-'.join(path.name.split('.')[0].split('-')[1:3])
+
+    def _claim(self, claim_all):
+        if not self.directory.exists():
+            return []
+        self._hold_owner_lock()
+        claimed, owners = [], set()
+        for path in sorted(self.directory.glob(f'{self.prefix}-*')):
+            if path.suffix not in SPOOL_SUFFIXES:
+                continue
+            owner = self._file_owner(path)
+            if owner == self.owner:
+                if path.suffix == '.flushing':
+                    claimed.append(path)
+                continue
+            if owner not in owners:
+                if not claim_all and is_locked(self._lock_path(owner)):
+                    continue
+                owners.add(owner)
+            # Boshqa jarayon bilan poyga bo'lsa, fayl faqat bittasiga o'tadi
+            target = self._flushing_path()
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        # To'xtagan jarayonlar qulf fayllari ham olib tashlanadi
+        for owner in owners:
+            if not is_locked(self._lock_path(owner)):
+                self._lock_path(owner).unlink(missing_ok=True)
+        return claimed
+
+    @staticmethod
+    def _message(payload):
+        return ContactMessage(
+            name=payload['name'],
+            email=payload['email'],
+            phone=payload['phone'],
+            message=payload['message'],
+            receipt_id=payload['receipt_id'],
+            sent_at=datetime.datetime.fromisoformat(payload['sent_at']),
+        )
+
+    def _flush_file(self, path):
+        messages, bad = [], []
+        with open(path, encoding='utf-8') as spool_file:
+            for line in spool_file:
+                if not line.strip():
+                    continue
+                try:
+                    messages.append(self._message(json.loads(line)))
+                except (ValueError, KeyError, TypeError):
+                    # Chala (jarayon yozish paytida to'xtagan) yoki buzilgan qator
+                    # qolgan xabarlarni to'xtatib qo'ymasligi kerak
+                    bad.append(line if line.endswith('\n') else line + '\n')
+        # receipt_id noyob: qayta o'qilgan xabarlar e'tiborsiz qoldiriladi
+        with serialized_write():
+            ContactMessage.objects.bulk_create(
+                messages, batch_size=self.options['BATCH_SIZE'], ignore_conflicts=True
+            )
+        if bad:
+            # Qo'lda ko'rib chiqish uchun: .bad fayllar spool sifatida qayta o'qilmaydi
+            bad_path = path.with_suffix('.bad')
+            with open(bad_path, 'a', encoding='utf-8') as bad_file:
+                bad_file.writelines(bad)
+            logger.warning('Spool faylidagi %d ta buzilgan qator %s ga o\'tkazildi', len(bad), bad_path)
+        os.remove(path)
+        return len(messages)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='tours-contact-spool', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.options['FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                # Fayllar diskda qoladi va keyingi urinishda qayta yoziladi
+                logger.exception('Kontakt xabarlarni bazaga yozib bo\'lmadi')
+            finally:
+                close_old_connections()
+
+
+contact_spool = ContactSpool()
+
+
+def _after_fork():
+    started = contact_spool._thread is not None
+    contact_spool._reset()
+    if started:
+        contact_spool.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,36 @@
+"""
+Jarayon tirikligini fayl qulfi (``flock``) orqali aniqlash.
+
+Jarayon o'z ``.lock`` faylini ishlayotgan davomida ushlab turadi; OS qulfni
+jarayon qanday to'xtashidan qat'i nazar bo'shatadi. PID tekshiruvidan farqli
+ravishda PID qayta ishlatilganda ham xato bermaydi.
+"""
+try:
+    import fcntl
+except ImportError:  # Windows: qulf yo'q, boshqa jarayonlar doim tirik deb hisoblanadi
+    fcntl = None
+
+
+def hold_lock(path):
+    """Qulfni olish va ochiq faylni qaytarish (yopilganda yoki jarayon tugaganda bo'shaydi)"""
+    handle = open(path, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            raise
+    return handle
+
+
+def is_locked(path):
+    """Qulf boshqa ochiq fayl (jarayon) tomonidan ushlab turilibdimi"""
+    if fcntl is None:
+        return True
+    with open(path, 'a') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(handle, fcntl.LOCK_UN)
+    return False
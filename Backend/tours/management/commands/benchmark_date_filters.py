@@ -0,0 +1,83 @@
+import datetime
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from tours.filters import TourPackageFilter
+from tours.models import TourPackage
+from tours.serializers import TourPackageCardSerializer
+
+
+class Command(BaseCommand):
+    help = "Sana oralig'i filtrlarini katta katalogda o'lchash (ma'lumotlar oxirida bekor qilinadi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Vaqtinchalik sayohat paketlari soni')
+        parser.add_argument('--repeat', type=int, default=5, help="Har bir so'rov necha marta bajariladi")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options['rows'], random.Random(options['seed']))
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {TourPackage._meta.db_table}')
+
+            today = timezone.localdate()
+            cases = [
+                ('available_from', {'available_from': (today + datetime.timedelta(days=30)).isoformat()}),
+                ('available_to', {'available_to': (today + datetime.timedelta(days=60)).isoformat()}),
+                ('oraliq', {
+                    'available_from': (today + datetime.timedelta(days=30)).isoformat(),
+                    'available_to': (today + datetime.timedelta(days=45)).isoformat(),
+                }),
+                ('departs_within', {'departs_within': '14'}),
+            ]
+            for name, params in cases:
+                self.measure(name, params, options['repeat'])
+
+            # Vaqtinchalik ma'lumotlar saqlanmaydi
+            transaction.set_rollback(True)
+
+    def populate(self, rows, rng):
+        self.stdout.write(f'{rows} ta vaqtinchalik sayohat paketi yaratilmoqda...')
+        today = timezone.localdate()
+        batch = []
+        for number in range(rows):
+            start = today + datetime.timedelta(days=rng.randint(-730, 730))
+            duration = rng.randint(2, 21)
+            batch.append(TourPackage(
+                title=f'Benchmark sayohati {number}',
+                description='Benchmark uchun vaqtinchalik yozuv',
+                location=f'Manzil {number % 200}',
+                start_date=start,
+                end_date=start + datetime.timedelta(days=duration),
+                price=rng.randint(1, 200) * 100000,
+                duration=duration,
+                is_active=rng.random() < 0.9,
+            ))
+            if len(batch) == 5000:
+                TourPackage.objects.bulk_create(batch)
+                batch = []
+        TourPackage.objects.bulk_create(batch)
+
+    def measure(self, name, params, repeat):
+        queryset = TourPackageFilter(params, queryset=TourPackage.objects.filter(is_active=True)).qs
+        page = queryset.values(*TourPackageCardSerializer.source_fields)[:20]
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            total = queryset.count()
+            list(page)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        plan = page.explain()
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{name}: {params}'))
+        self.stdout.write(f'  natijalar: {total}, mediana: {statistics.median(timings):.2f} ms (count + 20 qator)')
+        for line in plan.splitlines():
+            self.stdout.write(f'  {line}')
+        if 'tour_active_' not in plan:
+            self.stdout.write(self.style.WARNING("  Diqqat: so'rov sana indeksidan foydalanmadi"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from tours.models import Booking
+from tours.sqlite import serialized_write
+
+
+class Command(BaseCommand):
+    help = "Band qilish muddati o'tgan to'lanmagan buyurtmalarni bekor qilib, joylarni paketlarga qaytarish (cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Bitta tranzaksiyadagi buyurtmalar soni')
+
+    def handle(self, *args, **options):
+        expired = 0
+        while True:
+            pks = list(Booking.objects.expired_holds().values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+            # Shu orada to'langan buyurtmalar release ichidagi qayta tekshiruvdan o'tmaydi
+            with serialized_write():
+                expired += Booking.objects.expired_holds().filter(pk__in=pks).release('expired')
+        self.stdout.write(self.style.SUCCESS(f"{expired} ta buyurtmaning band qilish muddati tugadi!"))
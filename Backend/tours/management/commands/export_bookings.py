@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from tours.exports import EXPORT_FORMATS, booking_rows
+from tours.filters import BookingExportFilter
+from tours.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Buyurtmalarni CSV yoki NDJSON faylga oqim bilan eksport qilish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=list(EXPORT_FORMATS), default='csv', help='Eksport formati')
+        parser.add_argument('--file', help="Natija fayli (ko'rsatilmasa stdout)")
+        parser.add_argument('--from', dest='created_from', help='Yaratilgan sanadan (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='created_to', help='Yaratilgan sanagacha (YYYY-MM-DD)')
+        parser.add_argument('--is-paid', choices=['true', 'false'], help="To'langan/to'lanmagan buyurtmalar")
+        parser.add_argument('--payment-method', choices=[code for code, label in Booking.PAYMENT_METHODS])
+        parser.add_argument('--chunk-size', type=int, help="Bazadan bir martada o'qiladigan qatorlar soni")
+
+    def handle(self, *args, **options):
+        params = {
+            name: options[name]
+            for name in ('created_from', 'created_to', 'is_paid', 'payment_method')
+            if options[name]
+        }
+        filterset = BookingExportFilter(params, queryset=Booking.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        render = EXPORT_FORMATS[options['output']][0]
+        chunks = render(booking_rows(filterset.qs, options['chunk_size']))
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8', newline='') as export_file:
+                export_file.writelines(chunks)
+            self.stderr.write(self.style.SUCCESS(f"Eksport yozildi: {options['file']}"))
+        else:
+            sys.stdout.writelines(chunks)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from tours.ingest import contact_spool
+
+
+class Command(BaseCommand):
+    help = 'Spooldagi kontakt xabarlarni bazaga yozish'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Ishlayotgan jarayonlarning fayllarini ham olish (faqat ilova to'xtatilganda)",
+        )
+
+    def handle(self, *args, **options):
+        written = contact_spool.flush(claim_all=options['all'])
+        self.stdout.write(self.style.SUCCESS(f'{written} ta xabar bazaga yozildi!'))
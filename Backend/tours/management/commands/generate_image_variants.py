@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from tours.images import generate_image_variants
+from tours.models import TourPackage
+
+
+class Command(BaseCommand):
+    help = 'Sayohat paketlari rasmlari uchun variantlarni (card, slider, detail, WebP) yaratish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Xesh o\'zgarmagan bo\'lsa ham qayta yaratish')
+
+    def handle(self, *args, **options):
+        tour_ids = TourPackage.objects.exclude(image='').values_list('id', flat=True)
+        processed = 0
+        for tour_id in tour_ids.iterator():
+            generate_image_variants(tour_id, force=options['force'])
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f'{processed} ta sayohat paketi rasmlari qayta ishlandi!'))
@@ -0,0 +1,198 @@
+import datetime
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from tours import popularity
+from tours.cache import bump_catalogue_version
+from tours.models import Booking, ContactMessage, PaymentTransaction, TourPackage
+
+
+DESTINATIONS = [
+    ('Parij', 'Fransiya'), ('Tokio', 'Yaponiya'), ('Dubai', 'Birlashgan Arab Amirliklari'),
+    ('Istanbul', 'Turkiya'), ('Bali', 'Indoneziya'), ('Samarqand', "O'zbekiston"),
+    ('Buxoro', "O'zbekiston"), ('Xiva', "O'zbekiston"), ('Rim', 'Italiya'), ('Barselona', 'Ispaniya'),
+    ('Qohira', 'Misr'), ('Bangkok', 'Tailand'), ('Seul', 'Janubiy Koreya'), ('Praga', 'Chexiya'),
+    ('Antaliya', 'Turkiya'), ('Kuala-Lumpur', 'Malayziya'), ('Tbilisi', 'Gruziya'), ('Baku', 'Ozarbayjon'),
+]
+KINDS = ['sayohati', 'dam olish', 'ekskursiyasi', 'oilaviy tur', 'hafta oxiri', 'premium tur']
+FIRST_NAMES = ['Aziz', 'Malika', 'Dilshod', 'Gulnora', 'Jasur', 'Nigora', 'Sardor', 'Madina', 'Bekzod', 'Zarina']
+LAST_NAMES = ['Karimov', 'Yusupova', 'Rahimov', 'Karimova', 'Tursunov', 'Aliyeva', 'Qodirov', 'Ismoilova']
+PAYMENT_METHODS = [code for code, label in Booking.PAYMENT_METHODS]
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """auto_now/auto_now_add vaqtincha o'chiriladi, shunda sanalar generator bergan qiymatda qoladi"""
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    setattr(field, flag, False)
+                    changed.append((field, flag))
+    try:
+        yield
+    finally:
+        for field, flag in changed:
+            setattr(field, flag, True)
+
+
+class Command(BaseCommand):
+    help = "Yuklama va masshtab testlari uchun katta hajmdagi sintetik ma'lumotlar yaratish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tours', type=int, default=1000, help='Sayohat paketlari soni')
+        parser.add_argument('--bookings-per-tour', type=float, default=100, help="Bitta paketga o'rtacha buyurtmalar")
+        parser.add_argument('--skew', type=float, default=1.1, help='Mashhurlik taqsimoti (Zipf) darajasi, 0 — teng')
+        parser.add_argument('--paid-ratio', type=float, default=0.6, help="To'langan buyurtmalar ulushi")
+        parser.add_argument('--contacts', type=int, default=10000, help='Kontakt xabarlar soni')
+        parser.add_argument('--days', type=int, default=365, help="Yaratilgan sanalar necha kunga yoyiladi")
+        parser.add_argument('--inactive-ratio', type=float, default=0.1, help='Nofaol paketlar ulushi')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Bitta INSERT dagi qatorlar soni')
+        parser.add_argument('--seed', type=int, default=42, help='Takrorlanuvchi natija uchun seed')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['paid_ratio'] <= 1 or not 0 <= options['inactive_ratio'] <= 1:
+            raise CommandError("Ulushlar 0 va 1 oralig'ida bo'lishi kerak")
+        if options['tours'] < 1 or options['days'] < 1:
+            raise CommandError("--tours va --days musbat bo'lishi kerak")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        with explicit_timestamps(TourPackage, Booking, PaymentTransaction):
+            tours = self.create_tours(options)
+            self.create_bookings(tours, options)
+            self.create_contacts(options)
+
+        # bulk_create hisoblagichlarni yangilamaydi
+        created = TourPackage.objects.filter(pk__in=[tour.pk for tour in tours])
+        created.reconcile_stats()
+        popularity.rebuild(created)
+        transaction.on_commit(bump_catalogue_version)
+        self.stdout.write(self.style.SUCCESS(
+            f"Sintetik ma'lumotlar {time.monotonic() - started:.1f} soniyada yaratildi!"
+        ))
+
+    def random_moment(self, days):
+        return self.now - datetime.timedelta(seconds=self.rng.uniform(0, days * 86400))
+
+    def write(self, model, objects):
+        with transaction.atomic():
+            return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def progress(self, label, done, total, started):
+        rate = done / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f'  {label}: {done}/{total} ({rate:,.0f} qator/s)')
+
+    def create_tours(self, options):
+        rng, days, count = self.rng, options['days'], options['tours']
+        self.stdout.write(f'{count} ta sayohat paketi yaratilmoqda...')
+        today = timezone.localdate()
+        tours = []
+        for number in range(count):
+            city, country = rng.choice(DESTINATIONS)
+            duration = rng.randint(3, 14)
+            start = today + datetime.timedelta(days=rng.randint(-days // 2, days))
+            created = self.random_moment(days)
+            tours.append(TourPackage(
+                title=f'{city} {rng.choice(KINDS)} #{number + 1}',
+                description=f"{city} ({country}) bo'ylab {duration} kunlik sayohat. Mehmonxona, transfer va ekskursiyalar.",
+                location=f'{city}, {country}',
+                start_date=start,
+                end_date=start + datetime.timedelta(days=duration),
+                price=Decimal(rng.randint(20, 300) * 100000),
+                duration=duration,
+                is_active=rng.random() >= options['inactive_ratio'],
+                created_at=created,
+                updated_at=created,
+            ))
+        return self.write(TourPackage, tours)
+
+    def create_bookings(self, tours, options):
+        rng = self.rng
+        total = int(len(tours) * options['bookings_per_tour'])
+        self.stdout.write(f'{total} ta buyurtma yaratilmoqda (Zipf s={options["skew"]})...')
+
+        # Mashhurlik: tasodifiy tartibdagi paketlarga 1/rank^s og'irlik
+        ranked = tours[:]
+        rng.shuffle(ranked)
+        cumulative = list(itertools.accumulate(1 / (rank ** options['skew']) for rank in range(1, len(ranked) + 1)))
+
+        hold_period = datetime.timedelta(seconds=settings.BOOKING_HOLD_SECONDS)
+        started, done = time.monotonic(), 0
+        report_every = max(total // 10, 1)
+        while done < total:
+            size = min(self.batch_size, total - done)
+            bookings, prices = [], []
+            for tour in rng.choices(ranked, cum_weights=cumulative, k=size):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                created = max(self.random_moment(options['days']), tour.created_at)
+                booking = Booking(
+                    tour_id=tour.pk,
+                    name=f'{first} {last}',
+                    phone=f'+99890{rng.randrange(10 ** 7):07d}',
+                    email=f'{first.lower()}.{last.lower()}{rng.randrange(10000)}@example.com',
+                    payment_method=rng.choice(PAYMENT_METHODS),
+                    is_paid=rng.random() < options['paid_ratio'],
+                    created_at=created,
+                    updated_at=created,
+                )
+                # To'lanmaganlari band qilingan (muddati expire_booking_holds bilan tugaydi)
+                if booking.is_paid:
+                    booking.status = 'confirmed'
+                else:
+                    booking.hold_expires_at = created + hold_period
+                bookings.append(booking)
+                prices.append(tour.price)
+
+            with transaction.atomic():
+                Booking.objects.bulk_create(bookings)
+                # To'langan buyurtmalar uchun tasdiqlangan tranzaksiyalar
+                PaymentTransaction.objects.bulk_create([
+                    PaymentTransaction(
+                        booking_id=booking.pk,
+                        payment_method=booking.payment_method,
+                        transaction_id=f'gen-{options["seed"]}-{booking.pk}',
+                        amount=price,
+                        status='confirmed',
+                        created_at=booking.created_at,
+                    )
+                    for booking, price in zip(bookings, prices) if booking.is_paid
+                ], batch_size=self.batch_size)
+
+            previous, done = done, done + size
+            if done // report_every != previous // report_every or done == total:
+                self.progress('buyurtmalar', done, total, started)
+
+    def create_contacts(self, options):
+        rng, total = self.rng, options['contacts']
+        self.stdout.write(f'{total} ta kontakt xabar yaratilmoqda...')
+        started, done = time.monotonic(), 0
+        while done < total:
+            size = min(self.batch_size, total - done)
+            messages = []
+            for _ in range(size):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                city = rng.choice(DESTINATIONS)[0]
+                messages.append(ContactMessage(
+                    name=f'{first} {last}',
+                    email=f'{first.lower()}{rng.randrange(10000)}@example.com',
+                    phone=f'+99891{rng.randrange(10 ** 7):07d}',
+                    message=f"{city} sayohati haqida ma'lumot kerak.",
+                    sent_at=self.random_moment(options['days']),
+                    is_read=rng.random() < 0.5,
+                ))
+            self.write(ContactMessage, messages)
+            done += size
+        if total:
+            self.progress('kontakt xabarlar', done, total, started)
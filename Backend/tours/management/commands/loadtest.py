@@ -0,0 +1,265 @@
+import json
+import logging
+import math
+import random
+import subprocess
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+from tours.models import Booking, TourPackage
+
+
+# Ssenariy nomi -> standart og'irlik
+DEFAULT_MIX = {
+    'list': 40,
+    'detail': 25,
+    'search': 15,
+    'booking': 10,
+    'payment': 5,
+    'contact': 5,
+}
+
+SEARCH_TERMS = ['parij', 'tokio', 'dubai', 'bali', 'samarqand', 'dengiz', 'sayohat', 'tur']
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank usulida kvantil"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(q * len(sorted_values)) - 1, 0)]
+
+
+class VirtualUser:
+    """Bitta threaddagi foydalanuvchi: o'z Client'i va tasodifiy generatori bilan"""
+
+    def __init__(self, command, seed):
+        self.command = command
+        self.rng = random.Random(seed)
+        self.client = Client(HTTP_HOST=command.host, raise_request_exception=False)
+
+    def request(self, endpoint, method, path, data=None):
+        started = time.perf_counter()
+        if method == 'get':
+            response = self.client.get(path, data)
+        else:
+            response = self.client.post(path, data, content_type='application/json')
+        self.command.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response
+
+    def run_scenario(self, name):
+        getattr(self, f'scenario_{name}')()
+
+    def scenario_list(self):
+        params = {'page': self.rng.choice([1, 1, 1, 2, 3])}
+        if self.rng.random() < 0.3:
+            params['ordering'] = self.rng.choice(['price', '-price', 'duration'])
+        self.request('tour-list', 'get', '/api/tours/', params)
+
+    def scenario_detail(self):
+        self.request('tour-retrieve', 'get', f'/api/tours/{self.rng.choice(self.command.tour_ids)}/')
+
+    def scenario_search(self):
+        params = {'q': self.rng.choice(SEARCH_TERMS)}
+        if self.rng.random() < 0.5:
+            params['max_price'] = self.rng.choice([5000000, 10000000, 20000000])
+        if self.rng.random() < 0.3:
+            params['departs_within'] = self.rng.choice([30, 90, 180])
+        self.request('tour-search', 'get', '/api/tours/search/', params)
+
+    def create_booking(self):
+        response = self.request('booking-create', 'post', '/api/bookings/', {
+            'tour': self.rng.choice(self.command.tour_ids),
+            'name': 'Yuklama Test',
+            'phone': f'+99890{self.rng.randrange(10 ** 7):07d}',
+            'email': 'loadtest@example.com',
+            'payment_method': self.rng.choice([code for code, label in Booking.PAYMENT_METHODS]),
+        })
+        return response.json() if response.status_code == 201 else None
+
+    def scenario_booking(self):
+        self.create_booking()
+
+    def scenario_payment(self):
+        booking = self.create_booking()
+        if booking is None:
+            return
+        self.request(
+            'booking-verify-payment', 'post', f'/api/bookings/{booking["booking_id"]}/verify-payment/', {
+                'booking_id': booking['booking_id'],
+                'payment_method': booking['payment_method'],
+                'transaction_id': f'loadtest-{uuid.uuid4()}',
+                'amount': str(booking['amount']),
+                'status': 'success',
+            }
+        )
+
+    def scenario_contact(self):
+        self.request('contact-create', 'post', '/api/contact/', {
+            'name': 'Yuklama Test',
+            'email': 'loadtest@example.com',
+            'phone': f'+99891{self.rng.randrange(10 ** 7):07d}',
+            'message': "Yuklama testi uchun xabar",
+        })
+
+
+class Command(BaseCommand):
+    help = "API ni lokal ravishda (haqiqiy URLconf orqali) yuklama ostida o'lchash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel foydalanuvchilar (threadlar) soni')
+        parser.add_argument('--duration', type=float, default=30, help="Test davomiyligi (soniya)")
+        parser.add_argument('--warmup', type=float, default=3, help="Natijaga kirmaydigan qizdirish vaqti (soniya)")
+        parser.add_argument(
+            '--mix',
+            default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+            help="Ssenariylar og'irligi, masalan: list=50,detail=30,search=20 (yozuvsiz test uchun)",
+        )
+        parser.add_argument('--host', default='localhost', help='HTTP Host sarlavhasi')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Natijalar JSON fayli (commitlar orasida solishtirish uchun)')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        self.host = options['host']
+        self.tour_ids = list(TourPackage.objects.filter(is_active=True).values_list('id', flat=True))
+        if not self.tour_ids:
+            raise CommandError("Faol sayohat paketlari yo'q: avval generate_load_data ni ishga tushiring")
+        if any(name in mix for name in ('booking', 'payment', 'contact')):
+            self.stdout.write(self.style.WARNING("Diqqat: test bazaga buyurtma va xabarlar yozadi"))
+
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.recording = False
+        stop = threading.Event()
+        scenarios, weights = list(mix), list(mix.values())
+
+        def worker(number):
+            user = VirtualUser(self, options['seed'] * 1000 + number)
+            try:
+                while not stop.is_set():
+                    user.run_scenario(user.rng.choices(scenarios, weights)[0])
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(options['concurrency'])]
+        self.stdout.write(
+            f"{options['concurrency']} ta foydalanuvchi, {options['duration']:.0f} s "
+            f"(+{options['warmup']:.0f} s qizdirish), ssenariylar: {options['mix']}"
+        )
+        # Xatolar natijada sanaladi, har biri uchun traceback chiqarilmaydi
+        request_logger = logging.getLogger('django.request')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        for thread in threads:
+            thread.start()
+        time.sleep(options['warmup'])
+        with self.lock:
+            self.recording = True
+        started = time.perf_counter()
+        time.sleep(options['duration'])
+        with self.lock:
+            self.recording = False
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+        request_logger.setLevel(previous_level)
+
+        results = self.summarize(elapsed, options)
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Natijalar yozildi: {options['output']}"))
+
+    def parse_mix(self, value):
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in DEFAULT_MIX:
+                raise CommandError(f"Noma'lum ssenariy: {name} (mumkin: {', '.join(DEFAULT_MIX)})")
+            try:
+                mix[name] = float(weight)
+            except ValueError:
+                raise CommandError(f"Noto'g'ri og'irlik: {item}")
+        mix = {name: weight for name, weight in mix.items() if weight > 0}
+        if not mix:
+            raise CommandError("Kamida bitta ssenariy og'irligi musbat bo'lishi kerak")
+        return mix
+
+    def record(self, endpoint, duration, status_code):
+        with self.lock:
+            if not self.recording:
+                return
+            samples = self.samples.setdefault(endpoint, {'latencies': [], 'errors': 0, 'statuses': {}})
+            samples['latencies'].append(duration)
+            samples['statuses'][status_code] = samples['statuses'].get(status_code, 0) + 1
+            if status_code >= 500 or status_code in (408, 429):
+                samples['errors'] += 1
+
+    def summarize(self, elapsed, options):
+        endpoints = {}
+        all_latencies = []
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = sorted(samples['latencies'])
+            all_latencies.extend(latencies)
+            endpoints[endpoint] = self.stats(latencies, elapsed)
+            endpoints[endpoint]['errors'] = samples['errors']
+            endpoints[endpoint]['statuses'] = {str(code): count for code, count in sorted(samples['statuses'].items())}
+        total = self.stats(sorted(all_latencies), elapsed)
+        total['errors'] = sum(samples['errors'] for samples in self.samples.values())
+        return {
+            'started_at': timezone.now().isoformat(),
+            'commit': self.git_commit(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'options': {
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'warmup': options['warmup'],
+                'mix': self.parse_mix(options['mix']),
+                'seed': options['seed'],
+            },
+            'elapsed': round(elapsed, 3),
+            'total': total,
+            'endpoints': endpoints,
+        }
+
+    @staticmethod
+    def stats(latencies, elapsed):
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+        return {
+            'requests': len(latencies),
+            'throughput': round(len(latencies) / elapsed, 2) if elapsed else 0,
+            'p50_ms': ms(percentile(latencies, 0.50)),
+            'p95_ms': ms(percentile(latencies, 0.95)),
+            'p99_ms': ms(percentile(latencies, 0.99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+        }
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def report(self, results):
+        header = f"{'endpoint':<26}{'soni':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'xato':>7}"
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        rows = list(results['endpoints'].items()) + [('JAMI', results['total'])]
+        for endpoint, stats in rows:
+            self.stdout.write(
+                f"{endpoint:<26}{stats['requests']:>8}{stats['throughput']:>9}"
+                f"{stats['p50_ms'] or 0:>9}{stats['p95_ms'] or 0:>9}{stats['p99_ms'] or 0:>9}{stats['errors']:>7}"
+            )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from tours.payments import process_pending
+
+
+class Command(BaseCommand):
+    help = "Saqlangan, lekin hali qayta ishlanmagan to'lov callbacklarini yakunlash (cron yoki qayta ishga tushgandan keyin)"
+
+    def handle(self, *args, **options):
+        processed = process_pending()
+        self.stdout.write(self.style.SUCCESS(f"{processed} ta to'lov callbacki qayta ishlandi!"))
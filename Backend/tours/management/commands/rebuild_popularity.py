@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from tours import popularity
+from tours.models import TourPackage
+
+
+class Command(BaseCommand):
+    help = "Featured reytingi ballarini buyurtmalar tarixidan qayta hisoblash (EPOCH o'zgarganda yoki boshlang'ich to'ldirish)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tour', type=int, action='append', help='Faqat shu paket(lar) ID si')
+
+    def handle(self, *args, **options):
+        tours = TourPackage.objects.all()
+        if options['tour']:
+            tours = tours.filter(pk__in=options['tour'])
+        scored = popularity.rebuild(tours)
+        self.stdout.write(self.style.SUCCESS(f'{scored} ta paket mashhurligi qayta hisoblandi!'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from tours.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Sayohat paketlari qidiruv indeksini qayta qurish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Baza nomi')
+
+    def handle(self, *args, **options):
+        rebuild_search_index(connections[options['database']])
+        self.stdout.write(self.style.SUCCESS('Qidiruv indeksi qayta qurildi!'))
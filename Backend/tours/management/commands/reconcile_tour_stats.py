@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from tours.models import TourPackage
+
+
+class Command(BaseCommand):
+    help = "Sayohat paketlari buyurtmalar hisoblagichlari va bo'sh joylarini qayta hisoblash (daromad joriy narx bo'yicha)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tour', type=int, action='append', help='Faqat shu paket(lar) ID si')
+
+    def handle(self, *args, **options):
+        tours = TourPackage.objects.all()
+        if options['tour']:
+            tours = tours.filter(pk__in=options['tour'])
+        fixed = tours.reconcile_stats()
+        seats = tours.filter(capacity__isnull=False).reconcile_seats()
+        tours.filter(capacity__isnull=True, seats_remaining__isnull=False).update(seats_remaining=None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{fixed} ta paket hisoblagichlari tuzatildi, {seats} ta paket bo'sh joylari qayta hisoblandi!"
+        ))
@@ -0,0 +1,23 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from tours import rollups
+
+
+class Command(BaseCommand):
+    help = "Kunlik buyurtmalar yig'ma jadvalini o'zgargan buyurtmalar bo'yicha yangilash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Jadvalni butunlay qayta qurish")
+        parser.add_argument(
+            '--since',
+            type=datetime.date.fromisoformat,
+            help="Shu sanadan (YYYY-MM-DD) boshlab qayta qurish (masalan, buyurtmalar o'chirilgandan keyin)",
+        )
+
+    def handle(self, *args, **options):
+        if options['full'] or options['since']:
+            days = rollups.rebuild(since=options['since'])
+        else:
+            days = rollups.refresh()
+        self.stdout.write(self.style.SUCCESS(f'{days} kunlik statistika yangilandi!'))
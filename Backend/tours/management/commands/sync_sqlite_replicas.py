@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = "Lokal sinov uchun: asosiy SQLite bazasini replika fayllariga nusxalash (replikatsiya o'rniga)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help="Shuncha soniyada bir takrorlash (replikatsiya kechikishini taqlid qilish); 0 — bir marta",
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Faqat SQLite uchun: PostgreSQL replikalari streaming replikatsiya bilan yangilanadi')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("Replikalar sozlanmagan: DB_REPLICAS muhit o'zgaruvchisini bering")
+
+        while True:
+            self.sync(primary)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, primary):
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'{alias}: {settings.DATABASES[alias]["NAME"]}')
+        self.stdout.write(self.style.SUCCESS('Replikalar yangilandi!'))
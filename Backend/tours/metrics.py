@@ -0,0 +1,262 @@
+"""
+Prometheus formatidagi metrikalar.
+
+Har bir jarayon metrikalarni xotirada yig'adi (lock ostida oddiy qo'shish)
+va har ``FLUSH_INTERVAL`` soniyada (hamda chiqishda) ``METRICS['DIRECTORY']`` ga
+o'z snapshot faylini yozadi: ``metrics-<pid>-<ishga tushish vaqti>.json``.
+Jarayon tirikligini shu nomdagi ``.lock`` fayldagi ``flock`` bildiradi.
+``/metrics`` endpointi barcha jarayonlar fayllarini qo'shib chiqaradi; to'xtagan
+jarayonlar fayllari ``aggregate.json`` ga qo'shilib o'chiriladi, shuning uchun
+counterlar workerlar qayta ishga tushganda kamaymaydi va fayllar to'planib qolmaydi.
+"""
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .locks import fcntl, hold_lock, is_locked
+
+
+logger = logging.getLogger(__name__)
+
+# Metrika nomi -> (turi, tavsifi)
+METRICS = {
+    'tours_http_requests_total': ('counter', "So'rovlar soni (endpoint va status sinfi bo'yicha)"),
+    'tours_http_errors_total': ('counter', "Server xatolari (5xx) soni"),
+    # Kvantillar Prometheus tomonida: histogram_quantile(0.95, rate(..._bucket[5m]))
+    'tours_http_request_duration_seconds': ('histogram', "So'rovlar davomiyligi"),
+    'tours_bookings_created_total': ('counter', "Yaratilgan buyurtmalar soni"),
+    'tours_payments_verified_total': ('counter', "Tekshirilgan to'lovlar soni (to'lov usuli va natija bo'yicha)"),
+}
+
+# To'xtagan jarayonlar metrikalari yig'indisi
+AGGREGATE_FILE = 'aggregate.json'
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Registry:
+    """Jarayon ichidagi metrikalar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._flushed = time.monotonic()
+        self._pid = None
+        self._name = None
+        self._alive = None
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        buckets = settings.METRICS['BUCKETS']
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram['buckets'][bisect.bisect_left(buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'buckets': list(settings.METRICS['BUCKETS']),
+                'counters': dict(self.counters),
+                'histograms': {
+                    key: dict(value, buckets=list(value['buckets'])) for key, value in self.histograms.items()
+                },
+            }
+
+    def identity(self):
+        """Snapshot fayli nomi (PID + ishga tushish vaqti, PID qayta ishlatilsa ham noyob)"""
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                if self._pid is not None:
+                    # fork: ota jarayon qiymatlari va qulf fayli bolaga o'tmaydi
+                    self.counters, self.histograms = {}, {}
+                    if self._alive is not None:
+                        self._alive.close()
+                        self._alive = None
+                self._pid = pid
+                self._name = f'metrics-{pid}-{int(time.time() * 1000)}'
+        return self._name
+
+    def _hold_alive(self, directory, name):
+        # Qulf jarayon tugaguncha ushlab turiladi (OS uni o'zi bo'shatadi)
+        path = str(directory / f'{name}.lock')
+        if fcntl is None or (self._alive is not None and self._alive.name == path):
+            return
+        handle = hold_lock(path)
+        if self._alive is not None:
+            self._alive.close()
+        self._alive = handle
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._flushed >= settings.METRICS['FLUSH_INTERVAL']:
+            self.flush()
+
+    def flush(self):
+        """Snapshotni jarayon fayliga atomar yozish"""
+        # Boshqa thread allaqachon yozayotgan bo'lsa kutilmaydi
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._flushed = time.monotonic()
+            name = self.identity()
+            directory = Path(settings.METRICS['DIRECTORY'])
+            directory.mkdir(parents=True, exist_ok=True)
+            self._hold_alive(directory, name)
+            _write_json(directory / f'{name}.json', self.snapshot())
+        except OSError:
+            # Metrikalar so'rovlarni to'xtatmasligi kerak; keyingi urinishda yoziladi
+            logger.exception('Metrikalar snapshotini yozib bo\'lmadi')
+        finally:
+            self._flush_lock.release()
+
+    def flush_at_exit(self):
+        if self.counters or self.histograms:
+            self.flush()
+
+
+registry = Registry()
+# Oxirgi FLUSH_INTERVAL dagi qiymatlar jarayon to'xtaganda yo'qolmasligi uchun
+atexit.register(registry.flush_at_exit)
+
+
+def _write_json(path, data):
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_dead(directory, own):
+    """To'xtagan jarayonlar snapshotlarini ``aggregate.json`` ga qo'shib, fayllarini o'chirish"""
+    dead = [
+        path for path in sorted(directory.glob('metrics-*.json'))
+        if path.name != own and not is_locked(path.with_suffix('.lock'))
+    ]
+    if not dead:
+        return
+    path = directory / AGGREGATE_FILE
+    aggregate = _read_json(path) or {}
+    # O'chirishdan oldin to'xtab qolgan birlashtirish fayllarni ikkinchi marta qo'shmaydi
+    merged = set(aggregate.get('merged', []))
+    snapshots = [aggregate] + [_read_json(snapshot) for snapshot in dead if snapshot.name not in merged]
+    buckets, counters, histograms = _merge(filter(None, snapshots))
+    result = {'buckets': buckets, 'counters': counters, 'histograms': histograms}
+    _write_json(path, dict(result, merged=sorted(merged | {snapshot.name for snapshot in dead})))
+    for snapshot in dead:
+        snapshot.unlink(missing_ok=True)
+        snapshot.with_suffix('.lock').unlink(missing_ok=True)
+    _write_json(path, dict(result, merged=[]))
+
+
+def collect():
+    """Barcha jarayonlar snapshotlarini qo'shish (joriy jarayon uchun xotiradagi qiymatlar)"""
+    own = f'{registry.identity()}.json'
+    snapshots = [registry.snapshot()]
+    directory = Path(settings.METRICS['DIRECTORY'])
+    if directory.exists():
+        with open(directory / 'aggregate.lock', 'a') as lock:
+            # Birlashtirish va o'qish bitta qulf ostida: hech bir fayl ikki marta sanalmaydi
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                _merge_dead(directory, own)
+            paths = [path for path in directory.glob('metrics-*.json') if path.name != own]
+            snapshots.extend(_read_json(path) for path in paths + [directory / AGGREGATE_FILE])
+    return _merge(filter(None, snapshots))
+
+
+def _merge(snapshots):
+    """Snapshotlarni qo'shish: (buckets, counters, histograms)"""
+    buckets = list(settings.METRICS['BUCKETS'])
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        # Bucket chegaralari o'zgargan eski fayllardagi histogrammalar tashlab yuboriladi
+        same_buckets = snapshot.get('buckets') == buckets
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in snapshot['histograms'].items():
+            if not same_buckets:
+                continue
+            merged = histograms.setdefault(key, {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0})
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], value['buckets'])]
+            merged['sum'] += value['sum']
+            merged['count'] += value['count']
+    return buckets, counters, histograms
+
+
+def _labels(items, **extra):
+    items = list(items) + sorted(extra.items())
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + '}'
+
+
+def render_metrics():
+    """Prometheus text formati (0.0.4)"""
+    buckets, counters, histograms = collect()
+    series = {name: [] for name in METRICS}
+
+    for key, value in sorted(counters.items()):
+        name, labels = json.loads(key)
+        series[name].append(f'{name}{_labels(labels)} {value}')
+
+    for key, histogram in sorted(histograms.items()):
+        name, labels = json.loads(key)
+        cumulative = 0
+        for bound, count in zip(buckets + ['+Inf'], histogram['buckets']):
+            cumulative += count
+            series[name].append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        series[name].append(f'{name}_sum{_labels(labels)} {histogram["sum"]}')
+        series[name].append(f'{name}_count{_labels(labels)} {histogram["count"]}')
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(series[name])
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus uchun metrikalar (faqat ruxsat etilgan lokal manzillardan)"""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS['ALLOWED_IPS']:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def record_request(endpoint, response, duration):
+    """So'rov soni, xatolar va davomiylikni yozish (har bir so'rov uchun)"""
+    status_class = f'{response.status_code // 100}xx'
+    registry.inc('tours_http_requests_total', endpoint=endpoint, status=status_class)
+    if response.status_code >= 500:
+        registry.inc('tours_http_errors_total', endpoint=endpoint)
+    registry.observe('tours_http_request_duration_seconds', duration, endpoint=endpoint)
@@ -0,0 +1,280 @@
+"""
+So'rovlar bo'yicha ishlash vaqtini o'lchash.
+
+Barcha so'rovlar soni va davomiyligi ``tours.metrics`` ga yoziladi.
+Tanlangan (sampling) so'rovlar uchun SQL so'rovlar soni va vaqti, eng sekin
+SQL so'rovlar, view va serializatsiya vaqti yig'iladi. Natija
+``Server-Timing`` sarlavhasiga va ``tours.performance`` loggeriga
+(bitta JSON qator) yoziladi.
+
+``ReplicaPinMiddleware`` yozishdan keyingi o'qishlarni asosiy bazaga bog'laydi.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import record_request
+from .routers import end_request, is_pinned, start_request
+
+
+logger = logging.getLogger('tours.performance')
+
+# Joriy so'rov o'lchovlari (thread va async kontekstlar uchun alohida)
+_current = contextvars.ContextVar('tours_request_timing', default=None)
+
+
+class RequestTiming:
+    """Bitta so'rov davomida yig'ilgan o'lchovlar"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.slowest = []
+        self.view_started = None
+        self.view = None
+        self.serialize = 0.0
+        self.render_started = None
+        self.render = 0.0
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db += duration
+        limit = settings.REQUEST_TIMING['SLOWEST_QUERIES']
+        if len(self.slowest) < limit or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, sql))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[limit:]
+
+    def timed(self, func):
+        """
+        ``func`` bajarilish vaqtini serializatsiya vaqtiga qo'shish. Ichida bajarilgan
+        SQL (masalan, lazy queryset yoki bog'liq obyektlar) ``db`` da qoladi.
+        """
+        @wraps(func)
+        def inner(*args, **kwargs):
+            started, db = time.perf_counter(), self.db
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.serialize += time.perf_counter() - started - (self.db - db)
+        return inner
+
+    def view_finished(self):
+        if self.view_started is not None and self.view is None:
+            self.view = time.perf_counter() - self.view_started
+
+    def rendered(self, response):
+        if self.render_started is not None:
+            self.render = time.perf_counter() - self.render_started
+            self.serialize += self.render
+        return response
+
+    def as_dict(self, request, response):
+        total = time.perf_counter() - self.started
+        self.view_finished()
+        view = self.view or 0.0
+        return {
+            'endpoint': endpoint_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'view_ms': round(view * 1000, 2),
+            'db_ms': round(self.db * 1000, 2),
+            'queries': self.queries,
+            'serialize_ms': round(self.serialize * 1000, 2),
+            'middleware_ms': round(max(total - view - self.render, 0.0) * 1000, 2),
+            'slowest_queries': [
+                {'ms': round(duration * 1000, 2), 'sql': sql[:300]} for duration, sql in self.slowest
+            ],
+        }
+
+
+def current_timing():
+    """Joriy so'rov o'lchovlari (so'rov tanlanmagan bo'lsa ``None``)"""
+    return _current.get()
+
+
+def tag_request(request, name):
+    """So'rovni endpoint nomi bilan belgilash (masalan ``tour-search``)"""
+    # DRF Request bo'lsa asl HttpRequest belgilanadi
+    getattr(request, '_request', request).endpoint_name = name
+
+
+def endpoint_name(request):
+    """Metrikalar va loglar uchun endpoint nomi (URL topilmasa ``unmatched``)"""
+    name = getattr(request, 'endpoint_name', None)
+    if name is None:
+        match = getattr(request, 'resolver_match', None)
+        name = match.url_name if match is not None and match.url_name else 'unmatched'
+    return name
+
+
+def record_query(execute, sql, params, many, context):
+    """Barcha ulanishlarga o'rnatiladigan execute wrapper"""
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection):
+    """Ulanishga SQL o'lchagichni bir marta qo'shish"""
+    if record_query not in connection.execute_wrappers:
+        # Boshiga qo'shiladi: ``connection.execute_wrapper()`` chiqishda oxirgi elementni olib tashlaydi
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def server_timing(data):
+    """Server-Timing sarlavhasi qiymati"""
+    return ', '.join([
+        f'total;dur={data["total_ms"]}',
+        f'view;dur={data["view_ms"]}',
+        f'db;dur={data["db_ms"]};desc="SQL: {data["queries"]}"',
+        f'serialize;dur={data["serialize_ms"]}',
+        f'middleware;dur={data["middleware_ms"]}',
+    ])
+
+
+class RequestTimingMiddleware:
+    """
+    So'rovlarning ``REQUEST_TIMING['SAMPLE_RATE']`` qismini o'lchaydi.
+    Butun middleware stekini qamrab olish uchun ro'yxatda birinchi turishi kerak.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        if not self.sampled():
+            return self.count(request, self.get_response(request), started)
+        token = _current.set(RequestTiming())
+        try:
+            response = self.get_response(request)
+            return self.count(request, self.finish(request, response), started)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        if not self.sampled():
+            return self.count(request, await self.get_response(request), started)
+        token = _current.set(RequestTiming())
+        try:
+            response = await self.get_response(request)
+            return self.count(request, self.finish(request, response), started)
+        finally:
+            _current.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = _current.get()
+        if timing is not None:
+            timing.view_started = time.perf_counter()
+
+    def sampled(self):
+        rate = settings.REQUEST_TIMING['SAMPLE_RATE']
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def count(self, request, response, started):
+        """Metrikalar har bir so'rov uchun yoziladi (sampling faqat batafsil o'lchovga tegishli)"""
+        if settings.METRICS['ENABLED']:
+            record_request(endpoint_name(request), response, time.perf_counter() - started)
+        return response
+
+    def finish(self, request, response):
+        data = _current.get().as_dict(request, response)
+        if settings.REQUEST_TIMING['HEADER']:
+            response['Server-Timing'] = server_timing(data)
+        logger.info(json.dumps(data, ensure_ascii=False), extra={'timing': data})
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes: yozuvchi so'rovlar va undan keyingi ``REPLICA_PIN_SECONDS``
+    soniya ichidagi shu klient so'rovlari o'qishni asosiy bazadan bajaradi.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'tours_db_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = start_request(self.must_pin(request))
+        try:
+            return self.remember(self.get_response(request))
+        finally:
+            end_request(token)
+
+    async def __acall__(self, request):
+        token = start_request(self.must_pin(request))
+        try:
+            return self.remember(await self.get_response(request))
+        finally:
+            end_request(token)
+
+    def must_pin(self, request):
+        return request.method not in ('GET', 'HEAD', 'OPTIONS') or self.cookie_name in request.COOKIES
+
+    def remember(self, response):
+        # So'rov davomida yozish bo'lgan bo'lsa klient keyingi so'rovlarda ham asosiy bazaga bog'lanadi
+        if is_pinned() and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class InstrumentedViewMixin:
+    """
+    DRF viewlari uchun: so'rovni ``<basename>-<action>`` nomi bilan belgilaydi,
+    serializer va render vaqtini alohida o'lchaydi.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        action = getattr(self, 'action', None)
+        basename = getattr(self, 'basename', None)
+        if basename and action:
+            tag_request(request, f"{basename}-{action.replace('_', '-')}")
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        timing = _current.get()
+        if timing is not None:
+            serializer.to_representation = timing.timed(serializer.to_representation)
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        timing = _current.get()
+        if timing is not None:
+            timing.view_finished()
+            if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+                timing.render_started = time.perf_counter()
+                response.add_post_render_callback(timing.rendered)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0002_tourpackage_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['sent_at', 'id'], name='contact_sent_id_idx'),
+        ),
+    ]
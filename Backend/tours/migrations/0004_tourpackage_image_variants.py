@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourpackage',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Rasm xeshi'),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Rasm variantlari'),
+        ),
+    ]
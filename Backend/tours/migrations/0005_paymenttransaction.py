@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0004_tourpackage_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_method', models.CharField(choices=[('payme', 'Payme'), ('click', 'Click'), ('uzum', 'Uzum Bank')], max_length=50, verbose_name="To'lov usuli")),
+                ('transaction_id', models.CharField(max_length=255, verbose_name='Tranzaksiya ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Summa')),
+                ('status', models.CharField(choices=[('confirmed', 'Tasdiqlangan'), ('rejected', 'Rad etilgan')], max_length=20, verbose_name='Holat')),
+                ('reason', models.CharField(blank=True, max_length=255, verbose_name='Sabab')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan sana')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='tours.booking', verbose_name='Buyurtma')),
+            ],
+            options={
+                'verbose_name': "To'lov tranzaksiyasi",
+                'verbose_name_plural': "To'lov tranzaksiyalari",
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('payment_method', 'transaction_id'), name='unique_payment_transaction')],
+            },
+        ),
+    ]
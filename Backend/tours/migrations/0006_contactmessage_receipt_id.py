@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0005_paymenttransaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='receipt_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='Kvitansiya ID'),
+        ),
+        migrations.AlterField(
+            model_name='contactmessage',
+            name='sent_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Yuborilgan sana'),
+        ),
+    ]
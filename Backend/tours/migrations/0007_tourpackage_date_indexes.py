@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0006_contactmessage_receipt_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(fields=['is_active', 'start_date'], name='tour_active_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(fields=['is_active', 'end_date'], name='tour_active_end_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0007_tourpackage_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['tour', 'created_at', 'id'], name='booking_tour_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('is_paid', True)), fields=['created_at', 'id'], name='booking_paid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['created_at', 'id'], name='booking_unpaid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='tour_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(fields=['updated_at', 'is_active'], name='tour_catalogue_state_idx'),
+        ),
+    ]
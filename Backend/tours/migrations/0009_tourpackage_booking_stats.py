@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:01
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_booking_stats(apps, schema_editor):
+    # Mavjud buyurtmalar bo'yicha hisoblagichlar (aks holda o'chirishda CHECK buziladi).
+    # Keyingi farqlar ``reconcile_tour_stats`` buyrug'i bilan tuzatiladi.
+    TourPackage = apps.get_model('tours', 'TourPackage')
+    Booking = apps.get_model('tours', 'Booking')
+    bookings = Booking.objects.filter(tour=OuterRef('pk')).order_by().values('tour')
+    paid = Coalesce(Subquery(bookings.filter(is_paid=True).annotate(n=Count('pk')).values('n')), Value(0))
+    TourPackage.objects.update(
+        bookings_count=Coalesce(Subquery(bookings.annotate(n=Count('pk')).values('n')), Value(0)),
+        paid_bookings_count=paid,
+        paid_revenue=ExpressionWrapper(F('price') * paid, output_field=DecimalField(max_digits=16, decimal_places=2)),
+        stats_updated_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0008_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourpackage',
+            name='bookings_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Buyurtmalar soni'),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='paid_bookings_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="To'langan buyurtmalar"),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='paid_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16, verbose_name="To'langan daromad"),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='stats_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Statistika yangilangan'),
+        ),
+        migrations.RunPython(backfill_booking_stats, migrations.RunPython.noop),
+    ]
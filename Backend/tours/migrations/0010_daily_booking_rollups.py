@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0009_tourpackage_booking_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Sana')),
+                ('payment_method', models.CharField(choices=[('payme', 'Payme'), ('click', 'Click'), ('uzum', 'Uzum Bank')], max_length=50, verbose_name="To'lov usuli")),
+                ('bookings', models.PositiveIntegerField(default=0, verbose_name='Buyurtmalar')),
+                ('paid_bookings', models.PositiveIntegerField(default=0, verbose_name="To'langan buyurtmalar")),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name="To'langan daromad")),
+            ],
+            options={
+                'verbose_name': 'Kunlik buyurtmalar statistikasi',
+                'verbose_name_plural': 'Kunlik buyurtmalar statistikasi',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Nomi')),
+                ('processed_until', models.DateTimeField(verbose_name='Qayta ishlangan vaqt')),
+            ],
+            options={
+                'verbose_name': "Yig'ma jadval belgisi",
+                'verbose_name_plural': "Yig'ma jadval belgilari",
+            },
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['updated_at'], name='booking_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailybookingstat',
+            name='tour',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='tours.tourpackage', verbose_name='Sayohat paketi'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybookingstat',
+            constraint=models.UniqueConstraint(fields=('date', 'tour', 'payment_method'), name='unique_daily_booking_stat'),
+        ),
+    ]
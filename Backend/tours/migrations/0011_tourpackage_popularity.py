@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0010_daily_booking_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourpackage',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False, verbose_name='Mashhurlik'),
+        ),
+        migrations.AddIndex(
+            model_name='tourpackage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-popularity', '-created_at'], name='tour_popular_idx'),
+        ),
+    ]
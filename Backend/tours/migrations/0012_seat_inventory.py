@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+def confirm_paid_bookings(apps, schema_editor):
+    # Mavjud to'langan buyurtmalar tasdiqlangan; to'lanmaganlari muddatsiz band bo'lib qoladi
+    Booking = apps.get_model('tours', 'Booking')
+    Booking.objects.filter(is_paid=True).update(status='confirmed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0011_tourpackage_popularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Band qilish muddati'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('held', 'Band qilingan'), ('confirmed', 'Tasdiqlangan'), ('cancelled', 'Bekor qilingan'), ('expired', "Muddati o'tgan")], default='held', max_length=20, verbose_name='Holat'),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text="bo'sh — cheklanmagan", null=True, verbose_name='Joylar soni'),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='seats_remaining',
+            field=models.PositiveIntegerField(editable=False, null=True, verbose_name="Bo'sh joylar"),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'held')), fields=['hold_expires_at'], name='booking_hold_idx'),
+        ),
+        migrations.RunPython(confirm_paid_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tours', '0012_seat_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymenttransaction',
+            name='callback_status',
+            field=models.CharField(blank=True, max_length=50, verbose_name="To'lov tizimi holati"),
+        ),
+        migrations.AlterField(
+            model_name='paymenttransaction',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Kutilmoqda'), ('confirmed', 'Tasdiqlangan'), ('rejected', 'Rad etilgan')], max_length=20, verbose_name='Holat'),
+        ),
+        migrations.AddIndex(
+            model_name='paymenttransaction',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='payment_pending_idx'),
+        ),
+    ]
@@ -1,12 +1,112 @@
-from django.db import models
+import datetime
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
 
 # Create your models here.
 
+def format_price_uzs(price):
+    """Narxni UZS formatiga keltirish"""
+    return f"{price:,.0f} UZS"
+
+
+# Buyurtmalar, bo'sh joylar va mashhurlik hisoblagichlari (faqat F() orqali yangilanadi)
+TOUR_STATS_FIELDS = (
+    'bookings_count', 'paid_bookings_count', 'paid_revenue', 'stats_updated_at', 'popularity', 'seats_remaining'
+)
+
+# Rasm variantlari fon vazifasida ``.update()`` bilan yoziladi (rasm o'zgarmasa save ularni yozmaydi)
+TOUR_IMAGE_FIELDS = ('image_hash', 'image_variants')
+
+
+class SeatsUnavailable(Exception):
+    """Paket(lar)da so'ralgan miqdorda bo'sh joy qolmagan"""
+
+    def __init__(self, tour_ids):
+        self.tour_ids = sorted(tour_ids)
+        super().__init__(f"Bo'sh joy qolmagan: {self.tour_ids}")
+
+
+def hold_deadline():
+    """Yangi to'lanmagan buyurtma joyni shu vaqtgacha band qiladi"""
+    return timezone.now() + datetime.timedelta(seconds=settings.BOOKING_HOLD_SECONDS)
+
+
+class TourPackageQuerySet(models.QuerySet):
+    def adjust_stats(self, bookings=0, paid=0, seats=0):
+        """
+        Buyurtmalar hisoblagichlarini atomar (F() bilan) o'zgartirish.
+        Daromad paketning joriy narxi bo'yicha qo'shiladi yoki ayiriladi.
+        ``seats`` > 0 joylarni band qiladi: shartli UPDATE faqat bo'sh joyi yetarli
+        (yoki sig'imi cheklanmagan) paketlarni yangilaydi; ``seats`` < 0 joylarni qaytaradi.
+        Yangilangan paketlar sonini qaytaradi.
+        """
+        queryset = self
+        changes = {'stats_updated_at': timezone.now()}
+        if bookings:
+            changes['bookings_count'] = F('bookings_count') + bookings
+        if paid:
+            changes['paid_bookings_count'] = F('paid_bookings_count') + paid
+            changes['paid_revenue'] = F('paid_revenue') + F('price') * Value(paid, output_field=models.DecimalField())
+        if seats > 0:
+            queryset = queryset.filter(Q(seats_remaining__isnull=True) | Q(seats_remaining__gte=seats))
+            changes['seats_remaining'] = F('seats_remaining') - seats
+        elif seats < 0:
+            changes['seats_remaining'] = Least(F('seats_remaining') - seats, F('capacity'))
+        return queryset.update(**changes)
+
+    def reconcile_stats(self):
+        """Hisoblagichlarni buyurtmalardan qayta hisoblash; farq qilgan paketlar sonini qaytaradi"""
+        bookings = Booking.objects.filter(tour=OuterRef('pk')).order_by().values('tour')
+        expected = self.annotate(
+            expected_bookings=Coalesce(Subquery(bookings.annotate(n=Count('pk')).values('n')), 0),
+            expected_paid=Coalesce(Subquery(bookings.filter(is_paid=True).annotate(n=Count('pk')).values('n')), 0),
+        ).filter(
+            ~Q(bookings_count=F('expected_bookings'))
+            | ~Q(paid_bookings_count=F('expected_paid'))
+            | ~Q(paid_revenue=F('expected_paid') * F('price'))
+        ).values_list('pk', 'expected_bookings', 'expected_paid', 'price')
+
+        fixed = 0
+        now = timezone.now()
+        for pk, total, paid, price in expected.iterator():
+            fixed += TourPackage.objects.filter(pk=pk).update(
+                bookings_count=total,
+                paid_bookings_count=paid,
+                paid_revenue=paid * price,
+                stats_updated_at=now,
+            )
+        return fixed
+
+    def reconcile_seats(self):
+        """Bo'sh joylarni sig'im va joy egallagan buyurtmalardan qayta hisoblash"""
+        occupied = (
+            Booking.objects.filter(tour=OuterRef('pk'), status__in=Booking.OCCUPYING_STATUSES)
+            .order_by().values('tour').annotate(n=Count('pk')).values('n')
+        )
+        return self.update(
+            seats_remaining=Case(
+                When(capacity__isnull=True, then=Value(None)),
+                default=Greatest(F('capacity') - Coalesce(Subquery(occupied), 0), Value(0)),
+                output_field=models.PositiveIntegerField(),
+            ),
+            stats_updated_at=timezone.now(),
+        )
+
+
 class TourPackage(models.Model):
     """Sayohat paketlari modeli"""
     title = models.CharField(max_length=255, verbose_name="Paket nomi")
     description = models.TextField(verbose_name="Tavsif")
     image = models.ImageField(upload_to='tour_images/', verbose_name="Rasm")
+    image_hash = models.CharField(max_length=64, blank=True, default='', editable=False, verbose_name="Rasm xeshi")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Rasm variantlari")
     location = models.CharField(max_length=100, verbose_name="Manzil")
     start_date = models.DateField(verbose_name="Boshlanish sanasi")
     end_date = models.DateField(verbose_name="Tugash sanasi")
@@ -15,19 +115,112 @@ class TourPackage(models.Model):
     is_active = models.BooleanField(default=True, verbose_name="Faol")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
+    # Buyurtmalar statistikasi: Booking yozilganda F() bilan yangilanadi,
+    # reconcile_tour_stats buyrug'i farqlarni tuzatadi
+    bookings_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Buyurtmalar soni")
+    paid_bookings_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="To'langan buyurtmalar")
+    paid_revenue = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0, editable=False, verbose_name="To'langan daromad"
+    )
+    stats_updated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Statistika yangilangan")
+    # Joylar: sig'im bo'sh bo'lsa cheklanmagan; bo'sh joylar faqat shartli UPDATE bilan kamayadi
+    capacity = models.PositiveIntegerField(
+        null=True, blank=True, help_text="bo'sh — cheklanmagan", verbose_name="Joylar soni"
+    )
+    seats_remaining = models.PositiveIntegerField(null=True, editable=False, verbose_name="Bo'sh joylar")
+    # Featured reytingi: ko'rish, buyurtma va to'lovlardan yig'iladigan ball (tours.popularity)
+    popularity = models.FloatField(default=0, editable=False, verbose_name="Mashhurlik")
+
+    objects = TourPackageQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Sayohat paketi"
         verbose_name_plural = "Sayohat paketlari"
         ordering = ['-created_at']
+        indexes = [
+            # Sana oralig'i bo'yicha qidiruv uchun
+            models.Index(fields=['is_active', 'start_date'], name='tour_active_start_idx'),
+            models.Index(fields=['is_active', 'end_date'], name='tour_active_end_idx'),
+            # Faol paketlar ro'yxati (yangilari birinchi) tartiblashsiz indeksdan o'qiladi
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='tour_active_created_idx'),
+            # Katalog holati (MAX(updated_at), faollar soni) jadval o'rniga shu indeksdan o'qiladi
+            models.Index(fields=['updated_at', 'is_active'], name='tour_catalogue_state_idx'),
+            # Featured: eng mashhur faol paketlar
+            models.Index(
+                fields=['-popularity', '-created_at'], condition=models.Q(is_active=True), name='tour_popular_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.seats_remaining = self.capacity
+        # Eskirgan hisoblagich va rasm variantlari qiymatlari parallel yangilanishlarni ustidan yozmasligi uchun
+        elif kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            skipped = TOUR_STATS_FIELDS
+            if self.image.name == getattr(self, '_loaded_image_name', None):
+                skipped += TOUR_IMAGE_FIELDS
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped
+            ]
+        if self._state.adding or self.capacity == getattr(self, '_loaded_capacity', self.capacity):
+            super().save(*args, **kwargs)
+            return
+        # Sig'im o'zgardi: bo'sh joylar band qilingan buyurtmalardan qayta hisoblanadi
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(TourPackage, instance=self)):
+            super().save(*args, **kwargs)
+            TourPackage.objects.filter(pk=self.pk).reconcile_seats()
+        self._loaded_capacity = self.capacity
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rasm almashtirilganini aniqlash uchun bazadagi qiymat saqlanadi
+        instance._loaded_image_name = instance.__dict__.get('image')
+        instance._loaded_capacity = instance.__dict__.get('capacity')
+        return instance
+
     @property
     def price_uzs(self):
         """Narxni UZS formatida qaytaradi"""
-        return f"{self.price:,.0f} UZS"
+        return format_price_uzs(self.price)
+
+
+class BookingQuerySet(models.QuerySet):
+    def expired_holds(self, now=None):
+        """To'lanmagan, band qilish muddati o'tgan buyurtmalar"""
+        return self.filter(status='held', is_paid=False, hold_expires_at__lt=now or timezone.now())
+
+    def release(self, status):
+        """
+        Joy egallagan buyurtmalarni ``status`` (cancelled/expired) holatiga o'tkazish va
+        joylarni paketlarga qaytarish. Bo'shatilgan buyurtmalar sonini qaytaradi.
+        """
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.select_for_update().filter(status__in=Booking.OCCUPYING_STATUSES)
+                .order_by().values_list('pk', 'tour_id')
+            )
+            if not rows:
+                return 0
+            now = timezone.now()
+            Booking.objects.filter(pk__in=[pk for pk, tour_id in rows]).update(
+                status=status, hold_expires_at=None, updated_at=now
+            )
+            per_tour = Counter(tour_id for pk, tour_id in rows)
+            released = Case(
+                *[When(pk=tour_id, then=Value(count)) for tour_id, count in per_tour.items()],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            )
+            TourPackage.objects.filter(pk__in=per_tour).update(
+                seats_remaining=Least(F('seats_remaining') + released, F('capacity')),
+                stats_updated_at=now,
+            )
+        return len(rows)
 
 
 class Booking(models.Model):
@@ -37,6 +230,14 @@ class Booking(models.Model):
         ('click', 'Click'),
         ('uzum', 'Uzum Bank'),
     ]
+    STATUSES = [
+        ('held', 'Band qilingan'),
+        ('confirmed', 'Tasdiqlangan'),
+        ('cancelled', 'Bekor qilingan'),
+        ('expired', "Muddati o'tgan"),
+    ]
+    # Shu holatlardagi buyurtmalar paketda bittadan joy egallaydi
+    OCCUPYING_STATUSES = ('held', 'confirmed')
     
     tour = models.ForeignKey(TourPackage, on_delete=models.CASCADE, verbose_name="Sayohat paketi")
     name = models.CharField(max_length=100, verbose_name="Ism")
@@ -48,17 +249,221 @@ class Booking(models.Model):
         verbose_name="To'lov usuli"
     )
     is_paid = models.BooleanField(default=False, verbose_name="To'langan")
+    status = models.CharField(max_length=20, choices=STATUSES, default='held', verbose_name="Holat")
+    hold_expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Band qilish muddati")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan sana")
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Buyurtma"
         verbose_name_plural = "Buyurtmalar"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
+            # Paket va to'lov holati bo'yicha filtrlangan ro'yxatlar uchun
+            models.Index(fields=['tour', 'created_at', 'id'], name='booking_tour_created_idx'),
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_paid=True), name='booking_paid_created_idx'),
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_paid=False), name='booking_unpaid_created_idx'),
+            # Yig'ma jadvallarni o'zgarganlari bo'yicha yangilash uchun
+            models.Index(fields=['updated_at'], name='booking_updated_idx'),
+            # Muddati o'tgan bandlarni topish uchun
+            models.Index(fields=['hold_expires_at'], condition=models.Q(status='held'), name='booking_hold_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.tour.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Paket statistikasi va joylarini yangilash uchun bazadagi qiymatlar saqlanadi
+        instance._loaded_stats = instance._stats_key()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or {'tour', 'tour_id', 'is_paid', 'status'} & set(fields):
+            self._loaded_stats = self._stats_key()
+
+    def _stats_key(self):
+        return (
+            self.__dict__.get('tour_id'),
+            self.__dict__.get('is_paid'),
+            self.__dict__.get('status') in self.OCCUPYING_STATUSES,
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Saqlash, paket hisoblagichlari va joylarini bitta tranzaksiyada yangilash.
+        Paketda bo'sh joy qolmagan bo'lsa ``SeatsUnavailable`` (hech narsa yozilmaydi).
+        """
+        if self.is_paid and self.status == 'held':
+            # To'langan buyurtma joyni muddatsiz egallaydi
+            self.status, self.hold_expires_at = 'confirmed', None
+        loaded = None if self._state.adding else getattr(self, '_loaded_stats', None)
+        tour_id, is_paid, occupies = current = self._stats_key()
+        tours = TourPackage.objects.filter(pk=tour_id)
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Booking, instance=self)):
+            if loaded is None:
+                if self.status == 'held' and self.hold_expires_at is None:
+                    self.hold_expires_at = hold_deadline()
+                # Joy INSERT dan oldin band qilinadi
+                if not tours.adjust_stats(bookings=1, paid=int(is_paid), seats=int(occupies)):
+                    raise SeatsUnavailable([tour_id])
+                super().save(*args, **kwargs)
+            else:
+                super().save(*args, **kwargs)
+                old_tour_id, was_paid, occupied = loaded
+                if old_tour_id != tour_id:
+                    TourPackage.objects.filter(pk=old_tour_id).adjust_stats(
+                        bookings=-1, paid=-int(was_paid), seats=-int(occupied)
+                    )
+                    if not tours.adjust_stats(bookings=1, paid=int(is_paid), seats=int(occupies)):
+                        raise SeatsUnavailable([tour_id])
+                elif loaded != current:
+                    if not tours.adjust_stats(paid=int(is_paid) - int(was_paid), seats=int(occupies) - int(occupied)):
+                        raise SeatsUnavailable([tour_id])
+        self._loaded_stats = current
+
+    def delete(self, *args, **kwargs):
+        """O'chirish, paket hisoblagichlarini kamaytirish, joyni qaytarish va kunlik statistikani yangilash"""
+        from .rollups import recompute_days
+
+        tour_id, was_paid, occupied = getattr(self, '_loaded_stats', None) or self._stats_key()
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Booking, instance=self)):
+            result = super().delete(*args, **kwargs)
+            TourPackage.objects.filter(pk=tour_id).adjust_stats(
+                bookings=-1, paid=-int(was_paid), seats=-int(occupied)
+            )
+            recompute_days({timezone.localdate(self.created_at)} if self.created_at else set())
+        return result
+
+    @staticmethod
+    def record_created(bookings):
+        """
+        ``bulk_create`` bilan yaratiladigan buyurtmalar uchun hisoblagichlar va joylar
+        (signal va save() chaqirilmaydi). INSERT dan oldin, o'sha tranzaksiya ichida
+        chaqiriladi: biror paketda joy yetmasa ``SeatsUnavailable`` (faqat joy yetmagan paketlar bilan).
+        """
+        per_tour = {}
+        for booking in bookings:
+            total, paid, seats = per_tour.get(booking.tour_id, (0, 0, 0))
+            per_tour[booking.tour_id] = (
+                total + 1, paid + int(booking.is_paid), seats + int(booking.status in Booking.OCCUPYING_STATUSES)
+            )
+        if not per_tour:
+            return
+
+        # Barcha paketlar bitta UPDATE bilan
+        def per_tour_value(index, output_field):
+            return Case(
+                *[When(pk=tour_id, then=Value(counts[index])) for tour_id, counts in per_tour.items()],
+                default=Value(0),
+                output_field=output_field,
+            )
+
+        # Har bir paket o'z joylari yetarli bo'lsagina yangilanadi (WHERE seats_remaining >= n)
+        enough_seats = reduce(or_, [
+            Q(pk=tour_id, seats_remaining__gte=counts[2]) for tour_id, counts in per_tour.items()
+        ], Q(seats_remaining__isnull=True))
+        now = timezone.now()
+        updated = TourPackage.objects.filter(enough_seats, pk__in=per_tour).update(
+            bookings_count=F('bookings_count') + per_tour_value(0, models.IntegerField()),
+            paid_bookings_count=F('paid_bookings_count') + per_tour_value(1, models.IntegerField()),
+            paid_revenue=F('paid_revenue') + F('price') * per_tour_value(1, models.DecimalField()),
+            seats_remaining=F('seats_remaining') - per_tour_value(2, models.IntegerField()),
+            stats_updated_at=now,
+        )
+        if updated != len(per_tour):
+            # Qisman yangilangan paketlar chaqiruvchi tranzaksiyasi bilan qaytariladi;
+            # yangilanganlari shu tranzaksiyadagi ``stats_updated_at`` qiymatidan taniladi
+            reserved = set(
+                TourPackage.objects.filter(pk__in=per_tour, stats_updated_at=now).values_list('pk', flat=True)
+            )
+            raise SeatsUnavailable(set(per_tour) - reserved or per_tour)
+
+
+class PaymentTransaction(models.Model):
+    """
+    To'lov tizimi tranzaksiyasi (har bir tranzaksiya faqat bir marta qayta ishlanadi).
+    Callback qabul qilinganda ``pending`` holatida yoziladi va navbat uni yakunlaydi.
+    """
+    STATUSES = [
+        ('pending', 'Kutilmoqda'),
+        ('confirmed', 'Tasdiqlangan'),
+        ('rejected', 'Rad etilgan'),
+    ]
+
+    booking = models.ForeignKey(
+        Booking, on_delete=models.CASCADE, related_name='transactions', verbose_name="Buyurtma"
+    )
+    payment_method = models.CharField(max_length=50, choices=Booking.PAYMENT_METHODS, verbose_name="To'lov usuli")
+    transaction_id = models.CharField(max_length=255, verbose_name="Tranzaksiya ID")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Summa")
+    status = models.CharField(max_length=20, choices=STATUSES, verbose_name="Holat")
+    reason = models.CharField(max_length=255, blank=True, verbose_name="Sabab")
+    # Callbackda to'lov tizimi yuborgan holat (navbat qayta ishlashi uchun saqlanadi)
+    callback_status = models.CharField(max_length=50, blank=True, verbose_name="To'lov tizimi holati")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan sana")
+
+    class Meta:
+        verbose_name = "To'lov tranzaksiyasi"
+        verbose_name_plural = "To'lov tranzaksiyalari"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['payment_method', 'transaction_id'], name='unique_payment_transaction'
+            ),
+        ]
+        indexes = [
+            # Yo'qolgan callbacklarni qayta ishlash uchun faqat kutilayotganlar
+            models.Index(fields=['created_at'], condition=Q(status='pending'), name='payment_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.payment_method}:{self.transaction_id}"
+
+
+class DailyBookingStat(models.Model):
+    """
+    Kunlik buyurtmalar va to'langan daromad (paket va to'lov usuli bo'yicha).
+    ``refresh_booking_rollups`` buyrug'i o'zgargan kunlarni qayta hisoblaydi.
+    """
+    date = models.DateField(verbose_name="Sana")
+    tour = models.ForeignKey(
+        TourPackage, on_delete=models.CASCADE, related_name='daily_stats', verbose_name="Sayohat paketi"
+    )
+    payment_method = models.CharField(max_length=50, choices=Booking.PAYMENT_METHODS, verbose_name="To'lov usuli")
+    bookings = models.PositiveIntegerField(default=0, verbose_name="Buyurtmalar")
+    paid_bookings = models.PositiveIntegerField(default=0, verbose_name="To'langan buyurtmalar")
+    paid_revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="To'langan daromad")
+
+    class Meta:
+        verbose_name = "Kunlik buyurtmalar statistikasi"
+        verbose_name_plural = "Kunlik buyurtmalar statistikasi"
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'tour', 'payment_method'], name='unique_daily_booking_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.tour_id} - {self.payment_method}"
+
+
+class RollupWatermark(models.Model):
+    """Yig'ma jadval qaysi vaqtgacha o'zgargan buyurtmalarni qamrab olgani"""
+    name = models.CharField(max_length=50, unique=True, verbose_name="Nomi")
+    processed_until = models.DateTimeField(verbose_name="Qayta ishlangan vaqt")
+
+    class Meta:
+        verbose_name = "Yig'ma jadval belgisi"
+        verbose_name_plural = "Yig'ma jadval belgilari"
+
+    def __str__(self):
+        return f"{self.name}: {self.processed_until}"
+
 
 class ContactMessage(models.Model):
     """Bog'lanish formasi modeli"""
@@ -66,13 +471,19 @@ class ContactMessage(models.Model):
     email = models.EmailField(verbose_name="Email")
     phone = models.CharField(max_length=20, verbose_name="Telefon raqam")
     message = models.TextField(verbose_name="Xabar")
-    sent_at = models.DateTimeField(auto_now_add=True, verbose_name="Yuborilgan sana")
+    # Write-behind rejimida xabar bazaga keyinroq yoziladi, shuning uchun vaqt aniq beriladi
+    sent_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Yuborilgan sana")
     is_read = models.BooleanField(default=False, verbose_name="O'qilgan")
+    # Write-behind rejimida mijozga qaytariladigan kvitansiya (takroriy yozishdan himoya)
+    receipt_id = models.UUIDField(null=True, blank=True, unique=True, editable=False, verbose_name="Kvitansiya ID")
 
     class Meta:
         verbose_name = "Kontakt xabar"
         verbose_name_plural = "Kontakt xabarlar"
         ordering = ['-sent_at']
+        indexes = [
+            models.Index(fields=['sent_at', 'id'], name='contact_sent_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.email}"
@@ -0,0 +1,130 @@
+import datetime
+import decimal
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination: kursor tartiblash ustunlarining barcha qiymatlarini
+    saqlaydi, shuning uchun sahifalar COUNT(*) va OFFSET'siz, indeks orqali olinadi.
+    ``ordering`` oxirida noyob ustun (``id``) bo'lishi kerak.
+    """
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        """So'ralgan tartibga kalit ustunlarni (masalan ``-created_at``, ``-id``) qo'shish"""
+        ordering = list(super().get_ordering(request, queryset, view))
+        names = {field.lstrip('-') for field in ordering}
+        for field in self.ordering:
+            if field.lstrip('-') not in names:
+                ordering.append(field)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+        position = self.cursor.position if self.cursor else None
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else f'-{field}' for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._keyset_filter(ordering, self._decode_position(position)))
+            except (ValidationError, ValueError, TypeError):
+                # Qo'lda o'zgartirilgan kursor: qiymatlar ustun turiga mos emas
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Bo'sh sahifadan orqaga qaytish — birinchi sahifa
+            return self.encode_cursor(Cursor(offset=0, reverse=False, position=None))
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(_encode_value(value))
+        return json.dumps(values, separators=(',', ':'))
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _keyset_filter(self, ordering, values):
+        """
+        (a, b, c) > (x, y, z) shartini indeksga mos ko'rinishda yasash:
+        a >= x AND (a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z))
+        """
+        fields = [(field.lstrip('-'), 'lt' if field.startswith('-') else 'gt') for field in ordering]
+        branches = []
+        for i, (name, lookup) in enumerate(fields):
+            equal = [Q(**{fields[j][0]: values[j]}) for j in range(i)]
+            branches.append(reduce(and_, equal + [Q(**{f'{name}__{lookup}': values[i]})]))
+        leading, lookup = fields[0]
+        return Q(**{f'{leading}__{lookup}e': values[0]}) & reduce(or_, branches)
+
+
+class BookingPagination(KeysetPagination):
+    """Buyurtmalar uchun (created_at, id) bo'yicha pagination"""
+    ordering = ('-created_at', '-id')
+
+
+class ContactMessagePagination(KeysetPagination):
+    """Kontakt xabarlar uchun (sent_at, id) bo'yicha pagination"""
+    ordering = ('-sent_at', '-id')
@@ -0,0 +1,240 @@
+import hashlib
+import hmac
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import status as http_status
+from rest_framework.exceptions import APIException
+
+from .metrics import registry
+from .models import Booking, PaymentTransaction, TourPackage
+from .popularity import popularity
+from .sqlite import serialized_write
+from .tasks import BackgroundWorker
+
+
+PaymentResult = namedtuple('PaymentResult', ['booking_id', 'status', 'reason', 'duplicate'])
+
+
+class PaymentProviderUnavailable(APIException):
+    """To'lov tizimi sozlanmagan (masalan, production'da soxta provider)"""
+    status_code = http_status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "To'lov tizimi vaqtincha mavjud emas"
+    default_code = 'payment_provider_unavailable'
+
+
+class PaymentProvider:
+    """To'lov tizimi bilan integratsiya uchun asosiy klass"""
+
+    def __init__(self, payment_method):
+        self.payment_method = payment_method
+
+    def verify_callback(self, request):
+        """Callback haqiqatan to'lov tizimidan kelganini tekshirish (imzo va h.k.)"""
+        raise NotImplementedError
+
+    def confirm(self, transaction_id, amount):
+        """Tranzaksiya to'lov tizimida muvaffaqiyatli o'tganini tekshirish"""
+        raise NotImplementedError
+
+
+class StubProvider(PaymentProvider):
+    """
+    Lokal ishlab chiqish va testlar uchun soxta to'lov tizimi. Faqat ``ALLOW_STUB``
+    (standart — DEBUG) yoqilganda ishlaydi; callback tanasi ``STUB_SECRET`` bilan
+    HMAC-SHA256 imzolangan bo'lishi kerak (``X-Signature`` sarlavhasi).
+    """
+    # Shu prefiks bilan boshlangan tranzaksiyalar rad etiladi
+    decline_prefix = 'declined-'
+    signature_header = 'HTTP_X_SIGNATURE'
+
+    def __init__(self, payment_method):
+        if not settings.PAYMENT_SETTINGS.get('ALLOW_STUB'):
+            raise ImproperlyConfigured(
+                f"{payment_method}: soxta to'lov tizimi faqat DEBUG va testlar uchun (PAYMENT_SETTINGS['ALLOW_STUB'])"
+            )
+        super().__init__(payment_method)
+
+    @staticmethod
+    def sign(body):
+        secret = settings.PAYMENT_SETTINGS['STUB_SECRET'].encode('utf-8')
+        return hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+    def verify_callback(self, request):
+        return hmac.compare_digest(request.META.get(self.signature_header, ''), self.sign(request.body))
+
+    def confirm(self, transaction_id, amount):
+        return not transaction_id.startswith(self.decline_prefix)
+
+
+def get_provider(payment_method):
+    """
+    To'lov usuli uchun sozlamalarda ko'rsatilgan provider. Noto'g'ri sozlangan
+    provider so'rovda 503 beradi (ishga tushishda ``tours.E001`` tekshiruvi).
+    """
+    path = settings.PAYMENT_SETTINGS['PROVIDERS'][payment_method]
+    try:
+        return import_string(path)(payment_method)
+    except ImproperlyConfigured as exc:
+        raise PaymentProviderUnavailable() from exc
+
+
+def find_transaction(payment_method, transaction_id):
+    """Avval qayta ishlangan tranzaksiya natijasi (bitta indeksli so'rov)"""
+    existing = (
+        PaymentTransaction.objects
+        .filter(payment_method=payment_method, transaction_id=transaction_id)
+        .values('booking_id', 'status', 'reason')
+        .first()
+    )
+    if existing is None:
+        return None
+    return PaymentResult(existing['booking_id'], existing['status'], existing['reason'], True)
+
+
+def record_callback(data):
+    """
+    Callbackni navbatga berishdan oldin ``pending`` tranzaksiya sifatida saqlash
+    (jarayon to'xtasa ham yo'qolmaydi). Takroriy callback yoki mavjud bo'lmagan
+    buyurtma uchun ``False``.
+    """
+    try:
+        with serialized_write(), transaction.atomic():
+            # Tashqi kalit SQLite da faqat COMMIT da tekshiriladi
+            if not Booking.objects.filter(pk=data['booking_id']).exists():
+                return False
+            PaymentTransaction.objects.create(
+                booking_id=data['booking_id'],
+                payment_method=data['payment_method'],
+                transaction_id=data['transaction_id'],
+                amount=data['amount'],
+                status='pending',
+                callback_status=data['status'],
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def update_pending(data):
+    """
+    Hali yakunlanmagan callbackni to'lov tizimining oxirgi ma'lumoti bilan almashtirish
+    (masalan, ``processing`` dan keyin ``success``). Yangilangan bo'lsa ``True``.
+    """
+    with serialized_write():
+        return bool(PaymentTransaction.objects.filter(
+            payment_method=data['payment_method'],
+            transaction_id=data['transaction_id'],
+            booking_id=data['booking_id'],
+            status='pending',
+        ).update(amount=data['amount'], callback_status=data['status']))
+
+
+def process_pending():
+    """Kutilayotgan callbacklarni yakunlash (masalan, qayta ishga tushgandan keyin); sonini qaytaradi"""
+    pending = PaymentTransaction.objects.filter(status='pending').order_by('created_at').values(
+        'booking_id', 'payment_method', 'transaction_id', 'amount', 'callback_status'
+    )
+    processed = 0
+    for row in list(pending):
+        row['status'] = row.pop('callback_status')
+        if process_payment(row['booking_id'], row) is not None:
+            processed += 1
+    return processed
+
+
+# To'lov tizimlari callbacklari shu navbat orqali ketma-ket qayta ishlanadi;
+# navbat ishga tushganda oldingi jarayondan qolgan callbacklar yakunlanadi
+payment_queue = BackgroundWorker('tours-payments', on_start=process_pending)
+
+
+def process_payment(booking_id, data):
+    """
+    To'lovni idempotent tasdiqlash: takroriy tranzaksiya hech narsa yozmaydi,
+    buyurtma qatori tekshiruv davomida qulflanadi va faqat ``is_paid`` yangilanadi.
+    Callback orqali saqlangan ``pending`` tranzaksiya shu yerda yakunlanadi.
+    Faqat yakuniy natija saqlanadi: oraliq holat (``processing``), summa mos kelmasligi
+    yoki to'lov tizimi hali tasdiqlamagani tranzaksiyani band qilmaydi — to'lov tizimi
+    shu ID bilan qayta yuborsa, qaytadan tekshiriladi.
+    Buyurtma topilmasa ``None`` qaytaradi.
+    """
+    payment_method = data['payment_method']
+    transaction_id = data['transaction_id']
+
+    duplicate = find_transaction(payment_method, transaction_id)
+    if duplicate is not None and duplicate.status != 'pending':
+        return duplicate
+
+    # Tashqi tizimga murojaat qulf va tranzaksiyadan tashqarida bajariladi
+    provider_confirmed = get_provider(payment_method).confirm(transaction_id, data['amount'])
+
+    with serialized_write(), transaction.atomic():
+        booking = (
+            Booking.objects.select_for_update()
+            .filter(pk=booking_id)
+            .values('id', 'tour_id', 'is_paid', 'status')
+            .first()
+        )
+        if booking is None:
+            return None
+        price = TourPackage.objects.values_list('price', flat=True).get(pk=booking['tour_id'])
+
+        options = settings.PAYMENT_SETTINGS
+        final = True
+        if booking['status'] not in Booking.OCCUPYING_STATUSES:
+            # Joy allaqachon bo'shatilgan (bekor qilingan yoki muddati o'tgan)
+            status, reason = 'rejected', "Buyurtma bekor qilingan yoki band qilish muddati o'tgan"
+        elif data['status'] in options['FAILURE_STATUSES']:
+            status, reason = 'rejected', f"To'lov holati: {data['status']}"
+        elif data['status'] not in options['SUCCESS_STATUSES']:
+            status, reason, final = 'pending', f"To'lov holati: {data['status']}", False
+        elif data['amount'] != price:
+            status, reason, final = 'rejected', "To'lov summasi buyurtma summasiga mos emas", False
+        elif not provider_confirmed:
+            status, reason, final = 'rejected', "To'lov tizimi tranzaksiyani tasdiqlamadi", False
+        else:
+            status, reason = 'confirmed', ''
+
+        if not final:
+            if duplicate is not None:
+                # Shu orada yangiroq callback kelgan bo'lsa (update_pending), qator qoladi
+                PaymentTransaction.objects.filter(
+                    payment_method=payment_method, transaction_id=transaction_id, status='pending',
+                    callback_status=data['status'], amount=data['amount'],
+                ).delete()
+        elif duplicate is not None:
+            finished = PaymentTransaction.objects.filter(
+                payment_method=payment_method, transaction_id=transaction_id, status='pending'
+            ).update(status=status, reason=reason)
+            if not finished:
+                # Boshqa ishchi allaqachon yakunlagan
+                return find_transaction(payment_method, transaction_id)
+        else:
+            try:
+                with transaction.atomic():
+                    PaymentTransaction.objects.create(
+                        booking_id=booking_id,
+                        payment_method=payment_method,
+                        transaction_id=transaction_id,
+                        amount=data['amount'],
+                        status=status,
+                        reason=reason,
+                    )
+            except IntegrityError:
+                # Parallel so'rov shu tranzaksiyani allaqachon yozgan
+                return find_transaction(payment_method, transaction_id)
+
+        if status == 'confirmed' and not booking['is_paid']:
+            paid = Booking.objects.filter(
+                pk=booking_id, is_paid=False, status__in=Booking.OCCUPYING_STATUSES
+            ).update(is_paid=True, status='confirmed', hold_expires_at=None, updated_at=timezone.now())
+            if paid:
+                TourPackage.objects.filter(pk=booking['tour_id']).adjust_stats(paid=1)
+                transaction.on_commit(lambda: popularity.record(booking['tour_id'], 'payment'))
+
+    registry.inc('tours_payments_verified_total', payment_method=payment_method, status=status)
+    return PaymentResult(booking_id, status, reason, False)
@@ -0,0 +1,185 @@
+"""
+Sayohat paketlari mashhurligi (featured reytingi).
+
+Ball forward decay usulida saqlanadi: har bir hodisa
+``weight * 2 ** ((t - EPOCH) / HALF_LIFE)`` qo'shadi. Eski hodisalar
+hissasi nisbatan yarim yemirilish davri bo'yicha kamayadi, lekin
+saqlangan ballarni qayta hisoblash kerak bo'lmaydi — tartib har doim
+to'g'ri. (HALF_LIFE = 7 kun bo'lsa float ~19 yilga yetadi, keyin EPOCH ni
+surib ballarni qayta qurish kerak: ``rebuild_popularity`` buyrug'i.)
+
+Hodisalar (ko'rish, buyurtma, to'lov) jarayon xotirasida yig'iladi va har
+``FLUSH_INTERVAL`` soniyada bitta UPDATE bilan bazaga qo'shiladi; shundan keyin
+top-N ro'yxat qayta hisoblanib keshga yoziladi. Trafik kam bo'lsa ham birinchi
+yozilmagan hodisadan ``FLUSH_INTERVAL`` o'tgach taymer flush qiladi, jarayon
+to'xtaganda qolganlari ``atexit`` orqali yoziladi.
+"""
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, FloatField, Value, When
+
+from .cache import catalogue_etag, fill_reads, get_catalogue_version
+from .models import Booking, TourPackage
+from .serializers import TourPackageCardSerializer
+from .sqlite import serialized_write
+from .tasks import background
+
+
+logger = logging.getLogger(__name__)
+
+
+def event_score(event, timestamp=None, count=1):
+    """Hodisaning forward decay bo'yicha hissasi"""
+    options = settings.TOUR_POPULARITY
+    if timestamp is None:
+        timestamp = time.time()
+    return options['WEIGHTS'][event] * count * 2 ** ((timestamp - options['EPOCH']) / options['HALF_LIFE'])
+
+
+class PopularityCounter:
+    """Jarayon ichidagi hodisalar hisoblagichi"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flushed = time.monotonic()
+        self._timer = None
+
+    def record(self, tour_id, event, count=1):
+        score = event_score(event, count=count)
+        interval = settings.TOUR_POPULARITY['FLUSH_INTERVAL']
+        with self._lock:
+            first = not self._pending
+            self._pending[tour_id] = self._pending.get(tour_id, 0.0) + score
+            elapsed = time.monotonic() - self._flushed
+            due = elapsed >= interval
+            if due:
+                self._flushed = time.monotonic()
+            elif first:
+                self._schedule(interval - elapsed)
+        if due:
+            background.submit(self.flush)
+
+    def _schedule(self, delay):
+        # Keyingi record() kelmasa ham hodisalar ``delay`` soniyadan keyin yoziladi (qulf ichida chaqiriladi)
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, background.submit, args=(self.flush,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Yig'ilgan ballarni bazaga qo'shish va top-N ro'yxatni yangilash"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            with serialized_write():
+                TourPackage.objects.filter(pk__in=pending).update(
+                    popularity=F('popularity') + _scores_case(pending.items())
+                )
+        except DatabaseError:
+            # Ballar yo'qolmaydi: keyingi flush bilan yoziladi
+            logger.exception("Mashhurlik ballarini yozib bo'lmadi")
+            with self._lock:
+                for tour_id, score in pending.items():
+                    self._pending[tour_id] = self._pending.get(tour_id, 0.0) + score
+                self._schedule(settings.TOUR_POPULARITY['FLUSH_INTERVAL'])
+            return 0
+        refresh_featured()
+        return len(pending)
+
+    def flush_at_exit(self):
+        if self._pending:
+            self.flush()
+
+
+popularity = PopularityCounter()
+# Oxirgi FLUSH_INTERVAL dagi hodisalar jarayon to'xtaganda yo'qolmasligi uchun
+atexit.register(popularity.flush_at_exit)
+
+
+def _scores_case(scores):
+    return Case(
+        *[When(pk=tour_id, then=Value(score)) for tour_id, score in scores],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def rebuild(tours=None, batch_size=500):
+    """
+    Ballarni buyurtmalar tarixidan qayta hisoblash (to'lov vaqti sifatida ``updated_at``).
+    Ko'rishlar bazada saqlanmaydi — ularning hissasi nolga tushadi. Ball olgan paketlar sonini qaytaradi.
+    """
+    if tours is None:
+        tours = TourPackage.objects.all()
+    scores = defaultdict(float)
+    bookings = Booking.objects.filter(tour__in=tours.values('pk')).values_list(
+        'tour_id', 'created_at', 'updated_at', 'is_paid'
+    )
+    for tour_id, created_at, updated_at, is_paid in bookings.iterator(chunk_size=2000):
+        scores[tour_id] += event_score('booking', created_at.timestamp())
+        if is_paid:
+            scores[tour_id] += event_score('payment', updated_at.timestamp())
+
+    items = list(scores.items())
+    with serialized_write(), transaction.atomic():
+        tours.update(popularity=0)
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            TourPackage.objects.filter(pk__in=[pk for pk, _ in batch]).update(popularity=_scores_case(batch))
+    refresh_featured()
+    return len(items)
+
+
+def _featured_key(version=None):
+    return f'tours:featured:{version if version is not None else get_catalogue_version()}'
+
+
+def compute_featured():
+    """Eng mashhur faol paketlar (kartochka qatorlari); faollik bo'lmasa yangilari birinchi"""
+    return list(
+        TourPackage.objects.filter(is_active=True)
+        .order_by('-popularity', '-created_at')
+        .values(*TourPackageCardSerializer.source_fields)[:settings.TOUR_POPULARITY['TOP_N']]
+    )
+
+
+def refresh_featured():
+    """Top-N ro'yxatni qayta hisoblab keshga yozish"""
+    with fill_reads():
+        rows = compute_featured()
+    cache.set(_featured_key(), rows, settings.TOURS_RESPONSE_CACHE_TIMEOUT)
+    return rows
+
+
+def featured_rows(request=None):
+    """Oldindan hisoblangan top-N ro'yxat (keshda bo'lmasa hisoblanadi; so'rov ichida bir marta)"""
+    if request is not None and hasattr(request, '_featured_rows'):
+        return request._featured_rows
+    rows = cache.get(_featured_key())
+    if rows is None:
+        rows = refresh_featured()
+    if request is not None:
+        request._featured_rows = rows
+    return rows
+
+
+def featured_etag(request, *args, **kwargs):
+    """Featured uchun ETag: katalog holati va reytingdagi paketlar tartibi"""
+    ids = [row['id'] for row in featured_rows(request)]
+    raw = repr((catalogue_etag(request), ids))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
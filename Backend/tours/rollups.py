@@ -0,0 +1,138 @@
+"""
+Kunlik buyurtmalar va daromad yig'ma jadvali (``DailyBookingStat``).
+
+Yangilash faqat oxirgi belgidan (watermark) keyin ``updated_at`` bo'yicha
+o'zgargan buyurtmalarni ko'radi: ular tegishli kunlar (yaratilgan sanasi
+bo'yicha) to'liq qayta hisoblanadi, shuning uchun paket yoki to'lov usuli
+o'zgargan buyurtmalar ham to'g'ri guruhga o'tadi. Hali yakunlanmagan
+tranzaksiyalarni o'tkazib yubormaslik uchun oxirgi ``BOOKING_ROLLUPS['LAG']``
+soniya keyingi ishga qoldiriladi. O'chirilgan buyurtmalar ``updated_at``
+qoldirmaydi, shuning uchun ``Booking.delete`` va admin o'chirishi ularning kunlarini
+darhol qayta hisoblaydi (``recompute_days``).
+
+Daromad buyurtma to'langan paytdagi emas, kun qayta hisoblangan paytdagi paket
+narxi bo'yicha olinadi (``TourPackage.paid_revenue`` bilan bir xil). Narx
+o'zgargandan keyin eski kunlar o'zgarmaydi, lekin ular qayta hisoblansa (shu kunga
+tegishli buyurtma o'zgarsa yoki ``rebuild``) yangi narx bilan yoziladi.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Booking, DailyBookingStat, RollupWatermark
+
+
+WATERMARK = 'daily_bookings'
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def _aggregate(bookings, group_by_day):
+    """Buyurtmalarni (kun, paket, to'lov usuli) bo'yicha guruhlash"""
+    fields = ['tour_id', 'payment_method']
+    if group_by_day:
+        bookings = bookings.annotate(day=TruncDate('created_at'))
+        fields.insert(0, 'day')
+    return (
+        bookings.order_by().values(*fields).annotate(
+            bookings=Count('id'),
+            paid_bookings=Count('id', filter=Q(is_paid=True)),
+            paid_revenue=Sum('tour__price', filter=Q(is_paid=True), default=0),
+        )
+    )
+
+
+def _store(rows, day=None):
+    DailyBookingStat.objects.bulk_create([
+        DailyBookingStat(
+            date=row['day'] if day is None else day,
+            tour_id=row['tour_id'],
+            payment_method=row['payment_method'],
+            bookings=row['bookings'],
+            paid_bookings=row['paid_bookings'],
+            paid_revenue=row['paid_revenue'],
+        )
+        for row in rows
+    ], batch_size=settings.BOOKING_ROLLUPS['BATCH_SIZE'])
+
+
+def _set_watermark(value):
+    RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'processed_until': value})
+
+
+def _recompute_day(day):
+    start, end = _day_bounds(day)
+    DailyBookingStat.objects.filter(date=day).delete()
+    _store(_aggregate(Booking.objects.filter(created_at__gte=start, created_at__lt=end), False), day)
+
+
+def booking_days(bookings):
+    """Buyurtmalar yaratilgan kunlar (mahalliy sana bo'yicha, yig'ma jadval bilan bir xil)"""
+    return set(bookings.annotate(day=TruncDate('created_at')).order_by().values_list('day', flat=True).distinct())
+
+
+def recompute_days(days):
+    """
+    O'chirilgan buyurtmalar kunlarini qayta hisoblash (chaqiruvchi tranzaksiyasi ichida).
+    Yig'ma jadval hali qurilmagan bo'lsa hech narsa qilmaydi. Kunlar sonini qaytaradi.
+    """
+    if not days or not RollupWatermark.objects.filter(name=WATERMARK).exists():
+        return 0
+    for day in sorted(days):
+        _recompute_day(day)
+    return len(days)
+
+
+def rebuild(since=None):
+    """
+    Yig'ma jadvalni ``since`` sanasidan (yoki butunlay) qayta qurish.
+    Qayta hisoblangan kunlar sonini qaytaradi.
+    """
+    high = timezone.now() - datetime.timedelta(seconds=settings.BOOKING_ROLLUPS['LAG'])
+    bookings = Booking.objects.all()
+    stats = DailyBookingStat.objects.all()
+    if since is not None:
+        bookings = bookings.filter(created_at__gte=_day_bounds(since)[0])
+        stats = stats.filter(date__gte=since)
+    with transaction.atomic():
+        stats.delete()
+        rows = list(_aggregate(bookings, group_by_day=True))
+        _store(rows)
+        # Qisman qayta qurishda belgi siljitilmaydi: oldingi kunlardagi o'zgarishlar keyingi refresh da olinadi
+        if since is None:
+            _set_watermark(high)
+    return len({row['day'] for row in rows})
+
+
+def refresh():
+    """
+    Oxirgi belgidan keyin o'zgargan buyurtmalar kunlarini qayta hisoblash.
+    Belgi bo'lmasa jadval to'liq quriladi. Qayta hisoblangan kunlar sonini qaytaradi.
+    """
+    high = timezone.now() - datetime.timedelta(seconds=settings.BOOKING_ROLLUPS['LAG'])
+    with transaction.atomic():
+        # Parallel ishga tushirilgan buyruqlar belgi qatorida navbatga turadi
+        watermark = (
+            RollupWatermark.objects.select_for_update().filter(name=WATERMARK)
+            .values_list('processed_until', flat=True).first()
+        )
+        if watermark is None:
+            return rebuild()
+        if high <= watermark:
+            return 0
+        days = sorted(
+            Booking.objects.filter(updated_at__gt=watermark, updated_at__lte=high)
+            .annotate(day=TruncDate('created_at'))
+            .order_by().values_list('day', flat=True).distinct()
+        )
+        for day in days:
+            _recompute_day(day)
+        _set_watermark(high)
+    return len(days)
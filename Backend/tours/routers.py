@@ -0,0 +1,83 @@
+"""
+Asosiy (primary) baza va o'qish replikalari o'rtasida so'rovlarni taqsimlash.
+
+Sayohat paketlarini o'qish ``settings.DATABASE_REPLICAS`` dagi replikalardan
+biriga yuboriladi, qolgan barcha o'qish va yozishlar ``default`` bazada
+bajariladi. Joriy so'rovda yozish bo'lgan bo'lsa (yoki klient yaqinda yozgan
+bo'lsa — ``ReplicaPinMiddleware`` cookie si), o'qishlar ham asosiy bazaga
+qoladi: foydalanuvchi o'zi yozgan ma'lumotni replikatsiya kechikishisiz ko'radi.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+PRIMARY = 'default'
+
+# Joriy so'rov (yoki thread) asosiy bazaga bog'langanmi
+_pinned = contextvars.ContextVar('tours_db_pinned', default=False)
+
+
+def pin_primary():
+    """Joriy kontekstdagi keyingi o'qishlarni asosiy bazaga yo'naltirish"""
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+@contextmanager
+def primary_reads():
+    """Blok ichidagi o'qishlarni asosiy bazadan bajarish (blokdan keyin oldingi holat qaytadi)"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def start_request(pinned):
+    """So'rov boshida bog'lanish holatini o'rnatish (``end_request`` uchun token qaytaradi)"""
+    return _pinned.set(pinned)
+
+
+def end_request(token):
+    _pinned.reset(token)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASE_REPLICAS if alias in settings.DATABASES]
+
+
+class PrimaryReplicaRouter:
+    """Sayohat paketlari o'qilishi replikalarga, qolgan hammasi asosiy bazaga"""
+
+    # Replikadan o'qiladigan modellar (app_label.model_name)
+    replica_models = {'tours.tourpackage'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in self.replica_models or _pinned.get():
+            return PRIMARY
+        # Tranzaksiya ichida o'qish yozish bilan bir xil bazada bo'lishi kerak
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replikalar asosiy bazaning nusxasi: obyektlar orasidagi bog'lanishlar ruxsat etiladi
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replikalar sxemani asosiy bazadan replikatsiya orqali oladi
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
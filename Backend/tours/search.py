@@ -0,0 +1,147 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import TourPackage
+
+
+TOUR_TABLE = TourPackage._meta.db_table
+FTS_TABLE = 'tours_tourpackage_fts'
+
+# Ustun og'irliklari: sarlavha > manzil > tavsif
+SQLITE_RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+SQLITE_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, location, description,
+        content='{TOUR_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TOUR_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TOUR_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, location, description ON {TOUR_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+]
+
+SQLITE_FTS_OBJECTS = [FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+# Indeks ifodasi va so'rovdagi ifoda bir xil bo'lishi shart
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+POSTGRES_INDEX = 'tours_tourpackage_search_gin'
+
+
+def install_search_index(connection):
+    """Qidiruv indeksini yaratish (takroran chaqirilsa ham xavfsiz)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                SQLITE_FTS_OBJECTS
+            )
+            existing = cursor.fetchone()[0]
+            for statement in SQLITE_FTS_SCHEMA:
+                cursor.execute(statement)
+            # Jadval qayta yaratilganda (migratsiyalar) triggerlar yo'qoladi,
+            # shunda indeks qaytadan quriladi
+            if existing < len(SQLITE_FTS_OBJECTS):
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX} "
+                f"ON {TOUR_TABLE} USING GIN (({POSTGRES_DOCUMENT}))"
+            )
+
+
+def uninstall_search_index(connection):
+    """Qidiruv indeksini o'chirish"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in SQLITE_FTS_OBJECTS[1:]:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+
+
+def rebuild_search_index(connection):
+    """Indeksni jadvaldagi ma'lumotlardan to'liq qayta qurish"""
+    install_search_index(connection)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def search_terms(text):
+    """Qidiruv matnini so'zlarga ajratish (maxsus belgilar tashlab yuboriladi)"""
+    return re.findall(r'\w+', text.lower())
+
+
+def search_tours(queryset, text):
+    """Sayohat paketlarini to'liq matnli indeks bo'yicha qidirish va relevantlik bo'yicha tartiblash"""
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        # Har bir so'z prefiks sifatida qidiriladi (yozish davomida qidirish uchun)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in SQLITE_RANK_WEIGHTS)
+        # Paketlar indeksdan topilgan rowid (primary key) lar bo'yicha olinadi,
+        # relevantlik faqat topilgan qatorlar uchun rowid orqali hisoblanadi
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "{TOUR_TABLE}"."id"',
+                [match], output_field=FloatField()
+            )
+        ).order_by('-search_rank', '-created_at')
+
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            RawSQL(
+                f"({POSTGRES_DOCUMENT}) @@ to_tsquery('simple', %s)",
+                [tsquery], output_field=BooleanField()
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank(({POSTGRES_DOCUMENT}), to_tsquery('simple', %s))",
+                [tsquery], output_field=FloatField()
+            )
+        ).order_by('-search_rank', '-created_at')
+
+    # Boshqa bazalar uchun oddiy qidiruv
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) |
+            Q(description__icontains=term) |
+            Q(location__icontains=term)
+        )
+    return queryset
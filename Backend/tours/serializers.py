@@ -1,37 +1,95 @@
 from rest_framework import serializers
-from .models import TourPackage, Booking, ContactMessage
+from .images import variant_urls
+from .models import TourPackage, Booking, ContactMessage, format_price_uzs
+
+
+# Projeksiya serializerlari ModelSerializer bilan bir xil formatda chiqarishi uchun
+# DRF maydonlaridan faqat formatlash uchun foydalaniladi
+_date_field = serializers.DateField()
+_datetime_field = serializers.DateTimeField()
+_price_field = serializers.DecimalField(max_digits=12, decimal_places=2)
+_revenue_field = serializers.DecimalField(max_digits=16, decimal_places=2)
 
 
 class TourPackageSerializer(serializers.ModelSerializer):
     """Sayohat paketlari uchun serializer"""
     price_uzs = serializers.ReadOnlyField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = TourPackage
         fields = [
-            'id', 'title', 'description', 'image', 'location',
+            'id', 'title', 'description', 'image', 'image_variants', 'location',
             'start_date', 'end_date', 'price', 'price_uzs',
-            'duration', 'is_active', 'created_at', 'updated_at'
+            'duration', 'capacity', 'seats_remaining', 'is_active', 'created_at', 'updated_at',
+            'bookings_count', 'paid_bookings_count', 'paid_revenue'
+        ]
+        read_only_fields = [
+            'seats_remaining', 'created_at', 'updated_at', 'bookings_count', 'paid_bookings_count', 'paid_revenue'
         ]
-        read_only_fields = ['created_at', 'updated_at']
 
+    def get_image_variants(self, obj):
+        return variant_urls(obj.image_variants, self.context.get('request'))
 
-class TourPackageDetailSerializer(serializers.ModelSerializer):
+
+class TourPackageDetailSerializer(TourPackageSerializer):
     """Sayohat paketi tafsilotlari uchun serializer"""
-    price_uzs = serializers.ReadOnlyField()
-    
-    class Meta:
-        model = TourPackage
-        fields = [
-            'id', 'title', 'description', 'image', 'location',
-            'start_date', 'end_date', 'price', 'price_uzs',
-            'duration', 'is_active', 'created_at', 'updated_at'
-        ]
-        read_only_fields = ['created_at', 'updated_at']
+
+
+class TourPackageCardSerializer(serializers.BaseSerializer):
+    """
+    Ro'yxat kartochkalari uchun yengil serializer: ``.values()`` qatorlaridan
+    ishlaydi va tavsifsiz maydonlarni TourPackageSerializer bilan bir xil
+    formatda qaytaradi.
+    """
+    source_fields = (
+        'id', 'title', 'image', 'image_variants', 'location', 'start_date', 'end_date',
+        'price', 'duration'
+    )
+
+    def to_representation(self, row):
+        request = self.context.get('request')
+        image = row['image']
+        if image:
+            image = TourPackage._meta.get_field('image').storage.url(image)
+            if request is not None:
+                image = request.build_absolute_uri(image)
+        else:
+            image = None
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'image': image,
+            'image_variants': variant_urls(row['image_variants'], request),
+            'location': row['location'],
+            'start_date': _date_field.to_representation(row['start_date']),
+            'end_date': _date_field.to_representation(row['end_date']),
+            'price': _price_field.to_representation(row['price']),
+            'price_uzs': format_price_uzs(row['price']),
+            'duration': row['duration'],
+        }
+
+
+class TourPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Sayohat paketini kontekstdagi oldindan yuklangan ``tours`` lug'atidan olish (batch uchun)"""
+
+    def to_internal_value(self, data):
+        tours = self.context.get('tours')
+        if tours is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return tours[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
 
 
 class BookingSerializer(serializers.ModelSerializer):
     """Buyurtma uchun serializer"""
+    serializer_related_field = TourPrimaryKeyField
     tour_title = serializers.CharField(source='tour.title', read_only=True)
     tour_price = serializers.DecimalField(source='tour.price', max_digits=12, decimal_places=2, read_only=True)
     
@@ -39,9 +97,9 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = [
             'id', 'tour', 'tour_title', 'tour_price', 'name', 'phone', 'email',
-            'payment_method', 'is_paid', 'created_at', 'updated_at'
+            'payment_method', 'is_paid', 'status', 'hold_expires_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['is_paid', 'created_at', 'updated_at']
+        read_only_fields = ['is_paid', 'status', 'hold_expires_at', 'created_at', 'updated_at']
 
     def validate(self, data):
         """Validatsiya"""
@@ -58,6 +116,31 @@ class BookingSerializer(serializers.ModelSerializer):
         return data
 
 
+class BookingRowSerializer(serializers.BaseSerializer):
+    """Buyurtmalar ro'yxati uchun ``.values()`` qatorlaridan ishlaydigan yengil serializer"""
+    source_fields = (
+        'id', 'tour', 'tour__title', 'tour__price', 'name', 'phone', 'email',
+        'payment_method', 'is_paid', 'status', 'hold_expires_at', 'created_at', 'updated_at'
+    )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'tour': row['tour'],
+            'tour_title': row['tour__title'],
+            'tour_price': _price_field.to_representation(row['tour__price']),
+            'name': row['name'],
+            'phone': row['phone'],
+            'email': row['email'],
+            'payment_method': row['payment_method'],
+            'is_paid': row['is_paid'],
+            'status': row['status'],
+            'hold_expires_at': _datetime_field.to_representation(row['hold_expires_at']),
+            'created_at': _datetime_field.to_representation(row['created_at']),
+            'updated_at': _datetime_field.to_representation(row['updated_at']),
+        }
+
+
 class ContactMessageSerializer(serializers.ModelSerializer):
     """Kontakt xabar uchun serializer"""
     
@@ -87,4 +170,21 @@ class PaymentVerificationSerializer(serializers.Serializer):
     payment_method = serializers.ChoiceField(choices=Booking.PAYMENT_METHODS)
     transaction_id = serializers.CharField(max_length=255)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
-    status = serializers.CharField(max_length=50) 
\ No newline at end of file
+    status = serializers.CharField(max_length=50) 
+
+class BookingReportRowSerializer(serializers.BaseSerializer):
+    """Hisobot qatorlari (yig'ma jadvaldan ``.values()`` guruhlari)"""
+
+    def to_representation(self, row):
+        data = {'period': _date_field.to_representation(row['period'])}
+        if 'tour_id' in row:
+            data['tour'] = row['tour_id']
+            data['tour_title'] = row['tour__title']
+        if 'payment_method' in row:
+            data['payment_method'] = row['payment_method']
+        data.update({
+            'bookings': row['bookings'],
+            'paid_bookings': row['paid_bookings'],
+            'paid_revenue': _revenue_field.to_representation(row['paid_revenue']),
+        })
+        return data
@@ -0,0 +1,49 @@
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from .cache import bump_catalogue_version
+from .images import generate_image_variants
+from .middleware import install_query_recorder
+from .models import TourPackage
+from .search import install_search_index
+from .sqlite import configure_connection
+from .tasks import background
+
+
+@receiver(post_save, sender=TourPackage)
+@receiver(post_delete, sender=TourPackage)
+def invalidate_catalogue_cache(sender, instance, **kwargs):
+    """Sayohat paketi o'zgarganda (admin list_editable ham) katalog keshini eskirtirish"""
+    # Tranzaksiya yakunlangach oshiriladi, aks holda eski ma'lumot yangi versiya
+    # ostida keshlanib qolishi mumkin
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=TourPackage)
+def schedule_image_variants(sender, instance, created, **kwargs):
+    """Rasm yangilanganda variantlarni fon threadida yaratish"""
+    image_changed = instance.image.name != getattr(instance, '_loaded_image_name', None)
+    if created or image_changed or (instance.image and not instance.image_hash):
+        transaction.on_commit(lambda: background.submit(generate_image_variants, instance.pk))
+
+
+@receiver(post_migrate)
+def ensure_search_index(sender, app_config, using, **kwargs):
+    """Migratsiyalar jadvalni qayta yaratganda yo'qolgan qidiruv triggerlarini tiklash"""
+    connection = connections[using]
+    if app_config.label == 'tours' and TourPackage._meta.db_table in connection.introspection.table_names():
+        install_search_index(connection)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Yangi ulanishga so'rovlar vaqtini o'lchagichni qo'shish"""
+    install_query_recorder(connection)
+
+
+@receiver(connection_created)
+def apply_sqlite_profile(sender, connection, **kwargs):
+    """SQLite ulanishlariga production pragmalarini qo'llash"""
+    configure_connection(connection)
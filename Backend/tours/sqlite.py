@@ -0,0 +1,60 @@
+"""
+Production SQLite profili.
+
+Har bir yangi ulanishga ``SQLITE_PROFILE['PRAGMAS']`` qo'llanadi (WAL, synchronous,
+mmap, kesh). SQLite bir vaqtda faqat bitta yozuvchiga ruxsat beradi, shuning
+uchun jarayon ichidagi buyurtma, kontakt va to'lov yozuvlari ``serialized_write``
+orqali navbat bilan bajariladi: threadlar bazaning busy-handleri o'rniga
+Python qulfida kutadi va "database is locked" xatosiga uchramaydi.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+
+# Qayta kiriladigan qulf: to'lov tasdiqlash view va fon navbatida ichma-ich chaqiriladi
+_write_lock = threading.RLock()
+
+
+def configure_connection(connection):
+    """Yangi SQLite ulanishiga pragmalarni qo'llash"""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PROFILE['ENABLED']:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PROFILE['PRAGMAS'].items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def serialized_write(using=DEFAULT_DB_ALIAS):
+    """
+    Yozish blokini jarayon ichida navbat bilan bajarish (dekorator sifatida ham ishlaydi).
+    Tranzaksiyadan tashqarida ochilishi kerak: qulf COMMIT gacha ushlab turiladi.
+    """
+    if connections[using].vendor != 'sqlite' or not settings.SQLITE_PROFILE['ENABLED']:
+        yield
+        return
+    if not _write_lock.acquire(timeout=settings.SQLITE_PROFILE['WRITE_LOCK_TIMEOUT']):
+        raise OperationalError('database is locked (yozuvchilar navbati kutish vaqti tugadi)')
+    try:
+        yield
+    finally:
+        _write_lock.release()
+
+
+class SerializedWriteMixin:
+    """ModelViewSet uchun: create/update/destroy yozishlari ``serialized_write`` ostida"""
+
+    def perform_create(self, serializer):
+        with serialized_write():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with serialized_write():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with serialized_write():
+            super().perform_destroy(instance)
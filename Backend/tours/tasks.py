@@ -0,0 +1,63 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    """
+    Jarayon ichidagi fon vazifalari navbati: vazifalar bitta daemon threadda
+    ketma-ket bajariladi, so'rov threadi kutmaydi.
+    ``TOURS_TASKS_EAGER`` yoqilgan bo'lsa (testlar) vazifa darhol bajariladi.
+    ``on_start`` — thread ishga tushganda birinchi bajariladigan vazifa (masalan,
+    oldingi jarayondan qolgan ishlarni tiklash).
+    """
+
+    def __init__(self, name, on_start=None):
+        self.name = name
+        self.on_start = on_start
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Vazifani navbatga qo'shish"""
+        if settings.TOURS_TASKS_EAGER:
+            func(*args, **kwargs)
+            return
+        self._ensure_started()
+        self._queue.put((func, args, kwargs))
+
+    def join(self):
+        """Navbatdagi barcha vazifalar tugashini kutish"""
+        self._queue.join()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                if self.on_start is not None:
+                    self._queue.put((self.on_start, (), {}))
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            func, args, kwargs = self._queue.get()
+            close_old_connections()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception('%s: fon vazifasi bajarilmadi (%s)', self.name, getattr(func, '__name__', func))
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+background = BackgroundWorker('tours-background')
@@ -1,3 +1,1448 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import importlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+import warnings
+from pathlib import Path
+from urllib.parse import urlencode
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import async_views, locks, metrics, popularity, rollups
+from .checks import check_payment_providers
+from .exports import EXPORT_FIELDS
+from .filters import TourPackageFilter
+from .cache import CATALOGUE_MODIFIED_KEY
+from .images import generate_image_variants, image_storage
+from .ingest import contact_spool
+from .locks import hold_lock, is_locked
+from .middleware import ReplicaPinMiddleware, RequestTiming, _current
+from .models import Booking, ContactMessage, DailyBookingStat, PaymentTransaction, TourPackage, hold_deadline
+from .payments import StubProvider, payment_queue
+from .routers import end_request, primary_reads, start_request
+from .serializers import (
+    BookingRowSerializer, BookingSerializer, TourPackageCardSerializer, TourPackageSerializer
+)
+from .views import (
+    BookingReportViewSet, BookingViewSet, ContactMessageViewSet, PaymentCallbackView, TourPackageViewSet
+)
+
+
+# Testlar davomida fon vazifalari darhol bajariladi, metrikalar fayllari vaqtinchalik papkaga yoziladi
+PERFORMANCE_SETTINGS = {
+    'TOURS_TASKS_EAGER': True,
+    'REQUEST_TIMING': dict(settings.REQUEST_TIMING, SAMPLE_RATE=0),
+    'METRICS': dict(settings.METRICS, DIRECTORY=os.path.join(tempfile.gettempdir(), 'tours-test-metrics')),
+    'CONTACT_WRITE_BEHIND': dict(settings.CONTACT_WRITE_BEHIND, ENABLED=False),
+    'BOOKING_ROLLUPS': dict(settings.BOOKING_ROLLUPS, LAG=0),
+    # Mashhurlik ballari faqat testlarning o'zi chaqirganda yoziladi (budjetlarga ta'sir qilmaydi)
+    'TOUR_POPULARITY': dict(settings.TOUR_POPULARITY, FLUSH_INTERVAL=24 * 60 * 60),
+    # Testlar DEBUG=False bilan ishlaydi: soxta to'lov tizimiga aniq ruxsat
+    'PAYMENT_SETTINGS': dict(settings.PAYMENT_SETTINGS, ALLOW_STUB=True),
+}
+
+
+def tearDownModule():
+    # Testlardan qolgan mashhurlik hodisalari atexit orqali asosiy bazaga emas, test bazasiga yoziladi
+    with override_settings(**PERFORMANCE_SETTINGS):
+        popularity.popularity.flush()
+
+
+@override_settings(**PERFORMANCE_SETTINGS)
+class PerformanceTestCase(TestCase):
+    """Haqiqatga yaqin hajmdagi ma'lumotlar bilan testlar uchun asosiy klass"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_load_data', tours=200, bookings_per_tour=20, contacts=300, seed=7, stdout=io.StringIO()
+        )
+        cls.tour = TourPackage.objects.filter(is_active=True).first()
+        cls.booking = Booking.objects.filter(is_paid=False).select_related('tour').first()
+        cls.contact = ContactMessage.objects.first()
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+
+    def setUp(self):
+        # Budjetlar keshsiz holat uchun belgilangan
+        cache.clear()
+
+    def booking_payload(self, **extra):
+        return dict({
+            'tour': self.tour.pk,
+            'name': 'Test Mijoz',
+            'phone': '+998901234567',
+            'email': 'mijoz@example.com',
+            'payment_method': 'payme',
+        }, **extra)
+
+    def payment_payload(self, booking, **extra):
+        return dict({
+            'booking_id': booking.pk,
+            'payment_method': booking.payment_method,
+            'transaction_id': f'test-{booking.pk}',
+            'amount': str(booking.tour.price),
+            'status': 'success',
+        }, **extra)
+
+    def signed_callback(self, payload, signature=None):
+        """Callback tanasi va soxta provider imzosi (``client.post`` argumentlari)"""
+        body = json.dumps(payload)
+        if signature is None:
+            signature = StubProvider.sign(body.encode('utf-8'))
+        return body, {'HTTP_X_SIGNATURE': signature}
+
+
+class QueryBudgetTests(PerformanceTestCase):
+    """Har bir endpoint o'zining ``query_budget`` chegarasidan oshmasligi kerak"""
+
+    def assertBudget(self, budget, method, url, data=None, status=200, **extra):
+        """So'rovlar soni ``budget`` dan oshmasligi kerak (streaming javob ham to'liq o'qiladi)"""
+        with CaptureQueriesContext(connection) as context:
+            if method == 'get':
+                response = self.client.get(url, data, **extra)
+            else:
+                response = getattr(self.client, method)(url, data, content_type='application/json', **extra)
+            if response.streaming:
+                response.body = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status, getattr(response, 'data', None))
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertLessEqual(len(context), budget, f'{method.upper()} {url}: {len(context)} > {budget}\n{queries}')
+        return response
+
+    def test_every_action_has_budget(self):
+        standard = ['list', 'retrieve', 'create', 'update', 'partial_update', 'destroy']
+        for viewset in (TourPackageViewSet, BookingViewSet, ContactMessageViewSet, BookingReportViewSet):
+            actions = [name for name in standard if hasattr(viewset, name)]
+            actions += [extra.__name__ for extra in viewset.get_extra_actions()]
+            missing = set(actions) - set(viewset.query_budget)
+            self.assertFalse(missing, f'{viewset.__name__}: query_budget yo\'q: {sorted(missing)}')
+
+    def test_tour_endpoints(self):
+        budget = TourPackageViewSet.query_budget
+        self.assertBudget(budget['list'], 'get', '/api/tours/')
+        cache.clear()
+        self.assertBudget(budget['list'], 'get', '/api/tours/', {'page': 2, 'ordering': 'price', 'departs_within': 90})
+        self.assertBudget(budget['retrieve'], 'get', f'/api/tours/{self.tour.pk}/')
+        self.assertBudget(budget['featured'], 'get', '/api/tours/featured/')
+        self.assertBudget(budget['search'], 'get', '/api/tours/search/', {'q': 'parij', 'max_price': 20000000})
+        self.assertBudget(budget['facets'], 'get', '/api/tours/facets/', {'q': 'sayohat', 'location': 'Parij'})
+
+    def test_tour_list_cached(self):
+        first = self.assertBudget(TourPackageViewSet.query_budget['list'], 'get', '/api/tours/')
+        # Kesh va katalog holati tayyor: na ro'yxat, na 304 bazaga murojaat qiladi
+        self.assertBudget(0, 'get', '/api/tours/')
+        self.assertBudget(0, 'get', '/api/tours/', status=304, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_booking_endpoints(self):
+        budget = BookingViewSet.query_budget
+        self.assertBudget(budget['list'], 'get', '/api/bookings/')
+        self.assertBudget(budget['list'], 'get', '/api/bookings/', {'tour': self.tour.pk})
+        self.assertBudget(budget['list'], 'get', '/api/bookings/', {'is_paid': 'false', 'payment_method': 'click'})
+        self.assertBudget(budget['retrieve'], 'get', f'/api/bookings/{self.booking.pk}/')
+        self.assertBudget(budget['create'], 'post', '/api/bookings/', self.booking_payload(), status=201)
+        self.assertBudget(
+            budget['batch'], 'post', '/api/bookings/batch/', [self.booking_payload()] * 3, status=201
+        )
+        self.assertBudget(
+            budget['verify_payment'], 'post', f'/api/bookings/{self.booking.pk}/verify-payment/',
+            self.payment_payload(self.booking)
+        )
+        self.assertBudget(
+            budget['update'], 'put', f'/api/bookings/{self.booking.pk}/', self.booking_payload()
+        )
+        self.assertBudget(
+            budget['partial_update'], 'patch', f'/api/bookings/{self.booking.pk}/', {'name': 'Yangi Ism'}
+        )
+        self.assertBudget(budget['destroy'], 'delete', f'/api/bookings/{self.booking.pk}/', status=204)
+        held = Booking.objects.filter(status='held').first()
+        self.assertBudget(budget['cancel'], 'post', f'/api/bookings/{held.pk}/cancel/')
+
+    def test_booking_invalid_cursor(self):
+        next_page = self.client.get('/api/bookings/').json()['next']
+        self.assertEqual(self.client.get(next_page).status_code, 200)
+        # Ustun turiga mos kelmaydigan pozitsiya 500 emas, 404 beradi
+        for position in (['x', 'y'], [None, 'y'], 'x', ['2024-01-01T00:00:00+00:00']):
+            cursor = base64.b64encode(urlencode({'p': json.dumps(position)}).encode('ascii')).decode('ascii')
+            response = self.client.get('/api/bookings/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+    def test_booking_export(self):
+        token = RefreshToken.for_user(self.admin_user).access_token
+        # JWT foydalanuvchisi + eksport so'rovi
+        self.assertBudget(
+            1 + BookingViewSet.query_budget['export'], 'get', '/api/bookings/export/',
+            {'output': 'ndjson', 'is_paid': 'true'}, HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+
+    def test_booking_export_csv(self):
+        token = RefreshToken.for_user(self.admin_user).access_token
+        response = self.assertBudget(
+            1 + BookingViewSet.query_budget['export'], 'get', '/api/bookings/export/',
+            {'payment_method': 'click'}, HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        rows = list(csv.DictReader(io.StringIO(response.body.decode('utf-8'))))
+        self.assertEqual(len(rows), Booking.objects.filter(payment_method='click').count())
+        # CSV ustunlari ro'yxat serializeri bilan bir xil
+        self.assertEqual(list(rows[0]), list(BookingRowSerializer().to_representation(
+            Booking.objects.values(*BookingRowSerializer.source_fields).first()
+        )))
+
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            call_command('export_bookings', '--is-paid', 'true')
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0].split(','), EXPORT_FIELDS)
+        self.assertEqual(len(lines) - 1, Booking.objects.filter(is_paid=True).count())
+
+    def test_booking_report(self):
+        call_command('refresh_booking_rollups', stdout=io.StringIO())
+        token = RefreshToken.for_user(self.admin_user).access_token
+        for params in ({}, {'period': 'month', 'group_by': 'tour'}, {'group_by': 'payment_method', 'tour': self.tour.pk}):
+            self.assertBudget(
+                1 + BookingReportViewSet.query_budget['list'], 'get', '/api/reports/bookings/',
+                dict(params, date_from='2000-01-01'), HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+
+    def test_contact_endpoints(self):
+        budget = ContactMessageViewSet.query_budget
+        payload = {'name': 'Test', 'email': 'test@example.com', 'phone': '+998901234567', 'message': 'Salom'}
+        self.assertBudget(budget['list'], 'get', '/api/contact/')
+        self.assertBudget(budget['retrieve'], 'get', f'/api/contact/{self.contact.pk}/')
+        self.assertBudget(budget['create'], 'post', '/api/contact/', payload, status=201)
+        self.assertBudget(budget['receipt'], 'get', '/api/contact/receipt/00000000-0000-0000-0000-000000000000/')
+        self.assertBudget(budget['mark_as_read'], 'post', f'/api/contact/{self.contact.pk}/mark-read/')
+        self.assertBudget(budget['update'], 'put', f'/api/contact/{self.contact.pk}/', payload)
+        self.assertBudget(budget['partial_update'], 'patch', f'/api/contact/{self.contact.pk}/', {'message': 'Yangi'})
+        self.assertBudget(budget['destroy'], 'delete', f'/api/contact/{self.contact.pk}/', status=204)
+
+    def test_payment_callback(self):
+        url = reverse('tours:payment-callback', args=[self.booking.payment_method])
+        body, headers = self.signed_callback(self.payment_payload(self.booking))
+        response = self.assertBudget(
+            PaymentCallbackView.query_budget['post'], 'post', url, body, status=202, **headers
+        )
+        self.assertEqual(response.data['status'], 'queued')
+        # Takroriy callback — faqat bitta indeksli so'rov
+        self.assertBudget(PaymentCallbackView.query_budget['duplicate'], 'post', url, body, **headers)
+
+    def test_metrics(self):
+        self.assertBudget(0, 'get', '/metrics/')
+
+
+class AdminChangelistBudgetTests(PerformanceTestCase):
+    """Admin ro'yxat sahifalari ``changelist_query_budget`` dan oshmasligi kerak"""
+
+    def test_changelists(self):
+        self.client.force_login(self.admin_user)
+        for model in (TourPackage, Booking, ContactMessage):
+            model_admin = admin.site._registry[model]
+            url = reverse(f'admin:tours_{model._meta.model_name}_changelist')
+            with self.subTest(model=model.__name__), self.assertNumQueries(model_admin.changelist_query_budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_booking_changelist_filters(self):
+        self.client.force_login(self.admin_user)
+        budget = admin.site._registry[Booking].changelist_query_budget
+        url = reverse('admin:tours_booking_changelist')
+        for params in ({'is_paid__exact': '1'}, {'tour__id__exact': self.tour.pk}, {'q': 'Karimov'}):
+            with self.subTest(params=params), self.assertNumQueries(budget):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+
+    def test_payment_transaction_changelist(self):
+        self.client.force_login(self.admin_user)
+        model_admin = admin.site._registry[PaymentTransaction]
+        with self.assertNumQueries(model_admin.changelist_query_budget):
+            response = self.client.get(reverse('admin:tours_paymenttransaction_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+
+class RequestTimingTests(PerformanceTestCase):
+    """Serializatsiya vaqti uning ichida bajarilgan SQL vaqtisiz o'lchanishi kerak"""
+
+    def test_serialize_excludes_db(self):
+        timing = RequestTiming()
+        token = _current.set(timing)
+        self.addCleanup(_current.reset, token)
+        started = time.perf_counter()
+        rows = timing.timed(lambda: [booking.tour_id for booking in Booking.objects.all()])()
+        elapsed = time.perf_counter() - started
+
+        self.assertTrue(rows)
+        self.assertEqual(timing.queries, 1)
+        self.assertGreater(timing.db, 0)
+        self.assertLessEqual(timing.serialize + timing.db, elapsed)
+
+    def test_header_optional_log_kept(self):
+        for header in (True, False):
+            timing = dict(settings.REQUEST_TIMING, SAMPLE_RATE=1, HEADER=header)
+            with self.subTest(header=header), override_settings(REQUEST_TIMING=timing):
+                with self.assertLogs('tours.performance', 'INFO'):
+                    response = self.client.get(f'/api/bookings/{self.booking.pk}/')
+                self.assertEqual('Server-Timing' in response, header)
+
+
+class ImageVariantTests(PerformanceTestCase):
+    """Rasm variantlarini yaratish buyrug'i"""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (640, 480), 'teal').save(buffer, format='JPEG')
+        name = image_storage().save('tour_images/test.jpg', ContentFile(buffer.getvalue()))
+        TourPackage.objects.filter(pk=self.tour.pk).update(image=name)
+
+    def generate(self, *args):
+        out = io.StringIO()
+        call_command('generate_image_variants', *args, stdout=out)
+        return out.getvalue()
+
+    def test_force_regenerates_variants(self):
+        self.assertIn('1 ta', self.generate())
+        storage = image_storage()
+        card = TourPackage.objects.get(pk=self.tour.pk).image_variants['card']['jpeg']
+        with storage.open(card, 'wb') as broken:
+            broken.write(b'buzilgan')
+
+        self.generate()
+        with storage.open(card) as variant:
+            self.assertEqual(variant.read(), b'buzilgan')
+
+        self.assertIn('1 ta', self.generate('--force'))
+        self.assertEqual(TourPackage.objects.get(pk=self.tour.pk).image_variants['card']['jpeg'], card)
+        with storage.open(card) as variant:
+            self.assertEqual(Image.open(variant).size, (480, 360))
+
+    def test_stale_save_keeps_variants(self):
+        # Admin paketni variantlar yaratilishidan oldin ochgan va keyin saqlagan
+        stale = TourPackage.objects.get(pk=self.tour.pk)
+        self.generate()
+        fresh = TourPackage.objects.values('image_hash', 'image_variants').get(pk=self.tour.pk)
+        self.assertTrue(fresh['image_variants'])
+
+        stale.title = 'Yangi nom'
+        stale.save()
+        self.assertEqual(TourPackage.objects.values('image_hash', 'image_variants').get(pk=self.tour.pk), fresh)
+
+
+class AsyncTourUrls:
+    """Testlar uchun URL konfiguratsiya: sayohatlarni o'qish async viewlar orqali"""
+    urlpatterns = [
+        path('api/tours/', async_views.tour_list),
+        path('api/tours/featured/', async_views.tour_featured),
+        path('api/tours/search/', async_views.tour_search),
+        path('api/tours/<int:pk>/', async_views.tour_detail),
+    ]
+
+
+class AsyncTourViewTests(PerformanceTestCase):
+    """Async viewlar javobi (xatolar ham) TourPackageViewSet bilan bir xil bo'lishi kerak"""
+
+    async def assertSameResponse(self, url, params=None, status=200):
+        expected = await sync_to_async(self.client.get)(url, params)
+        await sync_to_async(cache.clear)()
+        with override_settings(ROOT_URLCONF=AsyncTourUrls):
+            response = await self.async_client.get(url, params)
+            self.assertIn(response.resolver_match.func, vars(async_views).values())
+        self.assertEqual(expected.status_code, status)
+        self.assertEqual(response.status_code, status, response.content)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    async def test_list(self):
+        await self.assertSameResponse('/api/tours/')
+        await self.assertSameResponse('/api/tours/', {'page': 2, 'ordering': 'price', 'departs_within': 90})
+        await self.assertSameResponse('/api/tours/', {'location': 'Parij', 'duration': 7})
+        await self.assertSameResponse('/api/tours/search/', {'q': 'parij', 'max_price': 20000000})
+        await self.assertSameResponse('/api/tours/featured/')
+
+    async def test_detail(self):
+        await self.assertSameResponse(f'/api/tours/{self.tour.pk}/')
+        await self.assertSameResponse('/api/tours/0/', status=404)
+
+    async def test_invalid_page(self):
+        await self.assertSameResponse('/api/tours/', {'page': 1000}, status=404)
+        await self.assertSameResponse('/api/tours/', {'page': 'oxirgi'}, status=404)
+
+    async def test_invalid_filter(self):
+        await self.assertSameResponse('/api/tours/', {'departs_within': 'tez'}, status=400)
+        await self.assertSameResponse('/api/tours/', {'available_from': '2024-13-45'}, status=400)
+
+
+class CatalogueCacheTests(PerformanceTestCase):
+    """Paket o'zgarishi (model yoki admin orqali) keyingi keshlangan ro'yxatda darhol ko'rinishi kerak"""
+
+    def setUp(self):
+        super().setUp()
+        TourPackage.objects.filter(pk=self.tour.pk).update(
+            price=90000000, image='tour_images/test.jpg', image_hash='0' * 64
+        )
+
+    def top_row(self):
+        return self.client.get('/api/tours/', {'ordering': '-price'}).data['results'][0]
+
+    def assertCachedPrice(self, price):
+        row = self.top_row()
+        self.assertEqual((row['id'], row['price']), (self.tour.pk, price))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.top_row()['price'], price)
+
+    def test_model_save(self):
+        self.assertCachedPrice('90000000.00')
+        tour = TourPackage.objects.get(pk=self.tour.pk)
+        tour.price = 95000000
+        with self.captureOnCommitCallbacks(execute=True):
+            tour.save()
+        self.assertCachedPrice('95000000.00')
+
+    def test_admin_change(self):
+        self.assertCachedPrice('90000000.00')
+        tour = TourPackage.objects.get(pk=self.tour.pk)
+        self.client.force_login(self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:tours_tourpackage_change', args=[tour.pk]), {
+                'title': tour.title, 'description': tour.description, 'location': tour.location,
+                'start_date': tour.start_date.isoformat(), 'end_date': tour.end_date.isoformat(),
+                'price': '97000000', 'duration': tour.duration, 'capacity': '', 'is_active': 'on',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertCachedPrice('97000000.00')
+
+
+class ConditionalGetTests(PerformanceTestCase):
+    """304 faqat mazmun haqiqatan o'zgarmaganda qaytishi kerak"""
+
+    def modified_at(self, when):
+        cache.set(CATALOGUE_MODIFIED_KEY, when, None)
+
+    def get_list(self, **headers):
+        return self.client.get('/api/tours/', **headers)
+
+    def test_list_last_modified(self):
+        hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        self.modified_at(hour_ago)
+        response = self.get_list()
+        self.assertEqual(response['Last-Modified'], http_date(hour_ago.timestamp()))
+        self.assertEqual(self.get_list(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        # O'chirish updated_at maksimumini o'zgartirmaydi, lekin Last-Modified oldinga siljiydi
+        with self.captureOnCommitCallbacks(execute=True):
+            TourPackage.objects.filter(is_active=True).exclude(pk=self.tour.pk).first().delete()
+        response = self.get_list(HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        # Joriy soniyadagi o'zgarish: sana aniqligi yetmaydi, faqat ETag
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_list_last_modified_midnight(self):
+        # Sana filtrlari kun boshida o'zgaradi
+        two_days_ago = timezone.now() - datetime.timedelta(days=2)
+        self.modified_at(two_days_ago)
+        response = self.get_list(HTTP_IF_MODIFIED_SINCE=http_date(two_days_ago.timestamp()))
+        self.assertEqual(response.status_code, 200)
+        midnight = datetime.datetime.combine(timezone.localdate(), datetime.time())
+        self.assertEqual(response['Last-Modified'], http_date(timezone.make_aware(midnight).timestamp()))
+
+    def test_list_unknown_modified(self):
+        # Kesh tozalangan (setUp): oxirgi o'zgarish vaqti noma'lum
+        self.assertFalse(self.get_list().has_header('Last-Modified'))
+
+    def test_detail_etag_after_update(self):
+        url = f'/api/tours/{self.tour.pk}/'
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        tour = TourPackage.objects.get(pk=self.tour.pk)
+        tour.price += 100000
+        tour.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['price'], f'{tour.price:.2f}')
+
+        # Rasm variantlari fon vazifasida .update() orqali yoziladi
+        second = response['ETag']
+        TourPackage.objects.filter(pk=tour.pk).update(image='tour_images/test.jpg')
+        with mock.patch('tours.images.source_hash', return_value='a' * 64), \
+                mock.patch('tours.images.render_variants', return_value={'card': {}}):
+            generate_image_variants(tour.pk)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=second).status_code, 200)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN tekshiruvlari SQLite uchun")
+class IndexUsageTests(PerformanceTestCase):
+    """Asosiy so'rovlar to'liq jadval skanerlashsiz va qo'shimcha tartiblashsiz bajarilishi kerak"""
+
+    def capture(self, url, data=None):
+        statements = []
+
+        def recorder(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('SELECT'):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(recorder):
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return statements
+
+    def plans(self, statements, table):
+        plans = []
+        with connection.cursor() as cursor:
+            for sql, params in statements:
+                if f'FROM "{table}"' in sql:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                    plans.append((sql, '\n'.join(row[-1] for row in cursor.fetchall())))
+        self.assertTrue(plans, f'{table} jadvaliga so\'rov topilmadi')
+        return plans
+
+    def assertIndexed(self, url, table, data=None, ordered=True):
+        for sql, plan in self.plans(self.capture(url, data), table):
+            message = f'\n{sql}\n{plan}'
+            self.assertNotRegex(plan, re.compile(rf'SCAN {table}(?! USING)(?!_)', re.M), message)
+            if ordered and 'ORDER BY' in sql:
+                self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan, message)
+
+    def test_tour_list(self):
+        self.assertIndexed('/api/tours/', 'tours_tourpackage')
+
+    def test_tour_date_window(self):
+        self.assertIndexed('/api/tours/', 'tours_tourpackage', {'departs_within': 60}, ordered=False)
+
+    def test_tour_search(self):
+        # Qatorlar FTS indeksidan olinadi (paket jadvali faqat primary key bo'yicha),
+        # relevantlik bo'yicha tartiblash faqat mos kelganlar ustida bajariladi
+        self.assertIndexed('/api/tours/search/', 'tours_tourpackage', {'q': 'parij'}, ordered=False)
+        cache.clear()
+        plans = self.plans(self.capture('/api/tours/search/', {'q': 'parij'}), 'tours_tourpackage')
+        searches = [(sql, plan) for sql, plan in plans if 'MATCH' in sql]
+        self.assertTrue(searches)
+        for sql, plan in searches:
+            self.assertIn('tours_tourpackage_fts VIRTUAL TABLE', plan, f'\n{sql}\n{plan}')
+
+    def test_tour_search_ranking(self):
+        def tour(**fields):
+            return TourPackage.objects.create(**dict({
+                'title': 'Oddiy sayohat', 'description': "Qisqa tavsif", 'location': 'Toshkent',
+                'start_date': datetime.date(2030, 1, 1), 'end_date': datetime.date(2030, 1, 5),
+                'price': 1000000, 'duration': 4,
+            }, **fields))
+
+        # Sarlavha > manzil > tavsif; yangi paket ustunlik qilmasligi uchun teskari tartibda yaratiladi
+        in_description = tour(description="Zumrad ko'li bo'ylab sayohat")
+        in_location = tour(location="Zumrad vodiysi")
+        in_title = tour(title='Zumrad sayohati')
+        response = self.client.get('/api/tours/search/', {'q': 'zumrad'})
+        self.assertEqual([row['id'] for row in response.data], [in_title.pk, in_location.pk, in_description.pk])
+
+    @override_settings(TOURS_SEARCH_LIMIT=5)
+    def test_tour_search_limit(self):
+        response = self.client.get('/api/tours/search/', {'q': 'sayohat'})
+        self.assertEqual(len(response.data), 5)
+
+    def test_tour_featured(self):
+        self.assertIndexed('/api/tours/featured/', 'tours_tourpackage')
+
+    def test_booking_list(self):
+        self.assertIndexed('/api/bookings/', 'tours_booking')
+        self.assertIndexed('/api/bookings/', 'tours_booking', {'tour': self.tour.pk})
+        self.assertIndexed('/api/bookings/', 'tours_booking', {'is_paid': 'true'})
+        self.assertIndexed('/api/bookings/', 'tours_booking', {'is_paid': 'false'})
+
+
+class TourStatsTests(PerformanceTestCase):
+    """Paket hisoblagichlari barcha yozish yo'llarida buyurtmalar bilan mos qolishi kerak"""
+
+    def assertStats(self, tour, bookings, paid):
+        tour.refresh_from_db()
+        self.assertEqual((tour.bookings_count, tour.paid_bookings_count), (bookings, paid))
+        self.assertEqual(tour.paid_revenue, paid * tour.price)
+
+    def test_counters_follow_writes(self):
+        tour = self.tour
+        bookings = tour.booking_set.count()
+        paid = tour.booking_set.filter(is_paid=True).count()
+        self.assertStats(tour, bookings, paid)
+
+        response = self.client.post('/api/bookings/', self.booking_payload(), content_type='application/json')
+        booking = Booking.objects.get(pk=response.data['booking_id'])
+        self.client.post('/api/bookings/batch/', [self.booking_payload()] * 2, content_type='application/json')
+        self.assertStats(tour, bookings + 3, paid)
+
+        self.client.post(
+            f'/api/bookings/{booking.pk}/verify-payment/', self.payment_payload(booking), content_type='application/json'
+        )
+        self.assertStats(tour, bookings + 3, paid + 1)
+
+        # Admin list_editable va API orqali saqlash save() dan o'tadi
+        booking.refresh_from_db()
+        booking.is_paid = False
+        booking.save()
+        self.assertStats(tour, bookings + 3, paid)
+
+        self.client.delete(f'/api/bookings/{booking.pk}/')
+        self.assertStats(tour, bookings + 2, paid)
+
+        admin.site._registry[Booking].delete_queryset(None, tour.booking_set.filter(is_paid=True))
+        self.assertStats(tour, bookings + 2 - paid, 0)
+        self.assertEqual(TourPackage.objects.reconcile_stats(), 0)
+
+    def test_reconcile_repairs_drift(self):
+        TourPackage.objects.filter(pk=self.tour.pk).update(bookings_count=0, paid_bookings_count=0, paid_revenue=0)
+        out = io.StringIO()
+        call_command('reconcile_tour_stats', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertStats(
+            self.tour, self.tour.booking_set.count(), self.tour.booking_set.filter(is_paid=True).count()
+        )
+
+    def test_reconcile_repairs_seats(self):
+        TourPackage.objects.filter(pk=self.tour.pk).update(capacity=1000, seats_remaining=0)
+        call_command('reconcile_tour_stats', '--tour', str(self.tour.pk), stdout=io.StringIO())
+        occupied = self.tour.booking_set.filter(status__in=Booking.OCCUPYING_STATUSES).count()
+        self.assertEqual(TourPackage.objects.get(pk=self.tour.pk).seats_remaining, 1000 - occupied)
+
+    def test_migration_backfills_stats(self):
+        # 0009 gacha yaratilgan buyurtmalar: hisoblagichlar noldan boshlanardi
+        migration = importlib.import_module('tours.migrations.0009_tourpackage_booking_stats')
+        TourPackage.objects.update(bookings_count=0, paid_bookings_count=0, paid_revenue=0)
+        migration.backfill_booking_stats(django_apps, None)
+        self.assertEqual(TourPackage.objects.reconcile_stats(), 0)
+        booking = self.tour.booking_set.first()
+        booking.delete()
+        self.assertEqual(TourPackage.objects.reconcile_stats(), 0)
+
+
+class PaymentCallbackTests(PerformanceTestCase):
+    """Callbacklar imzo bilan tekshiriladi, 202 dan oldin saqlanadi va bir marta qayta ishlanadi"""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('tours:payment-callback', args=[self.booking.payment_method])
+        self.payload = self.payment_payload(self.booking)
+
+    def callback(self, payload=None, signature=None):
+        body, headers = self.signed_callback(payload or self.payload, signature)
+        return self.client.post(self.url, body, content_type='application/json', **headers)
+
+    def transactions(self):
+        return PaymentTransaction.objects.filter(transaction_id=self.payload['transaction_id'])
+
+    def test_signature_rejected(self):
+        self.assertEqual(self.callback(signature='').status_code, 403)
+        self.assertEqual(self.callback(signature=StubProvider.sign(b'boshqa tana')).status_code, 403)
+        self.assertFalse(self.transactions().exists())
+        self.assertFalse(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+    def test_unknown_booking(self):
+        self.assertEqual(self.callback(dict(self.payload, booking_id=0)).status_code, 404)
+        self.assertFalse(self.transactions().exists())
+
+    def test_duplicate_callbacks(self):
+        paid = TourPackage.objects.get(pk=self.booking.tour_id).paid_bookings_count
+        self.assertEqual(self.callback().status_code, 202)
+        for _ in range(3):
+            response = self.callback()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['status'], response.data['result']), ('duplicate', 'confirmed'))
+        self.assertEqual(self.transactions().count(), 1)
+        self.assertTrue(Booking.objects.get(pk=self.booking.pk).is_paid)
+        self.assertEqual(TourPackage.objects.get(pk=self.booking.tour_id).paid_bookings_count, paid + 1)
+
+    def test_callback_survives_lost_queue(self):
+        # Navbatdagi vazifa yo'qoldi (jarayon 202 dan keyin to'xtadi): callback bazada qoladi
+        with mock.patch.object(payment_queue, 'submit'):
+            self.assertEqual(self.callback().status_code, 202)
+            # Yakunlanmagan callbackning takrori yozuvni yangilab, qayta navbatga qo'yiladi
+            self.assertEqual(self.callback().status_code, 202)
+        self.assertEqual(list(self.transactions().values_list('status', flat=True)), ['pending'])
+        self.assertFalse(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+        out = io.StringIO()
+        call_command('process_payment_callbacks', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(list(self.transactions().values_list('status', flat=True)), ['confirmed'])
+        self.assertTrue(Booking.objects.get(pk=self.booking.pk).is_paid)
+        self.assertEqual(self.callback().data['result'], 'confirmed')
+
+    def test_pending_then_success(self):
+        # Oraliq holat tranzaksiyani band qilmaydi: shu ID bilan keyingi success to'lovni tasdiqlaydi
+        self.assertEqual(self.callback(dict(self.payload, status='processing')).status_code, 202)
+        self.assertFalse(self.transactions().exists())
+        self.assertFalse(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+        self.assertEqual(self.callback().status_code, 202)
+        self.assertEqual(list(self.transactions().values_list('status', flat=True)), ['confirmed'])
+        self.assertTrue(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+    def test_pending_updated_before_processing(self):
+        with mock.patch.object(payment_queue, 'submit'):
+            self.assertEqual(self.callback(dict(self.payload, status='processing')).status_code, 202)
+            self.assertEqual(self.callback().status_code, 202)
+        self.assertEqual(list(self.transactions().values_list('callback_status', flat=True)), ['success'])
+        call_command('process_payment_callbacks', stdout=io.StringIO())
+        self.assertTrue(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+    def test_wrong_amount_then_success(self):
+        url = f'/api/bookings/{self.booking.pk}/verify-payment/'
+        response = self.client.post(url, dict(self.payload, amount='1.00'), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.transactions().exists())
+        response = self.client.post(url, self.payload, content_type='application/json')
+        self.assertEqual(response.data['status'], 'paid')
+
+    def test_failure_is_final(self):
+        self.assertEqual(self.callback(dict(self.payload, status='failed')).status_code, 202)
+        self.assertEqual(list(self.transactions().values_list('status', flat=True)), ['rejected'])
+        response = self.callback()
+        self.assertEqual((response.data['status'], response.data['result']), ('duplicate', 'rejected'))
+        self.assertFalse(Booking.objects.get(pk=self.booking.pk).is_paid)
+
+    def test_stub_requires_opt_in(self):
+        with override_settings(PAYMENT_SETTINGS=dict(settings.PAYMENT_SETTINGS, ALLOW_STUB=False)):
+            self.assertEqual(self.callback().status_code, 503)
+            response = self.client.post(
+                f'/api/bookings/{self.booking.pk}/verify-payment/', self.payload, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual([error.id for error in check_payment_providers(None)], ['tours.E001'] * 3)
+        self.assertFalse(self.transactions().exists())
+        self.assertEqual(check_payment_providers(None), [])
+
+
+class PopularityTests(PerformanceTestCase):
+    """Featured reytingi ko'rish, buyurtma va to'lov hodisalaridan yig'ilishi kerak"""
+
+    def setUp(self):
+        super().setUp()
+        # Oldingi testlardan qolgan hodisalar
+        popularity.popularity.flush()
+
+    def featured_ids(self):
+        return [row['id'] for row in self.client.get('/api/tours/featured/').data]
+
+    def test_forward_decay(self):
+        half_life = settings.TOUR_POPULARITY['HALF_LIFE']
+        now = popularity.time.time()
+        self.assertAlmostEqual(
+            popularity.event_score('view', now + half_life) / popularity.event_score('view', now), 2.0
+        )
+
+    def test_ranking_follows_activity(self):
+        TourPackage.objects.update(popularity=0)
+        viewed, booked = TourPackage.objects.filter(is_active=True).exclude(pk=self.tour.pk)[:2]
+        before = self.client.get('/api/tours/featured/')
+
+        for _ in range(3):
+            self.client.get(f'/api/tours/{viewed.pk}/')
+        self.client.post(
+            '/api/bookings/', self.booking_payload(tour=booked.pk), content_type='application/json'
+        )
+        # Flushgacha featured o'zgarmaydi (bitta keshdagi qiymat)
+        self.assertEqual(self.featured_ids(), [row['id'] for row in before.data])
+        self.assertEqual(popularity.popularity.flush(), 2)
+
+        after = self.client.get('/api/tours/featured/', HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual([row['id'] for row in after.data][:2], [booked.pk, viewed.pk])
+        # Oldindan hisoblangan ro'yxat: qayta so'rov bazaga murojaat qilmaydi
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/tours/featured/', HTTP_IF_NONE_MATCH=after['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_timer_flushes_without_later_events(self):
+        TourPackage.objects.update(popularity=0)
+        with mock.patch.object(popularity.threading, 'Timer') as timer:
+            popularity.popularity.record(self.tour.pk, 'view')
+            popularity.popularity.record(self.tour.pk, 'view')
+        # Bitta taymer, qolgan vaqt FLUSH_INTERVAL dan oshmaydi
+        timer.assert_called_once()
+        delay, func = timer.call_args.args
+        self.assertLessEqual(delay, settings.TOUR_POPULARITY['FLUSH_INTERVAL'])
+        func(*timer.call_args.kwargs['args'])
+
+        self.assertGreater(TourPackage.objects.get(pk=self.tour.pk).popularity, 0)
+        timer.return_value.cancel.assert_called_once()
+        self.assertIsNone(popularity.popularity._timer)
+
+    def test_flush_at_exit(self):
+        TourPackage.objects.update(popularity=0)
+        with mock.patch.object(popularity.threading, 'Timer'):
+            popularity.popularity.record(self.tour.pk, 'booking')
+        popularity.popularity.flush_at_exit()
+        self.assertGreater(TourPackage.objects.get(pk=self.tour.pk).popularity, 0)
+
+    def test_rebuild(self):
+        out = io.StringIO()
+        call_command('rebuild_popularity', stdout=out)
+        top = TourPackage.objects.filter(is_active=True).order_by('-popularity').first()
+        self.assertGreater(top.popularity, 0)
+        self.assertEqual(self.featured_ids()[0], top.pk)
+
+
+@override_settings(**PERFORMANCE_SETTINGS)
+class FacetTests(TestCase):
+    """Facet o'z filtrisiz, qolgan filtrlar va ``q`` qidiruvi bilan hisoblanadi (kichik ma'lum to'plamda)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def tour(title, location, duration, price, is_active=True):
+            TourPackage.objects.create(
+                title=title, description='Sayohat', location=location, duration=duration, price=price,
+                start_date=datetime.date(2030, 6, 1), end_date=datetime.date(2030, 6, 1 + duration),
+                is_active=is_active,
+            )
+
+        tour('Parij romantikasi', 'Parij, Fransiya', 5, 2500000)
+        tour('Parij va Nitstsa', 'Parij, Fransiya', 7, 6000000)
+        tour('Istanbul sayohati', 'Istanbul, Turkiya', 5, 4000000)
+        tour('Dubay shoping', 'Dubay, BAA', 7, 12000000)
+        tour('Parij arxivi', 'Parij, Fransiya', 5, 2000000, is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def facets(self, **params):
+        response = self.client.get('/api/tours/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return (
+            [(row['value'], row['count']) for row in data['locations']],
+            [(row['value'], row['count']) for row in data['durations']],
+            [row['count'] for row in data['price_ranges']],
+        )
+
+    def test_unfiltered(self):
+        response = self.client.get('/api/tours/facets/').json()
+        self.assertEqual(
+            [(row['min'], row['max']) for row in response['price_ranges']],
+            [(None, 3000000), (3000000, 5000000), (5000000, 7000000), (7000000, 10000000), (10000000, None)],
+        )
+        self.assertEqual(self.facets(), (
+            [('Parij, Fransiya', 2), ('Dubay, BAA', 1), ('Istanbul, Turkiya', 1)],
+            [(5, 2), (7, 2)],
+            [1, 1, 1, 0, 1],
+        ))
+
+    def test_facet_ignores_own_filter(self):
+        # Manzil faceti davomiylik filtrini, davomiylik faceti manzil filtrini qo'llaydi; narx ikkalasini
+        self.assertEqual(self.facets(location='Parij', duration=7), (
+            [('Dubay, BAA', 1), ('Parij, Fransiya', 1)],
+            [(5, 1), (7, 1)],
+            [0, 0, 1, 0, 0],
+        ))
+        self.assertEqual(self.facets(min_price=3000000, max_price=7000000), (
+            [('Istanbul, Turkiya', 1), ('Parij, Fransiya', 1)],
+            [(5, 1), (7, 1)],
+            [1, 1, 1, 0, 1],
+        ))
+
+    def test_search_restriction(self):
+        self.assertEqual(self.facets(q='parij'), ([('Parij, Fransiya', 2)], [(5, 1), (7, 1)], [1, 0, 1, 0, 0]))
+        self.assertEqual(
+            self.facets(q='parij', max_price=5000000), ([('Parij, Fransiya', 1)], [(5, 1)], [1, 0, 1, 0, 0])
+        )
+        self.assertEqual(self.facets(q='zumrad'), ([], [], [0, 0, 0, 0, 0]))
+
+
+class TravelWindowFilterTests(TestCase):
+    """Sana oralig'i filtrlari: chegaralar kiradi, o'tgan sanalar bugunga qisiladi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+
+        def tour(title, start, end):
+            return TourPackage.objects.create(
+                title=title, description='Sayohat', location='Toshkent', price=1000000, duration=end - start,
+                start_date=today + datetime.timedelta(days=start), end_date=today + datetime.timedelta(days=end),
+            )
+
+        cls.past = tour("O'tgan", -10, -5)
+        cls.today = tour('Bugun', 0, 3)
+        cls.middle = tour("O'rtada", 10, 15)
+        cls.late = tour('Kech', 30, 40)
+
+    def titles(self, **params):
+        today = timezone.localdate()
+        params = {
+            name: (today + datetime.timedelta(days=value)).isoformat() if name.startswith('available') else value
+            for name, value in params.items()
+        }
+        filterset = TourPackageFilter(params, queryset=TourPackage.objects.order_by('start_date'))
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return [tour.title for tour in filterset.qs]
+
+    def test_boundaries_inclusive(self):
+        self.assertEqual(self.titles(available_from=10), ["O'rtada", 'Kech'])
+        self.assertEqual(self.titles(available_to=15), ['Bugun', "O'rtada"])
+        self.assertEqual(self.titles(available_from=10, available_to=15), ["O'rtada"])
+        self.assertEqual(self.titles(departs_within=10), ['Bugun', "O'rtada"])
+        self.assertEqual(self.titles(departs_within=0), ['Bugun'])
+
+    def test_past_date_clamped(self):
+        self.assertEqual(self.titles(available_from=-100), ['Bugun', "O'rtada", 'Kech'])
+        self.assertEqual(self.titles(available_from=-100, available_to=-1), [])
+
+    def test_empty_window(self):
+        self.assertEqual(self.titles(available_from=16, available_to=29), [])
+        self.assertEqual(self.titles(available_from=12, available_to=14), [])
+        self.assertEqual(self.titles(available_from=20, available_to=10), [])
+
+
+class ProjectionSerializerTests(PerformanceTestCase):
+    """``.values()`` serializerlari saqlangan maydonlar uchun ModelSerializer bilan baytma-bayt bir xil"""
+
+    def setUp(self):
+        super().setUp()
+        TourPackage.objects.filter(pk=self.tour.pk).update(
+            image='tour_images/parij.jpg', image_hash='a' * 64,
+            image_variants={
+                'card': {'jpeg': 'tour_images/variants/aa/card.jpg', 'webp': 'tour_images/variants/aa/card.webp'}
+            },
+        )
+        self.request = Request(APIRequestFactory().get('/api/tours/'))
+
+    def assertSameOutput(self, full, projected):
+        full = {name: full[name] for name in projected}
+        self.assertEqual(projected, full)
+        self.assertEqual(JSONRenderer().render(projected), JSONRenderer().render(full))
+
+    def test_tour_cards(self):
+        other = TourPackage.objects.exclude(pk=self.tour.pk).first()
+        tours = TourPackage.objects.filter(pk__in=[self.tour.pk, other.pk])
+        rows = {row['id']: row for row in tours.values(*TourPackageCardSerializer.source_fields)}
+        for context in ({}, {'request': self.request}):
+            for tour in tours:
+                with self.subTest(tour=tour.pk, request=bool(context)):
+                    card = TourPackageCardSerializer(rows[tour.pk], context=context).data
+                    self.assertSameOutput(TourPackageSerializer(tour, context=context).data, card)
+        card = TourPackageCardSerializer(rows[self.tour.pk], context={'request': self.request}).data
+        self.assertEqual(card['image'], 'http://testserver/media/tour_images/parij.jpg')
+        self.assertIsNone(TourPackageCardSerializer(rows[other.pk]).data['image'])
+
+    def test_booking_rows(self):
+        bookings = Booking.objects.select_related('tour').filter(
+            pk__in=[
+                Booking.objects.filter(hold_expires_at__isnull=True).first().pk,
+                Booking.objects.filter(hold_expires_at__isnull=False).first().pk,
+            ]
+        )
+        rows = {row['id']: row for row in bookings.values(*BookingRowSerializer.source_fields)}
+        for booking in bookings:
+            with self.subTest(booking=booking.pk):
+                self.assertSameOutput(BookingSerializer(booking).data, BookingRowSerializer(rows[booking.pk]).data)
+
+
+class BookingBatchTests(PerformanceTestCase):
+    """Batch: xatolar indeks bo'yicha, yaroqli buyurtmalar yaratiladi, joyi qolmagan paket boshqalarni to'xtatmaydi"""
+
+    def post(self, items):
+        return self.client.post('/api/bookings/batch/', items, content_type='application/json')
+
+    def created(self, response):
+        ids = [booking['booking_id'] for booking in response.data['bookings'] if booking]
+        return list(Booking.objects.filter(pk__in=ids).order_by('pk').values_list('name', 'tour_id'))
+
+    def full_tour(self):
+        tour = TourPackage.objects.filter(is_active=True).exclude(pk=self.tour.pk).first()
+        tour.booking_set.filter(status='held').update(hold_expires_at=hold_deadline())
+        tour.capacity = tour.booking_set.filter(status__in=Booking.OCCUPYING_STATUSES).count()
+        tour.save()
+        return tour
+
+    def test_mixed_validity(self):
+        bookings = TourPackage.objects.get(pk=self.tour.pk).bookings_count
+        response = self.post([
+            self.booking_payload(name='Birinchi'),
+            self.booking_payload(name='Ikkinchi', email='email-emas'),
+            self.booking_payload(name='Uchinchi'),
+            self.booking_payload(name='Tortinchi', tour=0),
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([bool(booking) for booking in response.data['bookings']], [True, False, True, False])
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertEqual(list(response.data['errors'][1]), ['email'])
+        self.assertEqual(response.data['errors'][2], {})
+        self.assertEqual(list(response.data['errors'][3]), ['tour'])
+        self.assertEqual(self.created(response), [('Birinchi', self.tour.pk), ('Uchinchi', self.tour.pk)])
+        self.assertEqual(TourPackage.objects.get(pk=self.tour.pk).bookings_count, bookings + 2)
+
+    def test_sold_out_tour_in_middle(self):
+        full = self.full_tour()
+        full_bookings = full.booking_set.count()
+        response = self.post([
+            self.booking_payload(name='Birinchi'),
+            self.booking_payload(name="To'liq", tour=full.pk),
+            self.booking_payload(name='Uchinchi'),
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['bookings'][1], None)
+        self.assertEqual(response.data['errors'], [{}, {'tour': ["Sayohat paketida bo'sh joy qolmagan"]}, {}])
+        self.assertEqual(self.created(response), [('Birinchi', self.tour.pk), ('Uchinchi', self.tour.pk)])
+        self.assertEqual(full.booking_set.count(), full_bookings)
+        self.assertEqual(TourPackage.objects.get(pk=full.pk).seats_remaining, 0)
+
+    def test_nothing_created(self):
+        count = Booking.objects.count()
+        response = self.post([self.booking_payload(email='email-emas'), self.booking_payload(phone='')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([list(error) for error in response.data['errors']], [['email'], ['phone']])
+
+        full = self.full_tour()
+        response = self.post([self.booking_payload(tour=full.pk)] * 2)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['tours'], [full.pk])
+        self.assertEqual(Booking.objects.count(), count)
+
+
+class SeatInventoryTests(PerformanceTestCase):
+    """Paket sig'imidan ortiq joy band qilinmasligi, bekor qilish va muddat tugashi joyni qaytarishi kerak"""
+
+    def setUp(self):
+        super().setUp()
+        # Sintetik bandlarning muddati allaqachon o'tgan: ular hali amal qiladi deb olinadi
+        self.tour.booking_set.filter(status='held').update(hold_expires_at=hold_deadline())
+        occupied = self.tour.booking_set.filter(status__in=Booking.OCCUPYING_STATUSES).count()
+        self.tour.capacity = occupied + 2
+        self.tour.save()
+
+    def book(self):
+        return self.client.post('/api/bookings/', self.booking_payload(), content_type='application/json')
+
+    def assertSeats(self, seats):
+        self.tour.refresh_from_db()
+        self.assertEqual(self.tour.seats_remaining, seats)
+
+    def test_capacity_and_cancel(self):
+        self.assertSeats(2)
+        first = self.book()
+        self.assertEqual(first.status_code, 201)
+        self.assertSeats(1)
+
+        # Batch joy yetmasa butunlay rad etiladi
+        bookings = self.tour.booking_set.count()
+        response = self.client.post(
+            '/api/bookings/batch/', [self.booking_payload()] * 2, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['tours'], [self.tour.pk])
+        self.assertEqual(self.tour.booking_set.count(), bookings)
+
+        self.assertEqual(self.book().status_code, 201)
+        self.assertEqual(self.book().status_code, 409)
+        self.assertSeats(0)
+
+        cancel = f'/api/bookings/{first.data["booking_id"]}/cancel/'
+        self.assertEqual(self.client.post(cancel).status_code, 200)
+        self.assertEqual(self.client.post(cancel).status_code, 409)
+        self.assertSeats(1)
+        self.assertEqual(Booking.objects.get(pk=first.data['booking_id']).status, 'cancelled')
+
+        # Sig'im o'zgarsa bo'sh joylar qayta hisoblanadi
+        self.tour.capacity += 3
+        self.tour.save()
+        self.assertSeats(4)
+        self.assertEqual(TourPackage.objects.reconcile_stats(), 0)
+
+    def test_move_to_full_tour(self):
+        other = TourPackage.objects.exclude(pk=self.tour.pk).filter(capacity__isnull=True).first()
+        moved = self.client.post(
+            '/api/bookings/', self.booking_payload(tour=other.pk), content_type='application/json'
+        ).data['booking_id']
+        first = self.book().data['booking_id']
+        self.book()
+        self.assertSeats(0)
+
+        url = f'/api/bookings/{moved}/'
+        response = self.client.patch(url, {'tour': self.tour.pk}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['tours'], [self.tour.pk])
+        response = self.client.put(url, self.booking_payload(name='Boshqa'), content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        booking = Booking.objects.get(pk=moved)
+        self.assertEqual((booking.tour_id, booking.name), (other.pk, 'Test Mijoz'))
+
+        self.client.post(f'/api/bookings/{first}/cancel/')
+        response = self.client.patch(url, {'tour': self.tour.pk}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['tour'], self.tour.pk)
+        self.assertSeats(0)
+        self.assertEqual(TourPackage.objects.reconcile_stats(), 0)
+
+    def test_holds_expire(self):
+        def expire_latest_hold():
+            booking = self.tour.booking_set.filter(status='held').latest('pk')
+            booking.hold_expires_at = hold_deadline() - datetime.timedelta(days=1)
+            booking.save()
+
+        self.assertEqual(self.book().status_code, 201)
+        self.assertEqual(self.book().status_code, 201)
+        self.assertSeats(0)
+
+        # Joy qolmaganda muddati o'tgan band darhol bo'shatiladi
+        expire_latest_hold()
+        self.assertEqual(self.book().status_code, 201)
+        self.assertSeats(0)
+
+        expire_latest_hold()
+        call_command('expire_booking_holds', stdout=io.StringIO())
+        self.assertSeats(1)
+        self.assertFalse(Booking.objects.expired_holds().exists())
+
+        expired = Booking.objects.filter(status='expired').select_related('tour').first()
+        response = self.client.post(
+            f'/api/bookings/{expired.pk}/verify-payment/', self.payment_payload(expired),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.get(pk=expired.pk).is_paid)
+
+
+@override_settings(**PERFORMANCE_SETTINGS)
+class SeatStressTests(TransactionTestCase):
+    """Ko'p threadli bir vaqtdagi buyurtmalar: sig'imdan ortiq joy sotilmasligi kerak"""
+    capacity = 50
+    attempts = 300
+    workers = 32
+
+    def test_no_oversell(self):
+        tour = TourPackage.objects.create(
+            title='Stress', description='Stress', location='Samarqand',
+            start_date=datetime.date(2030, 1, 1), end_date=datetime.date(2030, 1, 5),
+            price=1000000, duration=4, capacity=self.capacity,
+        )
+        payload = {
+            'tour': tour.pk, 'name': 'Test Mijoz', 'phone': '+998901234567',
+            'email': 'mijoz@example.com', 'payment_method': 'click',
+        }
+        attempts = iter(range(self.attempts))
+        statuses = []
+        start = threading.Barrier(self.workers)
+
+        def worker():
+            client = APIClient()
+            start.wait()
+            try:
+                for number in attempts:
+                    if number % 10 == 0:
+                        response = client.post('/api/bookings/batch/', {'bookings': [payload] * 3}, format='json')
+                    else:
+                        response = client.post('/api/bookings/', payload, format='json')
+                    statuses.append(response.status_code)
+            finally:
+                # Test bazasi o'chirilishidan oldin thread ulanishi yopiladi
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(set(statuses) - {201, 409}, set(), statuses)
+        tour.refresh_from_db()
+        self.assertEqual(tour.seats_remaining, 0)
+        self.assertEqual(tour.booking_set.count(), self.capacity)
+        self.assertEqual(tour.bookings_count, self.capacity)
+        # Yozishlar navbat bilan, har biri bitta shartli UPDATE: yuzlab urinish bir necha soniyada
+        self.assertLess(elapsed, 30, f'{self.attempts} ta urinish {elapsed:.1f} soniya')
+
+
+class BookingRollupTests(PerformanceTestCase):
+    """Yig'ma jadval o'zgargan buyurtmalar bo'yicha yangilanib, xom ma'lumot bilan mos qolishi kerak"""
+
+    def assertRollupsMatch(self):
+        totals = DailyBookingStat.objects.aggregate(
+            bookings=Sum('bookings'), paid=Sum('paid_bookings'), revenue=Sum('paid_revenue')
+        )
+        paid = Booking.objects.filter(is_paid=True)
+        self.assertEqual(totals, {
+            'bookings': Booking.objects.count(),
+            'paid': paid.count(),
+            'revenue': paid.aggregate(revenue=Sum('tour__price'))['revenue'],
+        })
+
+    def test_incremental_refresh(self):
+        self.assertEqual(rollups.refresh(), rollups.rebuild())
+        self.assertRollupsMatch()
+        self.assertEqual(rollups.refresh(), 0)
+
+        self.client.post('/api/bookings/', self.booking_payload(), content_type='application/json')
+        booking = Booking.objects.filter(is_paid=False).exclude(tour=self.tour).first()
+        booking.tour = self.tour
+        booking.is_paid = True
+        booking.save()
+        self.assertGreaterEqual(rollups.refresh(), 1)
+        self.assertRollupsMatch()
+
+    def test_deleted_bookings_recomputed(self):
+        rollups.rebuild()
+        Booking.objects.filter(is_paid=True).first().delete()
+        self.assertRollupsMatch()
+
+        admin.site._registry[Booking].delete_queryset(None, Booking.objects.filter(tour=self.tour))
+        self.assertRollupsMatch()
+        # Keyingi yangilash o'chirilgan buyurtmalarni allaqachon hisobga olgan jadvalni o'zgartirmaydi
+        rollups.refresh()
+        self.assertRollupsMatch()
+
+
+@override_settings(**PERFORMANCE_SETTINGS)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Ikki SQLite bazasi (asosiy + ``sync_sqlite_replicas`` nusxasi): paketlar replikadan o'qiladi,
+    yozishdan keyin va tranzaksiya ichida o'qish asosiy bazada qoladi.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Replika — alohida SQLite fayli (MIRROR emas); ulanish faqat shu test threadida yaratiladi
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        replica = dict(connections['default'].settings_dict, NAME=os.path.join(directory.name, 'replica.sqlite3'))
+        connections['replica1'] = connections['default'].__class__(replica, 'replica1')
+        cls.addClassCleanup(connections['replica1'].close)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', 'Overriding setting DATABASES')
+            cls.enterClassContext(override_settings(
+                DATABASES=dict(settings.DATABASES, replica1=replica), DATABASE_REPLICAS=['replica1']
+            ))
+
+    def setUp(self):
+        cache.clear()
+        self.tour = TourPackage.objects.create(
+            title='Eski nom', description='Replika', location='Buxoro',
+            start_date=datetime.date(2030, 1, 1), end_date=datetime.date(2030, 1, 5),
+            price=1000000, duration=4,
+        )
+        call_command('sync_sqlite_replicas', stdout=io.StringIO())
+
+        # Primary o'zgaradi, replika eski holatda qoladi (replikatsiya kechikishi)
+        self.tour.title = 'Yangi nom'
+        self.tour.save()
+        self.unpin()
+
+    def unpin(self):
+        # Test threadidagi yozishlar kontekstni asosiy bazaga bog'lab qo'yadi
+        token = start_request(False)
+        self.addCleanup(end_request, token)
+
+    def titles(self, client=None):
+        response = (client or self.client).get('/api/tours/')
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+    def test_read_write_routing(self):
+        self.assertEqual(TourPackage.objects.all().db, 'replica1')
+        self.assertEqual(TourPackage.objects.get(pk=self.tour.pk).title, 'Eski nom')
+        self.assertEqual(Booking.objects.all().db, 'default')
+        with transaction.atomic():
+            self.assertEqual(TourPackage.objects.get(pk=self.tour.pk).title, 'Yangi nom')
+        with primary_reads():
+            self.assertEqual(TourPackage.objects.all().db, 'default')
+        self.assertEqual(TourPackage.objects.all().db, 'replica1')
+
+    def test_cache_filled_from_primary_after_change(self):
+        # Versiya endigina oshirildi: yangi kesh eski replikadan to'ldirilmasligi kerak
+        self.assertEqual(self.titles(), ['Yangi nom'])
+        # Kechikish oynasi o'tgach ro'yxat yana replikadan olinadi
+        cache.clear()
+        self.assertEqual(self.titles(), ['Eski nom'])
+
+    def test_write_pins_client(self):
+        cache.clear()
+        response = self.client.post('/api/bookings/', {
+            'tour': self.tour.pk, 'name': 'Test Mijoz', 'phone': '+998901234567',
+            'email': 'mijoz@example.com', 'payment_method': 'click',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(ReplicaPinMiddleware.cookie_name, response.cookies)
+        self.assertEqual(self.titles(), ['Yangi nom'])
+
+        cache.clear()
+        self.assertEqual(self.titles(APIClient()), ['Eski nom'])
+        self.assertEqual(TourPackage.objects.all().db, 'replica1')
+
+
+@unittest.skipIf(locks.fcntl is None, 'flock faqat POSIX tizimlarida')
+class MetricsTests(SimpleTestCase):
+    """To'xtagan jarayonlar snapshotlari yig'indiga bir marta qo'shilishi, tiriklari o'z faylida qolishi kerak"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        override = self.settings(METRICS=dict(settings.METRICS, DIRECTORY=directory.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_snapshot(self, name, requests):
+        key = json.dumps(['tours_http_requests_total', [['endpoint', 'test'], ['status', '2xx']]])
+        snapshot = {'buckets': list(settings.METRICS['BUCKETS']), 'counters': {key: requests}, 'histograms': {}}
+        (self.directory / f'{name}.json').write_text(json.dumps(snapshot))
+        return key
+
+    def test_dead_snapshots_merged(self):
+        key = self.write_snapshot('metrics-4242-1', 5)
+        self.write_snapshot('metrics-4242-2', 7)
+        # Tirik jarayon: qulf ushlab turilgan
+        self.write_snapshot('metrics-4343-1', 11)
+        self.addCleanup(hold_lock(self.directory / 'metrics-4343-1.lock').close)
+
+        for _ in range(2):
+            counters = metrics.collect()[1]
+            self.assertEqual(counters[key] - metrics.registry.counters.get(key, 0), 23)
+        self.assertEqual(
+            sorted(path.name for path in self.directory.glob('metrics-*.json')), ['metrics-4343-1.json']
+        )
+        self.assertEqual(json.loads((self.directory / metrics.AGGREGATE_FILE).read_text())['counters'][key], 12)
+
+    def test_snapshot_file_per_process(self):
+        metrics.registry.flush()
+        name = metrics.registry.identity()
+        self.assertTrue(name.startswith(f'metrics-{os.getpid()}-'))
+        self.assertTrue((self.directory / f'{name}.json').exists())
+        # Joriy jarayon qulfni ushlab turadi: uning fayli birlashtirilmaydi
+        self.assertTrue(is_locked(self.directory / f'{name}.lock'))
+
+    def test_histogram_buckets_exported(self):
+        metrics.registry.observe('tours_http_request_duration_seconds', 0.02, endpoint='test')
+        output = metrics.render_metrics()
+        self.assertIn('tours_http_request_duration_seconds_bucket{endpoint="test",le="+Inf"}', output)
+        self.assertIn('# TYPE tours_http_request_duration_seconds histogram', output)
+        self.assertNotIn('quantile', output)
+
+
+@unittest.skipIf(locks.fcntl is None, 'flock faqat POSIX tizimlarida')
+class ContactSpoolTests(PerformanceTestCase):
+    """Spooldagi xabarlar yo'qolmasligi: jarayon to'xtasa ham keyingi flush ularni bir marta yozadi"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        override = self.settings(
+            CONTACT_WRITE_BEHIND=dict(settings.CONTACT_WRITE_BEHIND, ENABLED=True, SPOOL_DIR=self.directory)
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def payload(self, number):
+        return {
+            'name': 'Test Mijoz', 'email': 'mijoz@example.com', 'phone': '+998901234567', 'message': f'Salom {number}'
+        }
+
+    def write_spool(self, name, payloads, tail=''):
+        lines = [
+            json.dumps(dict(payload, receipt_id=str(uuid.uuid4()), sent_at=timezone.now().isoformat()))
+            for payload in payloads
+        ]
+        (self.directory / name).write_text('\n'.join(lines) + '\n' + tail)
+        return [json.loads(line)['receipt_id'] for line in lines]
+
+    def stored(self, receipt_ids):
+        return ContactMessage.objects.filter(receipt_id__in=receipt_ids).count()
+
+    def test_spool_then_flush(self):
+        with self.settings(TOURS_TASKS_EAGER=False), mock.patch.object(contact_spool, '_ensure_started'):
+            responses = [
+                self.client.post('/api/contact/', self.payload(n), content_type='application/json') for n in range(3)
+            ]
+        receipts = [response.data['receipt_id'] for response in responses]
+        self.assertEqual({response.status_code for response in responses}, {202})
+        self.assertEqual(self.stored(receipts), 0)
+        self.assertEqual(self.client.get(f'/api/contact/receipt/{receipts[0]}/').data['status'], 'queued')
+
+        self.assertEqual(contact_spool.flush(), 3)
+        self.assertEqual(self.stored(receipts), 3)
+        self.assertEqual(self.client.get(f'/api/contact/receipt/{receipts[0]}/').data['status'], 'stored')
+        self.assertFalse([path for path in self.directory.iterdir() if path.suffix in ('.jsonl', '.flushing')])
+
+    def test_recovers_dead_process_files(self):
+        # To'xtagan jarayon: qulf ushlanmagan, oxirgi qator chala, bitta xabar allaqachon yozilgan
+        receipts = self.write_spool('contacts-4242-1.jsonl', [self.payload(1), self.payload(2)], tail='{"name": "cha')
+        receipts += self.write_spool('contacts-4242-1-5.flushing', [self.payload(3)])
+        with self.assertLogs('tours.ingest', 'WARNING'):
+            contact_spool.flush()
+        self.assertEqual(self.stored(receipts), 3)
+
+        # Tirik jarayon fayllari faqat ``--all`` bilan olinadi
+        alive = self.write_spool('contacts-4343-1.jsonl', [self.payload(4)])
+        self.addCleanup(hold_lock(self.directory / 'contacts-4343-1.lock').close)
+        call_command('flush_contact_spool', stdout=io.StringIO())
+        self.assertEqual(self.stored(alive), 0)
+        call_command('flush_contact_spool', '--all', stdout=io.StringIO())
+        self.assertEqual(self.stored(alive), 1)
+        self.assertFalse((self.directory / 'contacts-4242-1.lock').exists())
+
+    def test_corrupt_lines_moved_aside(self):
+        # Buzilgan qatorlar fayl o'rtasida: qolgan xabarlar yoziladi, buzilganlari .bad ga o'tadi
+        corrupt = ['{"name": "Kalitlar yetishmaydi"}', 'buzilgan qator', '[1, 2]', '{"sent_at": 5}']
+        receipts = self.write_spool('contacts-4444-1.jsonl', [self.payload(1)], tail='\n'.join(corrupt[:2]) + '\n')
+        before = (self.directory / 'contacts-4444-1.jsonl').read_text()
+        receipts += self.write_spool('contacts-4444-1.jsonl', [self.payload(2)], tail='\n'.join(corrupt[2:]) + '\n')
+        (self.directory / 'contacts-4444-1.jsonl').write_text(
+            before + (self.directory / 'contacts-4444-1.jsonl').read_text()
+        )
+
+        with self.assertLogs('tours.ingest', 'WARNING'):
+            self.assertEqual(contact_spool.flush(), 2)
+        self.assertEqual(self.stored(receipts), 2)
+        self.assertFalse([path for path in self.directory.iterdir() if path.suffix in ('.jsonl', '.flushing')])
+        bad = [line for path in self.directory.glob('*.bad') for line in path.read_text().splitlines()]
+        self.assertEqual(bad, corrupt)
+
+        # Keyingi flush .bad fayllarni qayta o'qimaydi
+        self.assertEqual(contact_spool.flush(), 0)
+
+        # Qayta o'qilgan xabar ikki marta yozilmaydi
+        (self.directory / 'contacts-4444-1.jsonl').write_text(
+            json.dumps(dict(self.payload(1), receipt_id=receipts[0], sent_at=timezone.now().isoformat())) + '\n'
+        )
+        contact_spool.flush()
+        self.assertEqual(ContactMessage.objects.filter(receipt_id=receipts[0]).count(), 1)
+
+    def test_flusher_started_on_startup(self):
+        with self.settings(TOURS_TASKS_EAGER=False), mock.patch.object(contact_spool, '_ensure_started') as start:
+            django_apps.get_app_config('tours').ready()
+        start.assert_called_once_with()
@@ -1,12 +1,18 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TourPackageViewSet, BookingViewSet, ContactMessageViewSet
+from . import async_views
+from .metrics import metrics_view
+from .views import (
+    TourPackageViewSet, BookingViewSet, ContactMessageViewSet, PaymentCallbackView, BookingReportViewSet
+)
 
 # Router yaratish
 router = DefaultRouter()
 router.register(r'tours', TourPackageViewSet, basename='tour')
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'contact', ContactMessageViewSet, basename='contact')
+router.register(r'reports/bookings', BookingReportViewSet, basename='booking-report')
 
 app_name = 'tours'
 
@@ -15,8 +21,21 @@ urlpatterns = [
     path('api/', include(router.urls)),
     
     # Qo'shimcha endpoints
-    path('api/tours/featured/', TourPackageViewSet.as_view({'get': 'featured'}), name='featured-tours'),
-    path('api/tours/search/', TourPackageViewSet.as_view({'get': 'search'}), name='search-tours'),
-    path('api/bookings/<int:pk>/verify-payment/', BookingViewSet.as_view({'post': 'verify_payment'}), name='verify-payment'),
-    path('api/contact/<int:pk>/mark-read/', ContactMessageViewSet.as_view({'post': 'mark_as_read'}), name='mark-read'),
-] 
\ No newline at end of file
+    path('api/tours/featured/', TourPackageViewSet.as_view({'get': 'featured'}, basename='tour'), name='featured-tours'),
+    path('api/tours/search/', TourPackageViewSet.as_view({'get': 'search'}, basename='tour'), name='search-tours'),
+    path('api/bookings/<int:pk>/verify-payment/', BookingViewSet.as_view({'post': 'verify_payment'}, basename='booking'), name='verify-payment'),
+    path('api/contact/<int:pk>/mark-read/', ContactMessageViewSet.as_view({'post': 'mark_as_read'}, basename='contact'), name='mark-read'),
+    path('api/payments/<str:payment_method>/callback/', PaymentCallbackView.as_view(), name='payment-callback'),
+
+    # Prometheus metrikalari (faqat lokal manzillardan)
+    path('metrics/', metrics_view, name='metrics'),
+]
+
+# ASGI ostida sayohatlarni o'qish so'rovlari async viewlarga yo'naltiriladi
+if settings.TOURS_ASYNC_READS:
+    urlpatterns = [
+        path('api/tours/', async_views.tour_list, name='tour-list-async'),
+        path('api/tours/featured/', async_views.tour_featured, name='featured-tours-async'),
+        path('api/tours/search/', async_views.tour_search, name='search-tours-async'),
+        path('api/tours/<int:pk>/', async_views.tour_detail, name='tour-detail-async'),
+    ] + urlpatterns
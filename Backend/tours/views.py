@@ -1,135 +1,531 @@
-from django.shortcuts import render
+import datetime
+from collections import Counter
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import TourPackage, Booking, ContactMessage
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .cache import (
+    cached_response_data,
+    catalogue_etag,
+    catalogue_last_modified,
+    tour_etag,
+    tour_last_modified,
+)
+from .exports import EXPORT_FORMATS, booking_rows
+from .filters import (
+    BookingExportFilter, BookingFilter, DailyBookingStatFilter, TourPackageFilter, TravelWindowFilter
+)
+from .ingest import contact_spool
+from .metrics import registry
+from .middleware import InstrumentedViewMixin
+from .models import TourPackage, Booking, ContactMessage, DailyBookingStat, SeatsUnavailable, hold_deadline
+from .pagination import BookingPagination, ContactMessagePagination
+from .popularity import featured_etag, featured_rows, popularity
+from .payments import (
+    find_transaction, get_provider, payment_queue, process_payment, record_callback, update_pending
+)
+from .search import search_tours
 from .serializers import (
     TourPackageSerializer, 
     TourPackageDetailSerializer,
+    TourPackageCardSerializer,
     BookingSerializer, 
+    BookingRowSerializer,
     ContactMessageSerializer,
-    PaymentVerificationSerializer
+    PaymentVerificationSerializer,
+    BookingReportRowSerializer
 )
+from .sqlite import SerializedWriteMixin, serialized_write
+
+
+# Katalog holatidan ETag/Last-Modified; mos kelsa serializatsiyasiz 304 qaytadi
+catalogue_condition = condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
 
 
-class TourPackageViewSet(viewsets.ReadOnlyModelViewSet):
+class TourPackageViewSet(InstrumentedViewMixin, viewsets.ReadOnlyModelViewSet):
     """Sayohat paketlari uchun ViewSet"""
     queryset = TourPackage.objects.filter(is_active=True)
+    # Har bir action uchun SQL so'rovlar chegarasi (keshsiz holatda, katalog holati so'rovi bilan)
+    query_budget = {'list': 3, 'retrieve': 2, 'featured': 2, 'search': 2, 'facets': 4}
     serializer_class = TourPackageSerializer
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['location', 'duration', 'price']
+    filterset_class = TourPackageFilter
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['price', 'duration', 'created_at']
     ordering = ['-created_at']
 
+    # Kartochka ko'rinishidagi ro'yxatlar .values() projeksiyasi orqali olinadi
+    card_actions = ('list', 'featured', 'search')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.card_actions:
+            return queryset.values(*TourPackageCardSerializer.source_fields)
+        return queryset
+
     def get_serializer_class(self):
         """Har bir action uchun serializer tanlash"""
         if self.action == 'retrieve':
             return TourPackageDetailSerializer
+        if self.action in self.card_actions:
+            return TourPackageCardSerializer
         return TourPackageSerializer
 
+    @method_decorator(catalogue_condition)
+    def list(self, request, *args, **kwargs):
+        """Sayohat paketlari ro'yxati (katalog versiyasi bo'yicha keshlanadi)"""
+        data = cached_response_data(
+            request, 'list',
+            lambda: super(TourPackageViewSet, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    @method_decorator(condition(etag_func=tour_etag, last_modified_func=tour_last_modified))
+    def retrieve(self, request, *args, **kwargs):
+        """Sayohat paketi tafsilotlari (qator o'zgarmagan bo'lsa 304)"""
+        response = super().retrieve(request, *args, **kwargs)
+        popularity.record(response.data['id'], 'view')
+        return response
+
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=featured_etag))
     def featured(self, request):
-        """Trend sayohatlar (bosh sahifa uchun)"""
-        featured_tours = self.queryset[:4]  # Faqat 4ta
-        serializer = self.get_serializer(featured_tours, many=True)
-        return Response(serializer.data)
+        """Trend sayohatlar (bosh sahifa uchun): oldindan hisoblangan mashhurlik reytingi"""
+        return Response(self.get_serializer(featured_rows(request), many=True).data)
 
     @action(detail=False, methods=['get'])
+    @method_decorator(catalogue_condition)
     def search(self, request):
         """Kengaytirilgan qidirish"""
+        return Response(cached_response_data(request, 'search', self._search_data))
+
+    def _search_data(self):
+        serializer = self.get_serializer(self.search_queryset()[:settings.TOURS_SEARCH_LIMIT], many=True)
+        return serializer.data
+
+    def search_queryset(self, skip=()):
+        """
+        Qidiruv va filtrlar qo'llangan queryset (hali bajarilmagan).
+        ``skip`` — qo'llanmaydigan filtrlar ('price', 'location', 'duration'), facetlar uchun.
+        """
+        request = self.request
         query = request.query_params.get('q', '')
         min_price = request.query_params.get('min_price')
         max_price = request.query_params.get('max_price')
         location = request.query_params.get('location')
         duration = request.query_params.get('duration')
 
-        queryset = self.queryset
+        queryset = self.get_queryset()
+
+        # Sana oralig'i filtrlari (ro'yxat bilan bir xil)
+        window = TravelWindowFilter(request.query_params, queryset=queryset, request=request)
+        if not window.is_valid():
+            raise ValidationError(window.errors)
+        queryset = window.qs
 
-        # Qidirish
+        # Qidirish (to'liq matnli indeks, relevantlik bo'yicha tartiblangan)
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(location__icontains=query)
-            )
+            queryset = search_tours(queryset, query)
 
         # Narx filtri
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
+        if 'price' not in skip:
+            if min_price:
+                queryset = queryset.filter(price__gte=min_price)
+            if max_price:
+                queryset = queryset.filter(price__lte=max_price)
 
         # Manzil filtri
-        if location:
+        if location and 'location' not in skip:
             queryset = queryset.filter(location__icontains=location)
 
         # Davomiylik filtri
-        if duration:
+        if duration and 'duration' not in skip:
             queryset = queryset.filter(duration=duration)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    @method_decorator(catalogue_condition)
+    def facets(self, request):
+        """Filtr paneli uchun manzil, davomiylik va narx oralig'i bo'yicha sonlar"""
+        return Response(cached_response_data(request, 'facets', self._facets_data))
+
+    def _facets_data(self):
+        # Har bir facet o'z filtrisiz hisoblanadi: tanlangan manzildan boshqalari ham ko'rinib turadi
+        locations = (
+            self.search_queryset(skip=('location',))
+            .values('location')
+            .annotate(count=Count('id'))
+            .order_by('-count', 'location')
+        )
+        durations = (
+            self.search_queryset(skip=('duration',))
+            .values('duration')
+            .annotate(count=Count('id'))
+            .order_by('duration')
+        )
+
+        edges = settings.TOUR_PRICE_BUCKETS
+        bounds = list(zip([None, *edges], [*edges, None]))
+        bucket = Case(
+            *[When(price__lt=edge, then=Value(index)) for index, edge in enumerate(edges)],
+            default=Value(len(edges)),
+        )
+        bucket_counts = dict(
+            self.search_queryset(skip=('price',))
+            .annotate(bucket=bucket)
+            .values('bucket')
+            .annotate(count=Count('id'))
+            .order_by()
+            .values_list('bucket', 'count')
+        )
+
+        return {
+            'locations': [{'value': row['location'], 'count': row['count']} for row in locations],
+            'durations': [{'value': row['duration'], 'count': row['count']} for row in durations],
+            'price_ranges': [
+                {'min': low, 'max': high, 'count': bucket_counts.get(index, 0)}
+                for index, (low, high) in enumerate(bounds)
+            ],
+        }
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(InstrumentedViewMixin, SerializedWriteMixin, viewsets.ModelViewSet):
     """Buyurtmalar uchun ViewSet"""
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('tour')
+    # Har bir action uchun SQL so'rovlar chegarasi (BEGIN/COMMIT/SAVEPOINT bilan); batch: 4 + INSERT paketlari soni
+    query_budget = {
+        'list': 1, 'retrieve': 1, 'create': 5, 'batch': 5, 'verify_payment': 10, 'export': 1,
+        'update': 6, 'partial_update': 5, 'destroy': 7, 'cancel': 6,
+    }
     serializer_class = BookingSerializer
     permission_classes = [AllowAny]
+    pagination_class = BookingPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['payment_method', 'is_paid', 'tour']
+    filterset_class = BookingFilter
     ordering_fields = ['created_at']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            return queryset.values(*BookingRowSerializer.source_fields)
+        return queryset
+
+    def get_serializer_class(self):
+        """Ro'yxat uchun yengil serializer"""
+        if self.action == 'list':
+            return BookingRowSerializer
+        return BookingSerializer
+
     def create(self, request, *args, **kwargs):
         """Buyurtma yaratish"""
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            booking = serializer.save()
+            tour_id = serializer.validated_data['tour'].pk
+            try:
+                self._reserve([tour_id], lambda: self.perform_create(serializer))
+            except SeatsUnavailable as exc:
+                return self._seats_unavailable(exc)
+            booking = serializer.instance
+            registry.inc('tours_bookings_created_total', source='api')
+            popularity.record(booking.tour_id, 'booking')
             
             # To'lov ma'lumotlarini qaytarish
-            response_data = {
-                'booking_id': booking.id,
-                'tour_title': booking.tour.title,
-                'amount': booking.tour.price,
-                'payment_method': booking.payment_method,
-                'message': 'Buyurtma muvaffaqiyatli yaratildi'
-            }
+            response_data = self._payment_data(booking)
+            response_data['message'] = 'Buyurtma muvaffaqiyatli yaratildi'
             
             return Response(response_data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def update(self, request, *args, **kwargs):
+        """Buyurtmani yangilash (boshqa paketga o'tkazishda joy band qilinadi)"""
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        tour_id = serializer.validated_data.get('tour', instance.tour).pk
+        try:
+            self._reserve([tour_id], lambda: self.perform_update(serializer))
+        except SeatsUnavailable as exc:
+            return self._seats_unavailable(exc)
+        return Response(serializer.data)
+
+    def _payment_data(self, booking):
+        return {
+            'booking_id': booking.id,
+            'tour_title': booking.tour.title,
+            'amount': booking.tour.price,
+            'payment_method': booking.payment_method,
+            'hold_expires_at': booking.hold_expires_at,
+        }
+
+    def _reserve(self, tour_ids, write):
+        """
+        Joy band qiluvchi yozish; joy yetmasa shu paketlarning muddati o'tgan
+        bandlari darhol bo'shatilib bir marta qayta urinib ko'riladi.
+        """
+        try:
+            return write()
+        except SeatsUnavailable:
+            with serialized_write():
+                released = Booking.objects.expired_holds().filter(tour_id__in=tour_ids).release('expired')
+            if not released:
+                raise
+            return write()
+
+    def _seats_unavailable(self, exc):
+        return Response(
+            {'detail': "Sayohat paketida bo'sh joy qolmagan", 'tours': exc.tour_ids},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Guruh buyurtmalarini bitta tranzaksiyada yaratish. Yaroqsiz buyurtmalar va joyi
+        qolmagan paketlar buyurtmalari indeks bo'yicha xato bilan qaytadi, qolganlari yaratiladi.
+        """
+        items = request.data.get('bookings') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': "Buyurtmalar ro'yxati bo'sh bo'lmasligi kerak"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.BOOKING_BATCH_MAX_SIZE:
+            return Response(
+                {'detail': f"Bir so'rovda ko'pi bilan {settings.BOOKING_BATCH_MAX_SIZE} ta buyurtma"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Barcha sayohat paketlarini bitta so'rov bilan yuklash
+        tour_ids = set()
+        for item in items:
+            try:
+                tour_ids.add(int(item.get('tour')))
+            except (AttributeError, TypeError, ValueError):
+                pass
+        context = self.get_serializer_context()
+        context['tours'] = TourPackage.objects.in_bulk(tour_ids)
+
+        item_serializers = [self.get_serializer(data=item, context=context) for item in items]
+        errors = [{} if serializer.is_valid() else serializer.errors for serializer in item_serializers]
+
+        # Yaroqli buyurtmalar yaratiladi, xatolar indeks bo'yicha qaytariladi
+        deadline = hold_deadline()
+        bookings = {
+            index: Booking(**serializer.validated_data, hold_expires_at=deadline)
+            for index, serializer in enumerate(item_serializers) if not errors[index]
+        }
+        unavailable = set()
+
+        def write():
+            with serialized_write(), transaction.atomic():
+                # Joylar INSERT dan oldin, har bir paket uchun bitta shartli UPDATE bilan band qilinadi
+                Booking.record_created(list(bookings.values()))
+                Booking.objects.bulk_create(list(bookings.values()))
+
+        while bookings:
+            try:
+                self._reserve({booking.tour_id for booking in bookings.values()}, write)
+                break
+            except SeatsUnavailable as exc:
+                # Joy yetmagan paketlar buyurtmalari chiqariladi, qolganlari qayta yoziladi
+                unavailable.update(exc.tour_ids)
+                bookings = {
+                    index: booking for index, booking in bookings.items() if booking.tour_id not in unavailable
+                }
+
+        invalid = any(errors)
+        for index, error in enumerate(errors):
+            if not error and index not in bookings:
+                errors[index] = {'tour': ["Sayohat paketida bo'sh joy qolmagan"]}
+
+        if not bookings:
+            if unavailable and not invalid:
+                return Response(
+                    {'detail': "Sayohat paketida bo'sh joy qolmagan", 'tours': sorted(unavailable), 'errors': errors},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        registry.inc('tours_bookings_created_total', len(bookings), source='batch')
+        for tour_id, count in Counter(booking.tour_id for booking in bookings.values()).items():
+            popularity.record(tour_id, 'booking', count)
+
+        return Response({
+            'message': 'Buyurtmalar muvaffaqiyatli yaratildi',
+            # Indeks bo'yicha: yaratilmagan buyurtma o'rnida None, sababi ``errors`` da
+            'bookings': [
+                self._payment_data(bookings[index]) if index in bookings else None for index in range(len(items))
+            ],
+            'errors': errors,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Buyurtmalarni CSV yoki NDJSON oqimi sifatida eksport qilish (buxgalteriya uchun).
+        Parametrlar: output=csv|ndjson, created_from, created_to, is_paid, payment_method.
+        """
+        # DRF ``format`` parametrini renderer tanlash uchun band qilgan
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'output': [f"Mumkin bo'lgan qiymatlar: {', '.join(EXPORT_FORMATS)}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filterset = BookingExportFilter(request.query_params, queryset=Booking.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        render_rows, content_type, extension = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(render_rows(booking_rows(filterset.qs)), content_type=content_type)
+        filename = f'bookings-{timezone.localdate():%Y%m%d}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=True, methods=['post'])
-    def verify_payment(self, request, pk=None):
-        """To'lovni tasdiqlash"""
+    def cancel(self, request, pk=None):
+        """To'lanmagan buyurtmani bekor qilish va joyni paketga qaytarish"""
         booking = self.get_object()
+        if booking.is_paid:
+            return Response(
+                {'detail': "To'langan buyurtmani bekor qilish uchun administratorga murojaat qiling"},
+                status=status.HTTP_409_CONFLICT
+            )
+        with serialized_write():
+            released = Booking.objects.filter(pk=booking.pk, is_paid=False).release('cancelled')
+        if not released:
+            return Response(
+                {'detail': "Buyurtma allaqachon bekor qilingan yoki band qilish muddati o'tgan"},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({'message': 'Buyurtma bekor qilindi', 'booking_id': booking.pk, 'status': 'cancelled'})
+
+    @action(detail=True, methods=['post'])
+    def verify_payment(self, request, pk=None):
+        """To'lovni tasdiqlash (takroriy tranzaksiyalar qayta yozilmaydi)"""
         serializer = PaymentVerificationSerializer(data=request.data)
-        
-        if serializer.is_valid():
-            # Bu yerda to'lov tizimi bilan integratsiya bo'ladi
-            # Hozircha oddiy tasdiqlash
-            booking.is_paid = True
-            booking.save()
-            
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            booking_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound()
+        if serializer.validated_data['booking_id'] != booking_id:
+            return Response(
+                {'booking_id': ['Buyurtma ID manzildagi ID bilan mos emas']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = process_payment(booking_id, serializer.validated_data)
+        if result is None:
+            raise NotFound()
+        return payment_response(result, booking_id)
+
+
+def payment_response(result, booking_id):
+    """To'lov natijasidan API javobi"""
+    if result.booking_id != booking_id:
+        return Response(
+            {'message': 'Tranzaksiya boshqa buyurtmaga tegishli', 'booking_id': booking_id},
+            status=status.HTTP_409_CONFLICT
+        )
+    if result.status == 'confirmed':
+        return Response({
+            'message': 'To\'lov muvaffaqiyatli tasdiqlandi',
+            'booking_id': booking_id,
+            'status': 'paid',
+            'duplicate': result.duplicate
+        })
+    if result.status == 'pending':
+        # To'lov tizimida hali yakunlanmagan: tranzaksiya saqlanmadi, keyinroq qayta yuborish mumkin
+        return Response({
+            'message': result.reason,
+            'booking_id': booking_id,
+            'status': 'pending',
+            'duplicate': result.duplicate
+        }, status=status.HTTP_202_ACCEPTED)
+    return Response({
+        'message': result.reason,
+        'booking_id': booking_id,
+        'status': 'rejected',
+        'duplicate': result.duplicate
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PaymentCallbackView(InstrumentedViewMixin, APIView):
+    """To'lov tizimlari callbacklari (bazaga saqlanadi, lokal navbat orqali qayta ishlanadi)"""
+    permission_classes = [AllowAny]
+    # To'lov tizimlari JWT yubormaydi, haqiqiylik provider tomonidan tekshiriladi
+    authentication_classes = []
+    # SQL so'rovlar chegarasi: yangi callback (saqlash + navbat darhol bajarilganda) va takroriy callback
+    query_budget = {'post': 13, 'duplicate': 1}
+
+    def post(self, request, payment_method):
+        if payment_method not in dict(Booking.PAYMENT_METHODS):
+            raise NotFound()
+        if not get_provider(payment_method).verify_callback(request):
+            return Response({'detail': 'Callback imzosi noto\'g\'ri'}, status=status.HTTP_403_FORBIDDEN)
+
+        data = dict(request.data.items())
+        data['payment_method'] = payment_method
+        serializer = PaymentVerificationSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        payment = serializer.validated_data
+
+        # Takroriy callback — bitta indeksli so'rov, hech narsa yozilmaydi
+        duplicate = find_transaction(payment_method, payment['transaction_id'])
+        if duplicate is not None and duplicate.status == 'pending' and update_pending(payment):
+            # Hali yakunlanmagan callback to'lov tizimining oxirgi ma'lumoti bilan qayta navbatga qo'yiladi
+            duplicate = None
+        elif (duplicate is None or duplicate.status == 'pending') and not record_callback(payment):
+            # Parallel takroriy callback yoki mavjud bo'lmagan buyurtma
+            duplicate = find_transaction(payment_method, payment['transaction_id'])
+            if duplicate is None:
+                raise NotFound()
+        if duplicate is not None:
             return Response({
-                'message': 'To\'lov muvaffaqiyatli tasdiqlandi',
-                'booking_id': booking.id,
-                'status': 'paid'
+                'status': 'duplicate',
+                'booking_id': duplicate.booking_id,
+                'result': duplicate.status
             })
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # 202 faqat callback bazaga yozilgandan keyin
+        payment_queue.submit(process_payment, payment['booking_id'], payment)
+        return Response(
+            {'status': 'queued', 'booking_id': payment['booking_id']},
+            status=status.HTTP_202_ACCEPTED
+        )
 
 
-class ContactMessageViewSet(viewsets.ModelViewSet):
+class ContactMessageViewSet(InstrumentedViewMixin, SerializedWriteMixin, viewsets.ModelViewSet):
     """Kontakt xabarlar uchun ViewSet"""
     queryset = ContactMessage.objects.all()
+    # Har bir action uchun SQL so'rovlar chegarasi
+    query_budget = {
+        'list': 1, 'retrieve': 1, 'create': 1, 'mark_as_read': 2, 'receipt': 1,
+        'update': 2, 'partial_update': 2, 'destroy': 2,
+    }
     serializer_class = ContactMessageSerializer
     permission_classes = [AllowAny]
+    pagination_class = ContactMessagePagination
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['sent_at', 'is_read']
     ordering = ['-sent_at']
@@ -138,7 +534,18 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
         """Kontakt xabar yaratish"""
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            contact_message = serializer.save()
+            if settings.CONTACT_WRITE_BEHIND['ENABLED']:
+                # Xabar spoolga yozildi, bazaga keyinroq tushadi: contact_id hali yo'q,
+                # uni receipt_id orqali olish mumkin
+                receipt_id = contact_spool.enqueue(serializer.validated_data)
+                return Response({
+                    'message': 'Xabar qabul qilindi',
+                    'contact_id': None,
+                    'receipt_id': receipt_id
+                }, status=status.HTTP_202_ACCEPTED)
+
+            self.perform_create(serializer)
+            contact_message = serializer.instance
             
             # Email yuborish (production uchun)
             # send_contact_email(contact_message)
@@ -150,14 +557,80 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], url_path=r'receipt/(?P<receipt_id>[0-9a-f-]{36})')
+    def receipt(self, request, receipt_id=None):
+        """Write-behind rejimida qabul qilingan xabar holati"""
+        contact_id = (
+            ContactMessage.objects.filter(receipt_id=receipt_id)
+            .values_list('id', flat=True)
+            .first()
+        )
+        return Response({
+            'receipt_id': receipt_id,
+            'status': 'queued' if contact_id is None else 'stored',
+            'contact_id': contact_id
+        })
+
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
         """Xabarni o'qilgan deb belgilash"""
         contact_message = self.get_object()
         contact_message.is_read = True
-        contact_message.save()
+        with serialized_write():
+            contact_message.save()
         
         return Response({
             'message': 'Xabar o\'qilgan deb belgilandi',
             'contact_id': contact_message.id
         })
+
+
+class BookingReportViewSet(InstrumentedViewMixin, viewsets.GenericViewSet):
+    """
+    Buyurtmalar va to'langan daromad hisobotlari (faqat o'qish, administratorlar uchun).
+    Ma'lumot ``DailyBookingStat`` yig'ma jadvalidan olinadi (refresh_booking_rollups).
+    Parametrlar: period=day|month, group_by=total|tour|payment_method,
+    date_from, date_to, tour, payment_method.
+    """
+    queryset = DailyBookingStat.objects.all()
+    query_budget = {'list': 1}
+    serializer_class = BookingReportRowSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = DailyBookingStatFilter
+
+    periods = {'day': (F('date'), 30), 'month': (TruncMonth('date'), 365)}
+    groups = {'total': [], 'tour': ['tour_id', 'tour__title'], 'payment_method': ['payment_method']}
+
+    def list(self, request):
+        period = request.query_params.get('period', 'day')
+        group_by = request.query_params.get('group_by', 'total')
+        errors = {}
+        if period not in self.periods:
+            errors['period'] = [f"Mumkin bo'lgan qiymatlar: {', '.join(self.periods)}"]
+        if group_by not in self.groups:
+            errors['group_by'] = [f"Mumkin bo'lgan qiymatlar: {', '.join(self.groups)}"]
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        truncate, default_days = self.periods[period]
+        queryset = self.filter_queryset(self.get_queryset())
+        if not request.query_params.get('date_from'):
+            # Sana berilmasa oxirgi 30 kun (oylik hisobot uchun bir yil)
+            queryset = queryset.filter(date__gte=timezone.localdate() - datetime.timedelta(days=default_days))
+
+        fields = ['period'] + self.groups[group_by]
+        rows = (
+            queryset.annotate(period=truncate).order_by().values(*fields)
+            .annotate(
+                bookings=Sum('bookings'),
+                paid_bookings=Sum('paid_bookings'),
+                paid_revenue=Sum('paid_revenue'),
+            )
+            .order_by(*fields)
+        )
+        return Response({
+            'period': period,
+            'group_by': group_by,
+            'results': self.get_serializer(rows, many=True).data,
+        })
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wondertravel.settings')
+# Sayohatlarni o'qish endpointlari ASGI ostida async viewlar orqali xizmat qiladi
+os.environ.setdefault('TOURS_ASYNC_READS', '1')
 
 application = get_asgi_application()
@@ -51,6 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Butun middleware stekini o'lchashi uchun birinchi turadi
+    'tours.middleware.RequestTimingMiddleware',
+    'tours.middleware.ReplicaPinMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,10 +88,37 @@ WSGI_APPLICATION = 'wondertravel.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Production SQLite profili (SQLITE_PROFILE=0 — Django standart sozlamalari, solishtirish uchun)
+SQLITE_PROFILE = {
+    'ENABLED': os.environ.get('SQLITE_PROFILE', '1') == '1',
+    # Har bir yangi ulanishga qo'llanadi (connection_created)
+    'PRAGMAS': {
+        'journal_mode': 'WAL',  # o'quvchilar yozuvchini kutmaydi
+        'synchronous': 'NORMAL',  # WAL bilan xavfsiz, har COMMIT da fsync yo'q
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # KiB (~64 MB)
+        'temp_store': 'MEMORY',
+    },
+    'BUSY_TIMEOUT': 20,  # soniya: boshqa jarayon yozayotganda kutish
+    'WRITE_LOCK_TIMEOUT': 30,  # soniya: jarayon ichidagi yozuvchilar navbati
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # IMMEDIATE: tranzaksiya boshidanoq yozish qulfini oladi, o'qishdan yozishga
+        # o'tishdagi "database is locked" (busy timeout kutmaydigan) xatosi bo'lmaydi
+        'OPTIONS': {
+            'timeout': SQLITE_PROFILE['BUSY_TIMEOUT'],
+            'transaction_mode': 'IMMEDIATE',
+        } if SQLITE_PROFILE['ENABLED'] else {},
+        # Doimiy ulanishlar: har bir so'rovda qayta ulanmaslik, eskirganlari tekshiriladi
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        # Test bazasi ham fayl (WAL): xotiradagi shared-cache bazada parallel threadlar
+        # jadval qulfiga uchraydi va production xatti-harakatini ko'rsatmaydi
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -101,9 +131,67 @@ DATABASES = {
 #         'PASSWORD': 'your_password',
 #         'HOST': 'localhost',
 #         'PORT': '5432',
+#         'CONN_MAX_AGE': 60,
+#         'CONN_HEALTH_CHECKS': True,
+#         # Yoki psycopg pool (bunda CONN_MAX_AGE = 0 bo'lishi kerak):
+#         # 'OPTIONS': {'pool': {'min_size': 2, 'max_size': 10}},
 #     }
 # }
 
+# O'qish replikalari: DB_REPLICAS="replica1.sqlite3,replica2.sqlite3" (SQLite fayllari)
+# yoki PostgreSQL uchun replika hostlari. Sayohat paketlarini o'qish replikalarga yuboriladi.
+# Lokal sinov: python manage.py sync_sqlite_replicas (asosiy bazadan nusxa oladi)
+DATABASE_REPLICAS = []
+for _number, _replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    _key = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+    DATABASES[f'replica{_number}'] = dict(
+        DATABASES['default'], **{_key: _replica.strip()}, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(f'replica{_number}')
+
+DATABASE_ROUTERS = ['tours.routers.PrimaryReplicaRouter']
+
+# Yozishdan keyin shu klientning o'qishlari necha soniya asosiy bazadan bajariladi
+# (replikatsiya kechikishidan katta bo'lishi kerak)
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Katalog versiyasi keshda saqlanadi, shuning uchun bir nechta worker jarayonlari
+# umumiy backend ishlatishi shart (aks holda narx o'zgarishi faqat bitta workerda
+# ko'rinadi): REDIS_URL="redis://127.0.0.1:6379/1" (redis paketi kerak) yoki
+# bazadagi kesh jadvali (python manage.py createcachetable). Jarayon xotirasidagi
+# kesh faqat DEBUG uchun; tekshiruv: python manage.py check --deploy (tours.E002)
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'wondertravel',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'wondertravel_cache',
+        }
+    }
+
+# Sayohatlar ro'yxati, featured va search javoblari kesh muddati (soniya)
+TOURS_RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Qidiruv javobidagi natijalar chegarasi (relevantlik bo'yicha eng yaxshilari)
+TOURS_SEARCH_LIMIT = 100
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -168,6 +256,85 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Sayohatlarni o'qish endpointlari uchun async viewlar (asgi.py yoqadi)
+TOURS_ASYNC_READS = os.environ.get('TOURS_ASYNC_READS', '0') == '1'
+
+# Fon vazifalarini navbatsiz, darhol bajarish (testlar uchun)
+TOURS_TASKS_EAGER = False
+
+# Sayohat rasmlari variantlari: nom -> (maksimal kenglik, maksimal balandlik)
+TOUR_IMAGE_VARIANTS = {
+    'card': (480, 360),
+    'slider': (1280, 640),
+    'detail': (1600, 1000),
+}
+
+# Facetlar uchun narx oraliqlari chegaralari (UZS): <3 mln, 3-5 mln, ..., >=10 mln
+TOUR_PRICE_BUCKETS = [3000000, 5000000, 7000000, 10000000]
+
+# Bitta batch so'rovidagi buyurtmalar soni chegarasi
+BOOKING_BATCH_MAX_SIZE = 500
+
+# To'lanmagan buyurtma paketda joyni shuncha soniya band qiladi (expire_booking_holds buyrug'i bo'shatadi)
+BOOKING_HOLD_SECONDS = 15 * 60
+
+# So'rovlar vaqtini o'lchash: SAMPLE_RATE — o'lchanadigan so'rovlar ulushi (0..1)
+REQUEST_TIMING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', '1.0' if DEBUG else '0.05')),
+    'SLOWEST_QUERIES': 3,  # logga yoziladigan eng sekin SQL so'rovlar soni
+    # Server-Timing sarlavhasi ichki tuzilmani ochib beradi: productionda faqat aniq yoqilganda
+    'HEADER': os.environ.get('REQUEST_TIMING_HEADER', '1' if DEBUG else '0') == '1',
+}
+
+# Prometheus metrikalari: har bir jarayon snapshotini DIRECTORY ga yozadi, /metrics ularni qo'shadi
+METRICS = {
+    'ENABLED': True,
+    'DIRECTORY': os.environ.get('METRICS_DIR', str(BASE_DIR / 'metrics')),
+    'FLUSH_INTERVAL': 5.0,  # soniya
+    # Davomiylik histogrammasi chegaralari (soniya)
+    'BUCKETS': [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tours.performance': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Buyurtmalar eksportida bazadan bir martada o'qiladigan qatorlar soni
+BOOKING_EXPORT_CHUNK_SIZE = 2000
+
+# Kunlik buyurtmalar yig'ma jadvali (refresh_booking_rollups buyrug'i, masalan har 5 daqiqada cron)
+BOOKING_ROLLUPS = {
+    'LAG': 60,  # soniya: shundan yangi o'zgarishlar keyingi ishga qoldiriladi (yakunlanmagan tranzaksiyalar)
+    'BATCH_SIZE': 1000,
+}
+
+# Featured reytingi: hodisalar og'irligi va ballarning yarim yemirilish davri (tours.popularity)
+TOUR_POPULARITY = {
+    'WEIGHTS': {'view': 1.0, 'booking': 10.0, 'payment': 25.0},
+    'HALF_LIFE': 7 * 24 * 60 * 60,  # soniya
+    # Forward decay boshlanish nuqtasi (2026-01-01 UTC); o'zgartirilsa rebuild_popularity ishga tushiriladi
+    'EPOCH': 1767225600,
+    'FLUSH_INTERVAL': 30,  # soniya: xotiradagi hisoblagich bazaga shunchalik tez-tez yoziladi
+    'TOP_N': 4,
+}
+
+# Kontakt xabarlarni write-behind rejimida qabul qilish (diskdagi spool + paketli yozish)
+CONTACT_WRITE_BEHIND = {
+    'ENABLED': os.environ.get('CONTACT_WRITE_BEHIND', '0') == '1',
+    'SPOOL_DIR': BASE_DIR / 'spool' / 'contacts',
+    'BATCH_SIZE': 200,  # shuncha xabar yig'ilsa darhol yoziladi
+    'FLUSH_INTERVAL': 2.0,  # soniya
+    'FSYNC': True,
+}
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -233,6 +400,19 @@ PAYMENT_SETTINGS = {
     'PAYME_MERCHANT_ID': 'your_payme_merchant_id',
     'CLICK_MERCHANT_ID': 'your_click_merchant_id',
     'UZUM_MERCHANT_ID': 'your_uzum_merchant_id',
+    # To'lov usuli -> provider klassi (lokal ishlab chiqishda soxta provider)
+    # Soxta provider har qanday tranzaksiyani tasdiqlaydi: faqat DEBUG rejimida ishlaydi
+    'ALLOW_STUB': DEBUG,
+    'STUB_SECRET': os.environ.get('PAYMENT_STUB_SECRET', SECRET_KEY),
+    'PROVIDERS': {
+        'payme': 'tours.payments.StubProvider',
+        'click': 'tours.payments.StubProvider',
+        'uzum': 'tours.payments.StubProvider',
+    },
+    # To'lov muvaffaqiyatli hisoblanadigan holatlar
+    'SUCCESS_STATUSES': ['success', 'paid', 'completed'],
+    # Yakuniy rad etilgan holatlar; qolganlari (pending, processing) oraliq hisoblanadi va saqlanmaydi
+    'FAILURE_STATUSES': ['failed', 'cancelled', 'canceled', 'declined', 'rejected'],
 }
 
 # Email settings (for production)
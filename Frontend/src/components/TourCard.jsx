@@ -81,11 +81,6 @@ const TourCard = ({ tour, onClick }) => {
           {tour.title}
         </h3>
 
-        {/* Description */}
-        <p className="text-gray-600 text-sm mb-4 line-clamp-3">
-          {tour.description}
-        </p>
-
         {/* Location */}
         <div className="flex items-center mb-3">
           <MapPin className="h-4 w-4 text-gray-400 mr-2" />
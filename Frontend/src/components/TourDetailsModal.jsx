@@ -1,13 +1,26 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, MapPin, Calendar, Clock, Star, ChevronLeft, ChevronRight, Users } from 'lucide-react';
 import { useLanguage } from '../contexts/LanguageContext';
 import { Link } from 'react-router-dom';
+import { toursAPI } from '../services/api';
 
 const TourDetailsModal = ({ tour, isOpen, onClose }) => {
   const [currentImageIndex, setCurrentImageIndex] = useState(0);
+  const [details, setDetails] = useState(null);
   const { t } = useLanguage();
 
+  // Card data has no description: load the full tour when the modal opens
+  useEffect(() => {
+    if (!isOpen || !tour) return;
+    let cancelled = false;
+    setDetails(null);
+    toursAPI.getById(tour.id)
+      .then((data) => { if (!cancelled) setDetails(data); })
+      .catch((err) => console.error('Error fetching tour details:', err));
+    return () => { cancelled = true; };
+  }, [isOpen, tour?.id]);
+
   if (!tour) return null;
 
   // Create multiple images for the slider (in a real app, these would come from the tour data)
@@ -168,7 +181,9 @@ const TourDetailsModal = ({ tour, isOpen, onClose }) => {
                 {/* Main Info */}
                 <div className="lg:col-span-2">
                   <h2 className="text-3xl font-bold text-gray-800 mb-4">{tour.title}</h2>
-                  <p className="text-gray-600 mb-6 leading-relaxed">{tour.description}</p>
+                  <p className="text-gray-600 mb-6 leading-relaxed">
+                    {details ? details.description : 'Yuklanmoqda...'}
+                  </p>
 
                   {/* Tour Details */}
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-4 mb-6">
@@ -54,12 +54,11 @@ const ToursPage = () => {
 
     let filtered = [...tours];
 
-    // Search filter
+    // Search filter (list cards carry no description; full-text search lives at /tours/search/)
     if (filters.search) {
       const searchTerm = filters.search.toLowerCase();
       filtered = filtered.filter(tour => 
         tour.title?.toLowerCase().includes(searchTerm) ||
-        tour.description?.toLowerCase().includes(searchTerm) ||
         tour.location?.toLowerCase().includes(searchTerm)
       );
     }
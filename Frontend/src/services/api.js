@@ -53,6 +53,12 @@ export const toursAPI = {
     const queryString = new URLSearchParams(params).toString();
     return apiCall(`/tours/search/${queryString ? `?${queryString}` : ''}`);
   },
+
+  // Get facet counts for the filter panel (same params as search)
+  getFacets: (params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    return apiCall(`/tours/facets/${queryString ? `?${queryString}` : ''}`);
+  },
 };
 
 // Bookings API